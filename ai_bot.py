@@ -13,50 +13,172 @@ Features:
 Requirements:
 - Ollama running locally with a model (llama3, mistral, etc.)
 - Guesty API credentials
+
+Concurrency:
+- The async entrypoints (agenerate_response, aload_all_conversations) issue
+  independent Ollama calls concurrently. Ollama only serves them in parallel
+  if the server is configured for it:
+    OLLAMA_NUM_PARALLEL=4        # parallel requests per loaded model
+    OLLAMA_MAX_LOADED_MODELS=1   # models kept in memory at once
 """
 
 import os
+import re
 import json
+import hashlib
+import time
+import pickle
+import threading
+import asyncio
+import httpx
 import requests
-from typing import Optional, List, Dict, Tuple
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
+from typing import Any, Optional, List, Dict, Tuple, NamedTuple
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+try:
+    import ahocorasick  # pyahocorasick: single-pass multi-keyword scan
+except ImportError:
+    ahocorasick = None
+
+try:
+    import redis  # Optional shared cache across worker processes
+except ImportError:
+    redis = None
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx (pip install httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import orjson  # Faster JSON parsing for model output
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 load_dotenv()
 
 
+def _dig(data: Optional[Dict], *keys: str, default=None):
+    """Follow nested dict keys, returning default at the first missing/empty level"""
+    for key in keys:
+        if not isinstance(data, dict):
+            return default
+        data = data.get(key)
+    return default if data is None else data
+
+
+class BotResult(NamedTuple):
+    """Outcome of generate_response for one guest message"""
+    response: Optional[str] = None
+    confidence: float = 0.0
+    source: str = "ai"  # ai, saved_reply, web_info, escalated, disabled
+    escalated: bool = False
+    reason: Optional[str] = None
+    sentiment: str = "neutral"
+    assigned_to_agent: bool = False
+    matched_reply_title: Optional[str] = None  # set when source is saved_reply
+
+
+class TrainingExample(NamedTuple):
+    """A guest question paired with the team's reply, from conversation history"""
+    guest_message: str
+    host_response: str
+    conversation_id: str
+    listing_id: str
+    guest_name: str
+
+
 class CasitaAIBot:
     """CasitAI CS Bot - AI-powered guest communication assistant"""
 
     # Ollama configuration
     OLLAMA_BASE_URL = os.getenv('OLLAMA_URL', 'http://localhost:11434')
     DEFAULT_MODEL = os.getenv('OLLAMA_MODEL', 'llama3')
+    OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '1h')  # keep model + prompt cache resident
+    OLLAMA_NUM_BATCH = 512  # prefill batch size
+    # Fixed context window - changing num_ctx between requests makes Ollama reload the model
+    OLLAMA_NUM_CTX = int(os.getenv('OLLAMA_NUM_CTX', '4096'))
+
+    # Cache TTLs in seconds (saved replies also apply to the in-process cache)
+    SAVED_REPLIES_TTL = 600
+    LISTINGS_TTL = 30 * 60
+    LLM_RESPONSE_TTL = 24 * 60 * 60
+    LLM_CACHE_MAX_TEMPERATURE = 0.5  # Higher temperatures are meant to vary
+
+    # On-disk snapshot of parsed training examples (skips Guesty on restart)
+    TRAINING_CACHE_DIR = os.getenv('CASITAI_CACHE_DIR', os.path.expanduser('~/.casitai'))
+    TRAINING_CACHE_TTL = 24 * 60 * 60  # seconds
+    TRAINING_SNAPSHOT_VERSION = 2  # bump when the stored record format changes
 
     # Confidence threshold for auto-response vs escalation
     CONFIDENCE_THRESHOLD = 0.7
 
+    # Saved-reply match score at which the reply is sent without calling Ollama
+    SAVED_REPLY_MATCH_THRESHOLD = 0.6
+
+    # Max AI responses remembered for repeated (message, context) pairs
+    RESPONSE_CACHE_SIZE = 512
+
+    # Max rendered training-example contexts kept (keyed by message bag of words)
+    TRAINING_CONTEXT_CACHE_SIZE = 256
+
     # Keywords that trigger immediate escalation to human agent
-    ESCALATION_KEYWORDS = [
+    ESCALATION_KEYWORDS = (
         'refund', 'cancel', 'complaint', 'emergency', 'urgent', 'manager',
         'legal', 'lawyer', 'police', 'damage', 'injury', 'safety',
         'discrimination', 'harassment'
-    ]
+    )
 
     # Keywords that trigger web search (weather, events, transportation)
-    WEB_SEARCH_KEYWORDS = [
+    WEB_SEARCH_KEYWORDS = (
         'weather', 'forecast', 'temperature', 'rain', 'sunny',
         'event', 'events', 'concert', 'festival', 'game', 'show',
         'uber', 'lyft', 'taxi', 'bus', 'metro', 'train', 'airport',
         'transportation', 'shuttle', 'rental car', 'parking'
-    ]
+    )
+    WEATHER_KEYWORDS = frozenset({'weather', 'forecast', 'temperature', 'rain', 'sunny'})
+    EVENT_KEYWORDS = frozenset({'event', 'events', 'concert', 'festival', 'game', 'show'})
 
     # Negative sentiment indicators
-    NEGATIVE_SENTIMENT_WORDS = [
+    NEGATIVE_SENTIMENT_WORDS = (
         'terrible', 'awful', 'horrible', 'worst', 'disgusting', 'unacceptable',
         'disappointed', 'angry', 'furious', 'outraged', 'upset', 'frustrated',
         'ridiculous', 'scam', 'fraud', 'rip off', 'never again', 'hate',
         'dirty', 'filthy', 'broken', 'dangerous', 'unsafe', 'lied'
-    ]
+    )
+    HIGH_SEVERITY_WORDS = frozenset({'scam', 'fraud', 'dangerous', 'unsafe', 'disgusting', 'lied'})
+
+    # Topic keywords used to summarize training data
+    TOPIC_KEYWORDS = {
+        'check-in': ['check in', 'checkin', 'arrival', 'arrive', 'access'],
+        'check-out': ['check out', 'checkout', 'departure', 'leave', 'leaving'],
+        'parking': ['parking', 'car', 'garage', 'street parking'],
+        'wifi': ['wifi', 'password', 'internet', 'connection'],
+        'amenities': ['pool', 'gym', 'beach', 'kitchen', 'washer', 'dryer'],
+        'location': ['location', 'address', 'directions', 'nearby', 'restaurant'],
+        'issues': ['broken', 'not working', 'problem', 'issue', 'help']
+    }
+
+    # Common question patterns used to score saved replies
+    SAVED_REPLY_PATTERNS = {
+        'check-in': ['check in', 'checkin', 'check-in', 'arrival', 'arrive'],
+        'check-out': ['check out', 'checkout', 'check-out', 'departure', 'leave'],
+        'wifi': ['wifi', 'wi-fi', 'internet', 'password'],
+        'parking': ['parking', 'park', 'car', 'garage'],
+        'amenities': ['amenities', 'amenity', 'pool', 'gym', 'kitchen'],
+        'location': ['location', 'address', 'directions', 'where'],
+        'rules': ['rules', 'policy', 'policies', 'allowed', 'smoking', 'pets']
+    }
+
+    # Words ignored when matching guest messages against training examples
+    TRAINING_STOPWORDS = frozenset({'the', 'a', 'an', 'is', 'are', 'was', 'were', 'i', 'we', 'you', 'to', 'for', 'of', 'in', 'on', 'at'})
 
     # Casita brand personality - casual but professional hospitality voice
     BRAND_PERSONALITY = """
@@ -98,29 +220,136 @@ THINGS TO AVOID:
 
     def __init__(self, guesty_client=None):
         self.guesty = guesty_client
-        self._saved_replies_cache = {}  # Cache per listing
-        self._cache_timestamp = None
+        self._saved_replies_cache = {}  # listing -> (replies, monotonic expiry)
+        self._reply_index = {}  # Precomputed match features + inverted index per saved-reply list
+        self._system_prefix_cache = {}  # listing -> (saved replies, static system prompt prefix)
+        self._kb_cache = {}  # listing -> (saved replies, rendered knowledge base)
         self._enabled_listings = set()  # Listings where bot is active
         self._all_listings = []  # All available listings
-        self._conversation_history = []  # Training data from past conversations
+        # Training data from past conversations, stored column-wise (one list per field)
+        self._train_guest_msgs = []
+        self._train_host_resps = []
+        self._train_conv_ids = np.array([], dtype=str)
+        self._train_listing_ids = []
+        self._train_guest_names = []
         self._training_loaded = False
+        self._llm_calls_saved = 0  # Messages answered from saved replies / web info instead of Ollama
+        self._response_cache = OrderedDict()  # (message, listing, guest) hash -> (AI result, its context), LRU order
+        self._response_cache_hits = 0
+        self._training_index = None  # (guest messages, word -> example indices) for _build_training_context
+        self._training_context_cache = OrderedDict()  # (message words, limit) -> rendered examples, LRU
+        self._aclient = None  # httpx.AsyncClient, bound to the event loop that created it
+        self._aclient_loop = None
+        self._inflight = {}  # payload digest -> in-flight Ollama task (same event loop as _aclient)
+        self._keyword_tags = self._build_keyword_tags()
+        self._kw_automaton = self._build_keyword_automaton()
+        self._keyword_re = re.compile('|'.join(map(re.escape, self._keyword_tags)))
+        self._redis = self._connect_redis()
+        self._http = self._build_http_session()  # keep-alive pool for Ollama calls
+
+    # ============================================
+    # SHARED CACHE (REDIS)
+    # ============================================
+
+    def _connect_redis(self):
+        """Connect to Redis if REDIS_URL is set, otherwise run with in-process caches only"""
+        redis_url = os.getenv('REDIS_URL')
+        if not redis_url or redis is None:
+            return None
+
+        try:
+            client = redis.Redis.from_url(redis_url, socket_timeout=1)
+            client.ping()
+            return client
+        except Exception as e:
+            print(f"Redis unavailable, using in-process cache only: {e}")
+            return None
+
+    def _shared_cache_get(self, key: str):
+        """Read a JSON value from Redis (None on miss or error)"""
+        if self._redis is None:
+            return None
+
+        try:
+            raw = self._redis.get(key)
+            return json.loads(raw) if raw is not None else None
+        except Exception as e:
+            print(f"Redis read error: {e}")
+            return None
+
+    def _shared_cache_set(self, key: str, value, ttl: int):
+        """Write a JSON value to Redis with a TTL"""
+        if self._redis is None:
+            return
+
+        try:
+            self._redis.setex(key, ttl, json.dumps(value))
+        except Exception as e:
+            print(f"Redis write error: {e}")
+
+    def _llm_cache_key(self, payload: Dict) -> Optional[str]:
+        """Cache key for an Ollama request, or None if it shouldn't be cached"""
+        if payload['options']['temperature'] > self.LLM_CACHE_MAX_TEMPERATURE:
+            return None
+
+        return f"llm:{self._payload_digest(payload)}"
+
+    def _payload_digest(self, payload: Dict) -> str:
+        """Stable hash of an Ollama request body"""
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
 
     # ============================================
     # OLLAMA LOCAL MODEL INTEGRATION
     # ============================================
 
+    def _build_http_session(self) -> requests.Session:
+        """Pooled keep-alive session so Ollama calls reuse TCP connections"""
+        session = requests.Session()
+        session.headers['Accept-Encoding'] = 'gzip, deflate'
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            # Ollama answers 503 when its request queue is full
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                              allowed_methods=None, raise_on_status=False)
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
     def _check_ollama_available(self) -> bool:
         """Check if Ollama is running"""
         try:
-            response = requests.get(f"{self.OLLAMA_BASE_URL}/api/tags", timeout=5)
+            response = self._http.get(f"{self.OLLAMA_BASE_URL}/api/tags", timeout=5)
             return response.status_code == 200
         except:
             return False
 
+    def warm_up(self, listing_id: str = None) -> bool:
+        """
+        Load the model and prefill the static system prompt so the first guest
+        message doesn't pay for the model load. Generates a single token.
+
+        Returns:
+            True if Ollama answered
+        """
+        system_prefix = self._get_system_prefix(listing_id)
+        payload = self._build_ollama_payload(
+            "Hi", system_prefix, temperature=0.3, num_keep=len(system_prefix) // 4
+        )
+        payload["options"]["num_predict"] = 1
+
+        try:
+            response = self._http.post(f"{self.OLLAMA_BASE_URL}/api/chat", json=payload, timeout=120)
+            return response.status_code == 200
+        except Exception as e:
+            print(f"Ollama warm-up error: {e}")
+            return False
+
     def _get_available_models(self) -> List[str]:
         """Get list of available Ollama models"""
         try:
-            response = requests.get(f"{self.OLLAMA_BASE_URL}/api/tags", timeout=5)
+            response = self._http.get(f"{self.OLLAMA_BASE_URL}/api/tags", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 return [model['name'] for model in data.get('models', [])]
@@ -128,39 +357,140 @@ THINGS TO AVOID:
             pass
         return []
 
-    def _call_ollama(self, prompt: str, system_prompt: str = None,
-                     model: str = None, temperature: float = 0.3) -> str:
-        """Call Ollama API for inference"""
-        model = model or self.DEFAULT_MODEL
-
+    def _build_ollama_payload(self, prompt: str, system_prompt: str = None,
+                              model: str = None, temperature: float = 0.3,
+                              num_keep: int = None, response_format: str = None) -> Dict:
+        """Build the /api/chat request body"""
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
 
+        options = {
+            "temperature": temperature,
+            "num_ctx": self.OLLAMA_NUM_CTX,
+            "num_batch": self.OLLAMA_NUM_BATCH,
+            "num_thread": os.cpu_count()
+        }
+        if num_keep:
+            # Tokens of the shared prompt prefix Ollama keeps on context shifts
+            options["num_keep"] = num_keep
+
+        payload = {
+            "model": model or self.DEFAULT_MODEL,
+            "messages": messages,
+            "stream": False,
+            "keep_alive": self.OLLAMA_KEEP_ALIVE,
+            "options": options
+        }
+        if response_format:
+            # e.g. "json" - constrains decoding to valid JSON
+            payload["format"] = response_format
+
+        return payload
+
+    def _call_ollama(self, prompt: str, system_prompt: str = None,
+                     model: str = None, temperature: float = 0.3, num_keep: int = None,
+                     response_format: str = None) -> str:
+        """Call Ollama API for inference"""
+        payload = self._build_ollama_payload(prompt, system_prompt, model, temperature, num_keep,
+                                             response_format)
+
+        cache_key = self._llm_cache_key(payload)
+        if cache_key:
+            cached = self._shared_cache_get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            response = requests.post(
+            response = self._http.post(
                 f"{self.OLLAMA_BASE_URL}/api/chat",
-                json={
-                    "model": model,
-                    "messages": messages,
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature
-                    }
-                },
+                json=payload,
                 timeout=60
             )
 
             if response.status_code == 200:
                 data = response.json()
-                return data.get('message', {}).get('content', '')
+                content = data.get('message', {}).get('content', '')
+                if cache_key and content:
+                    self._shared_cache_set(cache_key, content, self.LLM_RESPONSE_TTL)
+                return content
 
         except Exception as e:
             print(f"Ollama error: {e}")
 
         return ""
 
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get the pooled async HTTP client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            # A client can't be shared across event loops (e.g. repeated asyncio.run)
+            # HTTP/2 multiplexing only applies to an https:// (remote) Ollama;
+            # plain http:// stays on HTTP/1.1 keep-alive
+            self._aclient = httpx.AsyncClient(
+                base_url=self.OLLAMA_BASE_URL,
+                timeout=60,
+                http2=HTTP2_AVAILABLE,
+                headers={'Accept-Encoding': 'gzip, deflate'},
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+            )
+            self._aclient_loop = loop
+            self._inflight = {}
+        return self._aclient
+
+    async def _acall_ollama(self, prompt: str, system_prompt: str = None,
+                            model: str = None, temperature: float = 0.3, num_keep: int = None,
+                            response_format: str = None) -> str:
+        """
+        Async variant of _call_ollama so independent LLM calls can overlap.
+        Identical requests issued while one is already running share its result.
+        """
+        payload = self._build_ollama_payload(prompt, system_prompt, model, temperature, num_keep,
+                                             response_format)
+        client = self._get_async_client()
+        digest = self._payload_digest(payload)
+
+        task = self._inflight.get(digest)
+        if task is None:
+            task = asyncio.ensure_future(self._afetch_ollama(client, payload))
+            inflight = self._inflight
+            inflight[digest] = task
+            task.add_done_callback(lambda _: inflight.pop(digest, None))
+
+        # Shield so one caller being cancelled doesn't cancel the shared request
+        return await asyncio.shield(task)
+
+    async def _afetch_ollama(self, client: httpx.AsyncClient, payload: Dict) -> str:
+        """Send one /api/chat request (checking the shared cache first)"""
+        cache_key = self._llm_cache_key(payload)
+        if cache_key:
+            cached = self._shared_cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            response = await client.post("/api/chat", json=payload)
+
+            if response.status_code == 200:
+                data = response.json()
+                content = data.get('message', {}).get('content', '')
+                if cache_key and content:
+                    self._shared_cache_set(cache_key, content, self.LLM_RESPONSE_TTL)
+                return content
+
+        except Exception as e:
+            print(f"Ollama error: {e}")
+
+        return ""
+
+    async def aclose(self):
+        """Close the async HTTP client"""
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+            self._aclient_loop = None
+
     # ============================================
     # LISTING MANAGEMENT
     # ============================================
@@ -170,9 +500,16 @@ THINGS TO AVOID:
         if self._all_listings and not force_refresh:
             return self._all_listings
 
+        if not force_refresh:
+            cached = self._shared_cache_get('listings:all')
+            if cached:
+                self._all_listings = cached
+                return self._all_listings
+
         if self.guesty:
             try:
-                self._all_listings = self.guesty.get_all_listings(limit=200)
+                self._all_listings = list(self.guesty.iter_listings())
+                self._shared_cache_set('listings:all', self._all_listings, self.LISTINGS_TTL)
                 return self._all_listings
             except Exception as e:
                 print(f"Error fetching listings: {e}")
@@ -202,7 +539,8 @@ THINGS TO AVOID:
     # CONVERSATION TRAINING
     # ============================================
 
-    def load_all_conversations(self, limit: int = 500, force_refresh: bool = False) -> List[Dict]:
+    def load_all_conversations(self, limit: int = 500, force_refresh: bool = False,
+                               max_workers: int = 16) -> List[TrainingExample]:
         """
         Load all historical conversations from Guesty for training.
         This teaches the bot how your team handles guest communication.
@@ -210,176 +548,370 @@ THINGS TO AVOID:
         Args:
             limit: Maximum number of conversations to fetch
             force_refresh: Force reload even if already loaded
+            max_workers: Threads fetching conversation messages in parallel
+
+        Returns:
+            List of conversation training examples
+        """
+        loaded = self._preloaded_training_examples(limit, force_refresh)
+        if loaded is not None:
+            return loaded
+
+        print(f"Loading conversation history from Guesty (limit: {limit})...")
+
+        try:
+            training_examples = []
+            conversation_count = 0
+
+            # Fetch conversations a page at a time so raw payloads don't pile up;
+            # message fetches within a page run in parallel threads
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for page in self._iter_conversation_pages(limit):
+                    conversation_count += len(page)
+
+                    for examples in executor.map(self._fetch_conversation_examples, page):
+                        training_examples.extend(examples)
+
+            return self._finish_training_load(training_examples, conversation_count, limit)
+
+        except Exception as e:
+            print(f"Error loading conversations: {e}")
+            return []
+
+    async def aload_all_conversations(self, limit: int = 500, force_refresh: bool = False,
+                                      concurrency: int = 16) -> List[TrainingExample]:
+        """
+        Async variant of load_all_conversations.
+        Fetches conversation messages concurrently instead of one conversation at a time.
+
+        Args:
+            limit: Maximum number of conversations to fetch
+            force_refresh: Force reload even if already loaded
+            concurrency: Maximum in-flight Guesty requests
 
         Returns:
             List of conversation training examples
         """
+        loaded = self._preloaded_training_examples(limit, force_refresh)
+        if loaded is not None:
+            return loaded
+
+        print(f"Loading conversation history from Guesty (limit: {limit})...")
+
+        try:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch(conv: Dict) -> List[TrainingExample]:
+                # Guesty client is blocking - run each fetch in a worker thread
+                async with semaphore:
+                    return await asyncio.to_thread(self._fetch_conversation_examples, conv)
+
+            training_examples = []
+            conversation_count = 0
+            pages = self._iter_conversation_pages(limit)
+
+            # Process one page of conversations at a time
+            while True:
+                page = await asyncio.to_thread(next, pages, None)
+                if page is None:
+                    break
+
+                conversation_count += len(page)
+                results = await asyncio.gather(*[fetch(conv) for conv in page])
+                for examples in results:
+                    training_examples.extend(examples)
+
+            return self._finish_training_load(training_examples, conversation_count, limit)
+
+        except Exception as e:
+            print(f"Error loading conversations: {e}")
+            return []
+
+    def _preloaded_training_examples(self, limit: int,
+                                     force_refresh: bool) -> Optional[List[TrainingExample]]:
+        """
+        Training examples available without fetching from Guesty: the ones already
+        loaded, or a fresh local snapshot ([] when no Guesty client is configured).
+        Returns None if conversations have to be fetched.
+        """
         if self._training_loaded and not force_refresh:
             return self._conversation_history
 
+        if not force_refresh:
+            snapshot = self._load_training_snapshot(limit)
+            if snapshot is not None:
+                self._set_training_data(snapshot)
+                self._training_loaded = True
+                print(f"Loaded {len(snapshot)} training examples from local snapshot")
+                return snapshot
+
         if not self.guesty:
             print("Guesty client not configured")
             return []
 
-        print(f"Loading conversation history from Guesty (limit: {limit})...")
+        return None
 
-        try:
-            # Fetch all conversations
-            all_conversations = self.guesty.get_conversations(limit=limit)
-            training_examples = []
+    def _finish_training_load(self, training_examples: List[TrainingExample],
+                              conversation_count: int, limit: int) -> List[TrainingExample]:
+        """Index freshly fetched training examples and save them as the local snapshot"""
+        print(f"Processed {conversation_count} conversations")
 
-            print(f"Found {len(all_conversations)} conversations. Processing...")
+        self._set_training_data(training_examples)
+        self._training_loaded = True
+        self._save_training_snapshot(training_examples, limit)
 
-            for conv in all_conversations:
-                conv_id = conv.get('_id', '')
+        print(f"Loaded {len(training_examples)} training examples from conversations")
+        return training_examples
 
-                if not conv_id:
-                    continue
+    def _fetch_conversation_examples(self, conv: Dict) -> List[TrainingExample]:
+        """Fetch one conversation's messages and turn them into training examples"""
+        conv_id = conv.get('_id', '')
 
-                try:
-                    # Get messages for this conversation
-                    messages = self.guesty.get_conversation_messages(conv_id, limit=50)
+        if not conv_id:
+            return []
 
-                    if not messages:
-                        continue
+        try:
+            messages = self.guesty.get_conversation_messages(conv_id, limit=50)
+            return self._extract_training_examples(conv, messages)
+        except Exception:
+            # Skip problematic conversations
+            return []
 
-                    # Build conversation thread (guest question -> host response pairs)
-                    guest_messages = []
-                    host_responses = []
+    def _iter_conversation_pages(self, limit: int, page_size: int = 32):
+        """
+        Yield conversations from Guesty one page at a time.
 
-                    for msg in reversed(messages):  # Oldest first
-                        sender_type = msg.get('from', msg.get('type', ''))
-                        body = msg.get('body', msg.get('text', ''))
+        Args:
+            limit: Maximum number of conversations in total
+            page_size: Conversations per Guesty request
+        """
+        fetched = 0
 
-                        if not body:
-                            continue
+        while fetched < limit:
+            size = min(page_size, limit - fetched)
+            page = self.guesty.get_conversations(limit=size, skip=fetched)
+            if not page:
+                return
 
-                        if 'guest' in sender_type.lower():
-                            guest_messages.append(body)
-                        elif 'host' in sender_type.lower() or sender_type in ['sent', 'outgoing']:
-                            host_responses.append(body)
+            yield page
+            fetched += len(page)
 
-                    # Create training examples from guest/host pairs
-                    # Each host response after a guest message is a training example
-                    for i, (guest_msg, host_resp) in enumerate(zip(guest_messages, host_responses)):
-                        if len(guest_msg) > 10 and len(host_resp) > 10:  # Skip very short messages
-                            training_examples.append({
-                                'guest_message': guest_msg,
-                                'host_response': host_resp,
-                                'conversation_id': conv_id,
-                                'listing_id': conv.get('listingId', ''),
-                                'guest_name': conv.get('guest', {}).get('firstName', 'Guest')
-                            })
+            if len(page) < size:
+                return
 
-                except Exception as e:
-                    # Skip problematic conversations
-                    continue
+    def _training_snapshot_path(self) -> str:
+        return os.path.join(self.TRAINING_CACHE_DIR, 'training.pkl')
 
-            self._conversation_history = training_examples
-            self._training_loaded = True
+    def _load_training_snapshot(self, limit: int) -> Optional[List[TrainingExample]]:
+        """
+        Load training examples saved by a previous run.
+        Returns None if there is no snapshot, it is older than TRAINING_CACHE_TTL,
+        it uses an older record format, or it was built with a smaller conversation limit.
+        """
+        path = self._training_snapshot_path()
 
-            print(f"Loaded {len(training_examples)} training examples from conversations")
-            return training_examples
+        try:
+            if time.time() - os.path.getmtime(path) > self.TRAINING_CACHE_TTL:
+                return None
 
+            with open(path, 'rb') as f:
+                snapshot = pickle.load(f)
+
+            if snapshot.get('version') != self.TRAINING_SNAPSHOT_VERSION or snapshot.get('limit', 0) < limit:
+                return None
+            return snapshot['examples']
+        except FileNotFoundError:
+            return None
         except Exception as e:
-            print(f"Error loading conversations: {e}")
+            print(f"Error reading training snapshot: {e}")
+            return None
+
+    def _save_training_snapshot(self, training_examples: List[TrainingExample], limit: int):
+        """Write training examples to disk so the next process can skip Guesty"""
+        path = self._training_snapshot_path()
+
+        try:
+            os.makedirs(self.TRAINING_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'version': self.TRAINING_SNAPSHOT_VERSION, 'limit': limit,
+                             'examples': training_examples}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error saving training snapshot: {e}")
+
+    def _extract_training_examples(self, conv: Dict, messages: List[Dict]) -> List[TrainingExample]:
+        """Build guest question -> host response training pairs from a conversation"""
+        if not messages:
             return []
 
+        conv_id = conv.get('_id', '')
+
+        # Build conversation thread (guest question -> host response pairs)
+        guest_messages = []
+        host_responses = []
+
+        for msg in reversed(messages):  # Oldest first
+            sender_type = msg.get('from', msg.get('type', ''))
+            body = msg.get('body', msg.get('text', ''))
+
+            if not body:
+                continue
+
+            if 'guest' in sender_type.lower():
+                guest_messages.append(body)
+            elif 'host' in sender_type.lower() or sender_type in ['sent', 'outgoing']:
+                host_responses.append(body)
+
+        # Create training examples from guest/host pairs
+        # Each host response after a guest message is a training example
+        training_examples = []
+        for guest_msg, host_resp in zip(guest_messages, host_responses):
+            if len(guest_msg) > 10 and len(host_resp) > 10:  # Skip very short messages
+                training_examples.append(TrainingExample(
+                    guest_message=guest_msg,
+                    host_response=host_resp,
+                    conversation_id=conv_id,
+                    listing_id=conv.get('listingId', ''),
+                    guest_name=conv.get('guest', {}).get('firstName', 'Guest')
+                ))
+
+        return training_examples
+
+    def _set_training_data(self, training_examples: List[TrainingExample]):
+        """Split training examples into per-field columns"""
+        self._train_guest_msgs = [ex.guest_message for ex in training_examples]
+        self._train_host_resps = [ex.host_response for ex in training_examples]
+        self._train_conv_ids = np.array([ex.conversation_id for ex in training_examples], dtype=str)
+        self._train_listing_ids = [ex.listing_id for ex in training_examples]
+        self._train_guest_names = [ex.guest_name for ex in training_examples]
+
+        # Build the retrieval index up front so the first guest message doesn't pay for it
+        self._get_training_index()
+
+    @property
+    def _conversation_history(self) -> List[TrainingExample]:
+        """Training data as a list of records (built on demand from the columns)"""
+        return [
+            TrainingExample(*fields) for fields in zip(
+                self._train_guest_msgs, self._train_host_resps, self._train_conv_ids.tolist(),
+                self._train_listing_ids, self._train_guest_names
+            )
+        ]
+
     def get_training_stats(self) -> Dict:
         """Get statistics about loaded training data"""
-        if not self._conversation_history:
+        if not self._train_guest_msgs:
             return {
                 'loaded': False,
                 'total_examples': 0,
                 'unique_conversations': 0
             }
 
-        unique_convs = set(ex['conversation_id'] for ex in self._conversation_history)
-
         return {
             'loaded': True,
-            'total_examples': len(self._conversation_history),
-            'unique_conversations': len(unique_convs),
+            'total_examples': len(self._train_guest_msgs),
+            'unique_conversations': int(np.unique(self._train_conv_ids).size),
             'sample_topics': self._extract_sample_topics()
         }
 
     def _extract_sample_topics(self) -> List[str]:
         """Extract common topics from training data"""
-        topics = []
-        topic_keywords = {
-            'check-in': ['check in', 'checkin', 'arrival', 'arrive', 'access'],
-            'check-out': ['check out', 'checkout', 'departure', 'leave', 'leaving'],
-            'parking': ['parking', 'car', 'garage', 'street parking'],
-            'wifi': ['wifi', 'password', 'internet', 'connection'],
-            'amenities': ['pool', 'gym', 'beach', 'kitchen', 'washer', 'dryer'],
-            'location': ['location', 'address', 'directions', 'nearby', 'restaurant'],
-            'issues': ['broken', 'not working', 'problem', 'issue', 'help']
-        }
-
-        topic_counts = {topic: 0 for topic in topic_keywords}
+        # Seed every topic so ties keep TOPIC_KEYWORDS order in most_common()
+        topic_counts = Counter({f'topic:{topic}': 0 for topic in self.TOPIC_KEYWORDS})
 
-        for example in self._conversation_history[:100]:  # Sample first 100
-            msg = example['guest_message'].lower()
-            for topic, keywords in topic_keywords.items():
-                if any(kw in msg for kw in keywords):
-                    topic_counts[topic] += 1
+        for guest_message in self._train_guest_msgs[:100]:  # Sample first 100
+            hits = self._scan_keywords(guest_message.lower())
+            topic_counts.update(category for category in hits if category.startswith('topic:'))
 
         # Return top topics
-        sorted_topics = sorted(topic_counts.items(), key=lambda x: x[1], reverse=True)
-        return [topic for topic, count in sorted_topics[:5] if count > 0]
+        return [tag[len('topic:'):] for tag, count in topic_counts.most_common(5) if count > 0]
 
     def _build_training_context(self, guest_message: str, limit: int = 5) -> str:
         """
         Build context from similar past conversations for the AI.
         Finds relevant examples to help the AI learn your team's style.
         """
-        if not self._conversation_history:
+        if not self._train_guest_msgs:
             return ""
 
-        message_lower = guest_message.lower()
-
-        # Find relevant examples based on keyword matching
-        relevant_examples = []
-
-        for example in self._conversation_history:
-            score = 0
-            ex_msg = example['guest_message'].lower()
-
-            # Simple keyword matching for relevance
-            msg_words = set(message_lower.split())
-            ex_words = set(ex_msg.split())
-
-            # Common words (excluding very common ones)
-            common_words = msg_words & ex_words
-            stopwords = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'i', 'we', 'you', 'to', 'for', 'of', 'in', 'on', 'at'}
-            meaningful_common = common_words - stopwords
-
-            score = len(meaningful_common)
-
-            if score > 0:
-                relevant_examples.append((score, example))
-
-        # Sort by relevance and take top examples
-        relevant_examples.sort(key=lambda x: x[0], reverse=True)
-        top_examples = relevant_examples[:limit]
-
-        if not top_examples:
+        guest_msgs, postings = self._get_training_index()
+
+        # The result only depends on the message's meaningful words, so messages
+        # with the same bag of words share one cached context
+        words = frozenset(guest_message.lower().split()) - self.TRAINING_STOPWORDS
+        cache_key = (words, limit)
+        cached = self._training_context_cache.get(cache_key)
+        if cached is not None:
+            self._training_context_cache.move_to_end(cache_key)
+            return cached
+
+        # Score = number of meaningful words shared with each example
+        scores = np.zeros(len(guest_msgs), dtype=np.int32)
+        for word in words:
+            indices = postings.get(word)
+            if indices is not None:
+                scores[indices] += 1
+
+        # Take the top examples by relevance (ties keep history order). Only the
+        # selected few are sorted; the rest are partitioned away in linear time.
+        candidates = np.flatnonzero(scores)
+        if candidates.size > limit:
+            # Fold the tie-break into the key: higher score first, then earlier index
+            keys = scores[candidates].astype(np.int64) * len(guest_msgs) - candidates
+            candidates = candidates[np.argpartition(-keys, limit - 1)[:limit]]
+        ranked = candidates[np.lexsort((candidates, -scores[candidates]))]
+
+        training_context = self._format_training_context(guest_msgs, ranked)
+
+        self._training_context_cache[cache_key] = training_context
+        if len(self._training_context_cache) > self.TRAINING_CONTEXT_CACHE_SIZE:
+            self._training_context_cache.popitem(last=False)
+
+        return training_context
+
+    def _format_training_context(self, guest_msgs: List[str], ranked: np.ndarray) -> str:
+        """Format the selected training examples for the system prompt"""
+        if not ranked.size:
             return ""
 
         # Format as training context
         context_parts = ["EXAMPLES FROM YOUR TEAM'S PAST CONVERSATIONS:"]
 
-        for score, example in top_examples:
+        for i in ranked:
             context_parts.append(f"""
 ---
-Guest: "{example['guest_message'][:200]}"
-Your Team's Response: "{example['host_response'][:300]}"
+Guest: "{guest_msgs[i][:200]}"
+Your Team's Response: "{self._train_host_resps[i][:300]}"
 ---""")
 
         context_parts.append("\nUse a similar tone and style as these examples when responding.")
 
         return "\n".join(context_parts)
 
+    def _get_training_index(self) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """
+        Get the inverted word index over training guest messages.
+        Rebuilt whenever the training data is replaced.
+
+        Returns:
+            (guest messages, dict of word -> array of example indices containing it)
+        """
+        guest_msgs = self._train_guest_msgs
+
+        if self._training_index is None or self._training_index[0] is not guest_msgs:
+            postings = {}
+            for i, guest_message in enumerate(guest_msgs):
+                for word in set(guest_message.lower().split()) - self.TRAINING_STOPWORDS:
+                    postings.setdefault(word, []).append(i)
+
+            postings = {word: np.array(indices, dtype=np.int32) for word, indices in postings.items()}
+            self._training_index = (guest_msgs, postings)
+            self._training_context_cache.clear()
+
+        return self._training_index
+
     # ============================================
     # SAVED REPLIES KNOWLEDGE BASE
     # ============================================
@@ -388,19 +920,23 @@ Your Team's Response: "{example['host_response'][:300]}"
         """Load saved replies from Guesty as knowledge base (per listing or global)"""
         cache_key = listing_id or 'global'
 
-        # Cache for 10 minutes
-        cache_valid = (
-            cache_key in self._saved_replies_cache and
-            self._cache_timestamp is not None and
-            (datetime.now() - self._cache_timestamp).seconds < 600 and
-            not force_refresh
-        )
+        # Cache for 10 minutes, tracked separately for each listing
+        entry = self._saved_replies_cache.get(cache_key)
+        if entry and entry[1] > time.monotonic() and not force_refresh:
+            return entry[0]
 
-        if cache_valid:
-            return self._saved_replies_cache.get(cache_key, [])
+        if not force_refresh:
+            cached = self._shared_cache_get(f"sr:{cache_key}")
+            if cached is not None:
+                self._saved_replies_cache[cache_key] = (cached, time.monotonic() + self.SAVED_REPLIES_TTL)
+                return cached
 
         if self.guesty:
             try:
+                if force_refresh:
+                    # Skip the client's own saved-reply cache too
+                    self.guesty.invalidate_saved_replies()
+
                 if listing_id:
                     # Get listing-specific saved replies
                     replies = self.guesty.get_saved_replies_by_listing(listing_id)
@@ -408,8 +944,8 @@ Your Team's Response: "{example['host_response'][:300]}"
                     # Get all saved replies
                     replies = self.guesty.get_saved_replies(limit=200)
 
-                self._saved_replies_cache[cache_key] = replies
-                self._cache_timestamp = datetime.now()
+                self._saved_replies_cache[cache_key] = (replies, time.monotonic() + self.SAVED_REPLIES_TTL)
+                self._shared_cache_set(f"sr:{cache_key}", replies, self.SAVED_REPLIES_TTL)
                 return replies
             except Exception as e:
                 print(f"Error loading saved replies: {e}")
@@ -425,6 +961,18 @@ Your Team's Response: "{example['host_response'][:300]}"
             # Fall back to global replies
             replies = self._load_saved_replies(None)
 
+        # Reuse the rendered text until the saved replies are reloaded
+        cache_key = listing_id or 'global'
+        cached = self._kb_cache.get(cache_key)
+        if cached is not None and cached[0] is replies:
+            return cached[1]
+
+        knowledge_base = self._format_knowledge_base(replies)
+        self._kb_cache[cache_key] = (replies, knowledge_base)
+        return knowledge_base
+
+    def _format_knowledge_base(self, replies: List[Dict]) -> str:
+        """Format saved replies as the KNOWLEDGE BASE prompt section"""
         if not replies:
             return "No saved replies available."
 
@@ -439,21 +987,78 @@ Your Team's Response: "{example['host_response'][:300]}"
 
         return "\n".join(kb_parts)
 
+    # ============================================
+    # KEYWORD SCANNING
+    # ============================================
+
+    def _build_keyword_tags(self) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Map every keyword to the (category, position) pairs it belongs to.
+        Position is the keyword's index in its source list, so hits can be
+        reported in the same order the old per-list loops produced.
+        """
+        groups = {
+            'escalation': self.ESCALATION_KEYWORDS,
+            'negative': self.NEGATIVE_SENTIMENT_WORDS,
+            'web_search': self.WEB_SEARCH_KEYWORDS,
+        }
+        for topic, keywords in self.TOPIC_KEYWORDS.items():
+            groups[f'topic:{topic}'] = keywords
+
+        tags = {}
+        for category, keywords in groups.items():
+            for position, kw in enumerate(keywords):
+                tags.setdefault(kw.lower(), []).append((category, position))
+        return tags
+
+    def _build_keyword_automaton(self):
+        """Compile all keywords into one Aho-Corasick automaton (None if unavailable)"""
+        if ahocorasick is None:
+            return None
+
+        automaton = ahocorasick.Automaton()
+        for kw, tags in self._keyword_tags.items():
+            automaton.add_word(kw, (kw, tags))
+        automaton.make_automaton()
+        return automaton
+
+    def _scan_keywords(self, message_lower: str) -> Dict[str, List[str]]:
+        """
+        Find every known keyword in a lowercased message in one pass.
+
+        Returns:
+            Dict of category -> matched keywords, in source-list order.
+            Categories: escalation, negative, web_search, topic:<name>
+        """
+        hits = {}
+
+        if self._kw_automaton is not None:
+            matches = (value for _, value in self._kw_automaton.iter(message_lower))
+        elif not self._keyword_re.search(message_lower):
+            return hits
+        else:
+            matches = ((kw, tags) for kw, tags in self._keyword_tags.items() if kw in message_lower)
+
+        for kw, tags in matches:
+            for category, position in tags:
+                hits.setdefault(category, {})[kw] = position
+
+        return {category: sorted(found, key=found.get) for category, found in hits.items()}
+
     # ============================================
     # SENTIMENT & INTENT DETECTION
     # ============================================
 
-    def _detect_negative_sentiment(self, message: str) -> Tuple[bool, float, str]:
+    def _detect_negative_sentiment(self, message: str,
+                                   hits: Dict[str, List[str]] = None) -> Tuple[bool, float, str]:
         """
         Detect negative sentiment in guest message.
+        Pass hits from _scan_keywords to skip rescanning the message.
         Returns (is_negative, severity_score, reason)
         """
-        message_lower = message.lower()
-        found_words = []
-
-        for word in self.NEGATIVE_SENTIMENT_WORDS:
-            if word in message_lower:
-                found_words.append(word)
+        if hits is None:
+            hits = self._scan_keywords(message.lower())
+        found_words = hits.get('negative', [])
 
         if not found_words:
             return False, 0.0, ""
@@ -462,25 +1067,26 @@ Your Team's Response: "{example['host_response'][:300]}"
         severity = min(1.0, len(found_words) * 0.3)
 
         # High severity words
-        high_severity = ['scam', 'fraud', 'dangerous', 'unsafe', 'disgusting', 'lied']
-        if any(word in found_words for word in high_severity):
+        if not self.HIGH_SEVERITY_WORDS.isdisjoint(found_words):
             severity = min(1.0, severity + 0.4)
 
         return True, severity, f"Negative sentiment detected: {', '.join(found_words)}"
 
-    def _needs_web_search(self, message: str) -> Tuple[bool, str]:
+    def _needs_web_search(self, message: str, hits: Dict[str, List[str]] = None) -> Tuple[bool, str]:
         """Check if message needs web search for weather/events/transportation"""
-        message_lower = message.lower()
-
-        for keyword in self.WEB_SEARCH_KEYWORDS:
-            if keyword in message_lower:
-                # Determine search type
-                if keyword in ['weather', 'forecast', 'temperature', 'rain', 'sunny']:
-                    return True, 'weather'
-                elif keyword in ['event', 'events', 'concert', 'festival', 'game', 'show']:
-                    return True, 'events'
-                else:
-                    return True, 'transportation'
+        if hits is None:
+            hits = self._scan_keywords(message.lower())
+        keywords = hits.get('web_search')
+
+        if keywords:
+            # Determine search type from the first matching keyword
+            keyword = keywords[0]
+            if keyword in self.WEATHER_KEYWORDS:
+                return True, 'weather'
+            elif keyword in self.EVENT_KEYWORDS:
+                return True, 'events'
+            else:
+                return True, 'transportation'
 
         return False, ""
 
@@ -515,25 +1121,24 @@ Your Team's Response: "{example['host_response'][:300]}"
     # MESSAGE ANALYSIS
     # ============================================
 
-    def _needs_escalation(self, message: str) -> Tuple[bool, str]:
+    def _needs_escalation(self, message: str, hits: Dict[str, List[str]] = None) -> Tuple[bool, str]:
         """Check if message needs immediate escalation to human agent"""
-        message_lower = message.lower()
+        if hits is None:
+            hits = self._scan_keywords(message.lower())
 
         # Check escalation keywords
-        for keyword in self.ESCALATION_KEYWORDS:
-            if keyword in message_lower:
-                return True, f"Message contains sensitive keyword: '{keyword}'"
+        if 'escalation' in hits:
+            return True, f"Message contains sensitive keyword: '{hits['escalation'][0]}'"
 
         # Check negative sentiment
-        is_negative, severity, reason = self._detect_negative_sentiment(message)
+        is_negative, severity, reason = self._detect_negative_sentiment(message, hits)
         if is_negative and severity >= 0.5:
             return True, reason
 
         return False, ""
 
-    def _classify_intent(self, message: str) -> Dict:
-        """Classify guest message intent using Ollama"""
-        system_prompt = """You are a hospitality assistant that classifies guest messages.
+    # System prompt for intent classification
+    CLASSIFY_SYSTEM_PROMPT = """You are a hospitality assistant that classifies guest messages.
         Analyze the message and return a JSON response with:
         - intent: one of [check_in, check_out, amenities, location, parking, wifi, rules, booking, pricing, weather, events, transportation, complaint, other]
         - confidence: 0.0 to 1.0
@@ -543,19 +1148,108 @@ Your Team's Response: "{example['host_response'][:300]}"
 
         Return ONLY valid JSON, no other text."""
 
+    # Appended to the generation prompt so one call returns the reply and its classification
+    GENERATION_JSON_INSTRUCTIONS = """Return ONLY valid JSON with:
+- reply: your message to the guest
+- intent: one of [check_in, check_out, amenities, location, parking, wifi, rules, booking, pricing, weather, events, transportation, complaint, other]
+- confidence: 0.0 to 1.0, how sure you are the reply answers the guest
+- summary: brief summary of the question
+- needs_human: true if this requires human judgment
+- sentiment: one of [positive, neutral, negative]"""
+
+    def _classify_intent(self, message: str) -> Dict:
+        """Classify guest message intent using Ollama"""
+        prompt = f"Classify this guest message:\n\n{message}"
+
+        response = self._call_ollama(prompt, self.CLASSIFY_SYSTEM_PROMPT, temperature=0.1)
+        return self._parse_classification(response, message)
+
+    async def _aclassify_intent(self, message: str) -> Dict:
+        """Async variant of _classify_intent"""
         prompt = f"Classify this guest message:\n\n{message}"
 
-        response = self._call_ollama(prompt, system_prompt, temperature=0.1)
+        response = await self._acall_ollama(prompt, self.CLASSIFY_SYSTEM_PROMPT, temperature=0.1)
+        return self._parse_classification(response, message)
+
+    def _classify_intents_batch(self, messages: List[str], batch_size: int = 8) -> List[Dict]:
+        """
+        Classify many guest messages with one Ollama call per batch.
+
+        Falls back to _classify_intent per message when the model's answer
+        is not a JSON array with one entry per message.
+
+        Args:
+            messages: Guest messages to classify
+            batch_size: Messages per prompt
+
+        Returns:
+            One classification dict per message, in input order
+        """
+        results = []
+
+        for start in range(0, len(messages), batch_size):
+            batch = messages[start:start + batch_size]
+            numbered = "\n".join(f"[{i}] {msg}" for i, msg in enumerate(batch, 1))
+            prompt = (
+                "Classify each guest message. Respond with a JSON array where "
+                "element [i] is the classification for message [i].\n"
+                f"{numbered}"
+            )
+
+            response = self._call_ollama(prompt, self.CLASSIFY_SYSTEM_PROMPT, temperature=0.1)
+            parsed = self._parse_classification_batch(response, batch)
+
+            if parsed is None:
+                parsed = [self._classify_intent(msg) for msg in batch]
+            results.extend(parsed)
+
+        return results
 
-        # Parse JSON response
+    def _parse_classification_batch(self, response: str, batch: List[str]) -> Optional[List[Dict]]:
+        """Parse a batched classifier answer, or None if it doesn't match the batch"""
         try:
-            # Extract JSON from response if wrapped in markdown
-            if "```json" in response:
-                response = response.split("```json")[1].split("```")[0]
-            elif "```" in response:
-                response = response.split("```")[1].split("```")[0]
+            result = self._load_model_json(response, '[')
+        except ValueError:
+            return None
 
-            result = json.loads(response.strip())
+        if not isinstance(result, list) or len(result) != len(batch):
+            return None
+        if not all(isinstance(item, dict) for item in result):
+            return None
+
+        for item, message in zip(result, batch):
+            if 'sentiment' not in item:
+                is_negative, _, _ = self._detect_negative_sentiment(message)
+                item['sentiment'] = 'negative' if is_negative else 'neutral'
+
+        return result
+
+    def classify_training_history(self, limit: int = 200, batch_size: int = 8) -> Dict[str, int]:
+        """
+        Classify guest messages from loaded training data and count intents.
+
+        Args:
+            limit: Max training examples to classify
+            batch_size: Messages per Ollama call
+
+        Returns:
+            Dict of intent -> number of examples
+        """
+        messages = self._train_guest_msgs[:limit]
+        intent_counts = {}
+
+        for classification in self._classify_intents_batch(messages, batch_size=batch_size):
+            intent = classification.get('intent', 'other')
+            intent_counts[intent] = intent_counts.get(intent, 0) + 1
+
+        return intent_counts
+
+    def _parse_classification(self, response: str, message: str) -> Dict:
+        """Parse the classifier JSON output, falling back to a safe default"""
+        try:
+            result = self._load_model_json(response, '{')
+            if not isinstance(result, dict):
+                raise ValueError("Classification is not a JSON object")
 
             # Add sentiment check if not present
             if 'sentiment' not in result:
@@ -572,6 +1266,103 @@ Your Team's Response: "{example['host_response'][:300]}"
                 "sentiment": "neutral"
             }
 
+    def _parse_generation(self, response: str, message: str) -> Tuple[Optional[Dict], str]:
+        """
+        Split a JSON generation answer into (classification, reply).
+        Classification is None when the answer has no usable reply field,
+        in which case the raw text is returned unchanged.
+        """
+        try:
+            result = self._load_model_json(response, '{')
+        except ValueError:
+            return None, response
+
+        if not isinstance(result, dict) or not isinstance(result.get('reply'), str):
+            return None, response
+
+        reply = result.pop('reply').strip()
+        if 'sentiment' not in result:
+            is_negative, _, _ = self._detect_negative_sentiment(message)
+            result['sentiment'] = 'negative' if is_negative else 'neutral'
+
+        return result, reply
+
+    def _plain_reply(self, response: str) -> Optional[str]:
+        """A plain-text generation answer as the reply (None if it's empty or still JSON)"""
+        response = response.strip()
+        if not response:
+            return None
+        try:
+            self._load_model_json(response, '{')
+        except ValueError:
+            return response
+        return None
+
+    def _failed_generation_result(self) -> BotResult:
+        """Escalation for a generation that produced no usable reply"""
+        return BotResult(
+            source="escalated",
+            escalated=True,
+            reason="[ASSIGN TO CS AGENT] AI reply generation failed",
+            assigned_to_agent=True
+        )
+
+    def _load_model_json(self, response: str, opener: str = '{'):
+        """
+        Parse JSON from model output.
+
+        Handles markdown code fences, and falls back to the first balanced
+        {...} / [...] block when the model adds text around the JSON.
+
+        Raises:
+            ValueError: if no JSON could be parsed
+        """
+        # Extract JSON from response if wrapped in markdown
+        if "```json" in response:
+            response = response.split("```json")[1].split("```")[0]
+        elif "```" in response:
+            response = response.split("```")[1].split("```")[0]
+
+        response = response.strip()
+        try:
+            return _json_loads(response)
+        except ValueError:
+            candidate = self._extract_first_json(response, opener)
+            if candidate is None:
+                raise
+            return _json_loads(candidate)
+
+    def _extract_first_json(self, text: str, opener: str = '{') -> Optional[str]:
+        """Slice the first balanced JSON object/array out of text (None if there isn't one)"""
+        closer = '}' if opener == '{' else ']'
+        start = text.find(opener)
+        if start == -1:
+            return None
+
+        depth = 0
+        in_string = False
+        escaped = False
+
+        for i in range(start, len(text)):
+            ch = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == '\\':
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == opener:
+                depth += 1
+            elif ch == closer:
+                depth -= 1
+                if depth == 0:
+                    return text[start:i + 1]
+
+        return None
+
     def _generate_web_search_response(self, message: str, search_type: str, context: Dict = None) -> str:
         """Generate response for queries needing web search info"""
         location = "Miami Beach, FL"  # Default location
@@ -599,54 +1390,56 @@ Your Team's Response: "{example['host_response'][:300]}"
         Returns (matched_reply, match_score) or (None, 0.0)
         """
         # Get saved replies for this listing
-        replies = self._load_saved_replies(listing_id)
-        if not replies:
-            replies = self._load_saved_replies(None)  # Fall back to global
+        index = self._load_reply_index(listing_id)
+        if not index['features']:
+            index = self._load_reply_index(None)  # Fall back to global
 
-        if not replies:
+        if not index['features']:
             return None, 0.0
 
         message_lower = message.lower()
 
+        # Pattern keyword hits only depend on the message, so count them once
+        pattern_hits = {
+            category: sum(1 for keyword in keywords if keyword in message_lower)
+            for category, keywords in self.SAVED_REPLY_PATTERNS.items()
+        }
+
+        # Count title-word / keyword matches per reply from the inverted index
+        title_counts = {}
+        keyword_counts = {}
+        for term in self._find_reply_terms(index, message_lower):
+            for idx, is_keyword in index['terms'][term]:
+                counts = keyword_counts if is_keyword else title_counts
+                counts[idx] = counts.get(idx, 0) + 1
+
+        # Only replies sharing a term or a matched pattern category can score above zero
+        candidates = set(title_counts) | set(keyword_counts)
+        for category, hits in pattern_hits.items():
+            if hits:
+                candidates.update(index['categories'].get(category, ()))
+
         # Build a list of potential matches
         best_match = None
         best_score = 0.0
 
-        for reply in replies:
-            title = reply.get('title', reply.get('name', '')).lower()
-            body = reply.get('body', reply.get('text', '')).lower()
-            keywords = reply.get('keywords', [])
+        for idx in sorted(candidates):  # List order, so ties go to the earlier reply
+            reply, _, _, categories = index['features'][idx]
 
             # Calculate match score
             score = 0.0
 
             # Check title keywords
-            title_words = title.split()
-            for word in title_words:
-                if len(word) > 3 and word in message_lower:
-                    score += 0.2
+            for _ in range(title_counts.get(idx, 0)):
+                score += 0.2
 
             # Check explicit keywords
-            for keyword in keywords:
-                if keyword.lower() in message_lower:
-                    score += 0.3
+            for _ in range(keyword_counts.get(idx, 0)):
+                score += 0.3
 
             # Common question patterns
-            patterns = {
-                'check-in': ['check in', 'checkin', 'check-in', 'arrival', 'arrive'],
-                'check-out': ['check out', 'checkout', 'check-out', 'departure', 'leave'],
-                'wifi': ['wifi', 'wi-fi', 'internet', 'password'],
-                'parking': ['parking', 'park', 'car', 'garage'],
-                'amenities': ['amenities', 'amenity', 'pool', 'gym', 'kitchen'],
-                'location': ['location', 'address', 'directions', 'where'],
-                'rules': ['rules', 'policy', 'policies', 'allowed', 'smoking', 'pets']
-            }
-
-            for category, keywords in patterns.items():
-                if category in title.lower() or category in body[:100].lower():
-                    for keyword in keywords:
-                        if keyword in message_lower:
-                            score += 0.25
+            for category in categories:
+                score += 0.25 * pattern_hits[category]
 
             if score > best_score:
                 best_score = score
@@ -657,11 +1450,78 @@ Your Team's Response: "{example['host_response'][:300]}"
 
         return best_match, best_score
 
+    def _load_reply_index(self, listing_id: str = None) -> Dict:
+        """
+        Get saved replies with match features and an inverted index precomputed.
+        Rebuilt whenever _load_saved_replies returns a new list.
+
+        Returns:
+            Dict with:
+            - features: list of (reply, title_words, keywords, pattern_categories)
+            - terms: title word / keyword -> [(reply index, is_keyword), ...]
+            - categories: pattern category -> [reply index, ...]
+            - automaton: Aho-Corasick automaton over terms (None if unavailable)
+        """
+        replies = self._load_saved_replies(listing_id)
+        cache_key = listing_id or 'global'
+
+        cached = self._reply_index.get(cache_key)
+        if cached is not None and cached[0] is replies:
+            return cached[1]
+
+        features = [self._build_reply_features(reply) for reply in replies]
+        terms = {}
+        categories = {}
+
+        for idx, (_, title_words, keywords, reply_categories) in enumerate(features):
+            for word in title_words:
+                terms.setdefault(word, []).append((idx, False))
+            for keyword in keywords:
+                terms.setdefault(keyword, []).append((idx, True))
+            for category in reply_categories:
+                categories.setdefault(category, []).append(idx)
+
+        automaton = None
+        if ahocorasick is not None and terms:
+            automaton = ahocorasick.Automaton()
+            for term in terms:
+                if term:
+                    automaton.add_word(term, term)
+            automaton.make_automaton()
+
+        index = {'features': features, 'terms': terms, 'categories': categories, 'automaton': automaton}
+        self._reply_index[cache_key] = (replies, index)
+        return index
+
+    def _find_reply_terms(self, index: Dict, message_lower: str) -> set:
+        """Reply title words / keywords that occur (as substrings) in the message"""
+        if index['automaton'] is None:
+            return {term for term in index['terms'] if term in message_lower}
+
+        found = {term for _, term in index['automaton'].iter(message_lower)}
+        if '' in index['terms']:
+            found.add('')  # An empty keyword matches everything, as with `in`
+        return found
+
+    def _build_reply_features(self, reply: Dict) -> Tuple:
+        """Lowercase and tokenize a saved reply once for _match_saved_reply"""
+        title = reply.get('title', reply.get('name', '')).lower()
+        body_start = reply.get('body', reply.get('text', '')).lower()[:100]
+
+        title_words = tuple(word for word in title.split() if len(word) > 3)
+        keywords = tuple(keyword.lower() for keyword in reply.get('keywords', []))
+        categories = tuple(
+            category for category in self.SAVED_REPLY_PATTERNS
+            if category in title or category in body_start
+        )
+
+        return reply, title_words, keywords, categories
+
     # ============================================
     # RESPONSE GENERATION
     # ============================================
 
-    def generate_response(self, guest_message: str, context: Dict = None) -> Dict:
+    def generate_response(self, guest_message: str, context: Dict = None) -> BotResult:
         """
         Generate a response to a guest message.
 
@@ -673,116 +1533,280 @@ Your Team's Response: "{example['host_response'][:300]}"
         5. Low confidence → Escalate to human agent
 
         Returns:
-            Dict with response details, confidence, source, escalation status
+            BotResult with response details, confidence, source, escalation status
+        """
+        early_result = self._pre_llm_response(guest_message, context)
+        if early_result is not None:
+            return early_result
+
+        # Same question for the same listing already answered by the AI
+        cache_key = self._response_cache_key(guest_message, context)
+        cached = self._get_cached_response(cache_key, context)
+        if cached is not None:
+            return cached
+
+        # STEP 4: Generate the AI response and its classification in one call
+        system_prompt, prompt, num_keep = self._build_generation_prompts(guest_message, context)
+        raw = self._call_ollama(prompt, system_prompt, temperature=0.3, num_keep=num_keep,
+                                response_format="json")
+
+        classification, response = self._parse_generation(raw, guest_message)
+        if classification is None:
+            # No reply field in the JSON answer - retry once without format, never send the JSON itself
+            raw = self._call_ollama(prompt, system_prompt, temperature=0.3, num_keep=num_keep)
+            classification, response = self._parse_generation(raw, guest_message)
+            if classification is None:
+                response = self._plain_reply(raw)
+                if response is None:
+                    return self._failed_generation_result()
+                classification = self._classify_intent(guest_message)
+
+        escalation = self._classification_escalation(classification)
+        if escalation is not None:
+            return escalation
+
+        result = self._finalize_ai_response(classification, response)
+        self._cache_response(cache_key, result, context)
+        return result
+
+    async def agenerate_response(self, guest_message: str, context: Dict = None) -> BotResult:
+        """
+        Async variant of generate_response.
+        The reply is discarded if its classification escalates the message.
+        """
+        # Pre-LLM checks can load saved replies from Guesty/Redis (blocking), so keep them off the loop
+        early_result = await asyncio.to_thread(self._pre_llm_response, guest_message, context)
+        if early_result is not None:
+            return early_result
+
+        cache_key = self._response_cache_key(guest_message, context)
+        cached = self._get_cached_response(cache_key, context)
+        if cached is not None:
+            return cached
+
+        # The knowledge base may fall back to the global saved replies, another blocking load
+        system_prompt, prompt, num_keep = await asyncio.to_thread(
+            self._build_generation_prompts, guest_message, context
+        )
+
+        raw = await self._acall_ollama(prompt, system_prompt, temperature=0.3, num_keep=num_keep,
+                                       response_format="json")
+
+        classification, response = self._parse_generation(raw, guest_message)
+        if classification is None:
+            raw = await self._acall_ollama(prompt, system_prompt, temperature=0.3, num_keep=num_keep)
+            classification, response = self._parse_generation(raw, guest_message)
+            if classification is None:
+                response = self._plain_reply(raw)
+                if response is None:
+                    return self._failed_generation_result()
+                classification = await self._aclassify_intent(guest_message)
+
+        escalation = self._classification_escalation(classification)
+        if escalation is not None:
+            return escalation
+
+        result = self._finalize_ai_response(classification, response)
+        self._cache_response(cache_key, result, context)
+        return result
+
+    def _response_cache_key(self, guest_message: str, context: Dict = None) -> str:
+        """
+        Hash of the normalized message (case/punctuation/spacing folded), its listing
+        and the guest name. Names aren't rewritten in cached drafts, since they can
+        also be ordinary words ("Guest parking", "May", "Grace").
+        """
+        context = context or {}
+        normalized = ' '.join(re.sub(r'[^\w\s]', ' ', guest_message.lower()).split())
+        listing_id = context.get('listing_id') or ''
+        guest_name = context.get('guest_name') or ''
+        return hashlib.blake2b(f"{normalized}\x00{listing_id}\x00{guest_name}".encode(),
+                               digest_size=16).hexdigest()
+
+    def _get_cached_response(self, cache_key: str, context: Dict = None) -> Optional[BotResult]:
+        """Look up a cached AI result, with this conversation's stay dates"""
+        entry = self._response_cache.get(cache_key)
+        if entry is None:
+            return None
+
+        result = self._personalize_response(entry[0], entry[1], context)
+        if result is not None:
+            self._response_cache.move_to_end(cache_key)
+            self._response_cache_hits += 1
+        return result
+
+    def _cache_response(self, cache_key: str, result: BotResult, context: Dict = None):
+        """Remember an AI result; failed generations (empty response) aren't cached"""
+        if result.source != 'ai' or not result.response:
+            return
+
+        self._response_cache[cache_key] = (result, context or {})
+        self._response_cache.move_to_end(cache_key)
+        if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+
+    def _personalize_response(self, result: BotResult, cached_context: Dict,
+                              context: Dict = None) -> Optional[BotResult]:
+        """
+        Swap the stay dates a cached draft was written with for this conversation's.
+        Returns None if the draft mentions a date this conversation doesn't have.
+        """
+        context = context or {}
+        response = result.response
+
+        for field in ('check_in', 'check_out'):
+            old, new = cached_context.get(field), context.get(field)
+            if not old or old == new:
+                continue
+
+            pattern = rf'\b{re.escape(str(old))}\b'
+            if not new:
+                if re.search(pattern, response):
+                    return None
+                continue
+            response = re.sub(pattern, lambda _, new=str(new): new, response)
+
+        return result if response == result.response else result._replace(response=response)
+
+    def _pre_llm_response(self, guest_message: str, context: Dict = None) -> Optional[BotResult]:
+        """
+        Run the checks that don't need the LLM (steps 1-3).
+        Returns a final result, or None if the message needs AI generation.
         """
         listing_id = context.get('listing_id') if context else None
 
         # Check if bot is enabled for this listing (if listing_id provided)
         if listing_id and not self.is_bot_enabled(listing_id):
-            return {
-                "response": None,
-                "confidence": 0.0,
-                "source": "disabled",
-                "escalated": True,
-                "reason": "Bot not enabled for this listing",
-                "sentiment": "unknown",
-                "assigned_to_agent": False
-            }
-
-        # STEP 1: Detect negative sentiment first - always escalate
-        is_negative, severity, sentiment_reason = self._detect_negative_sentiment(guest_message)
+            return BotResult(
+                source="disabled",
+                escalated=True,
+                reason="Bot not enabled for this listing",
+                sentiment="unknown"
+            )
 
-        if is_negative:
-            return {
-                "response": None,
-                "confidence": 0.0,
-                "source": "escalated",
-                "escalated": True,
-                "reason": f"[ASSIGN TO CS AGENT] {sentiment_reason}",
-                "sentiment": "negative",
-                "assigned_to_agent": True
-            }
+        # One keyword scan serves the escalation, sentiment and web-search checks
+        hits = self._scan_keywords(guest_message.lower())
+
+        # Most messages contain no sensitive words - skip the escalation checks
+        if 'negative' in hits or 'escalation' in hits:
+            # STEP 1: Detect negative sentiment first - always escalate
+            is_negative, severity, sentiment_reason = self._detect_negative_sentiment(guest_message, hits)
+
+            if is_negative:
+                return BotResult(
+                    source="escalated",
+                    escalated=True,
+                    reason=f"[ASSIGN TO CS AGENT] {sentiment_reason}",
+                    sentiment="negative",
+                    assigned_to_agent=True
+                )
 
-        # Check for escalation keywords
-        needs_escalation, reason = self._needs_escalation(guest_message)
-        if needs_escalation:
-            return {
-                "response": None,
-                "confidence": 0.0,
-                "source": "escalated",
-                "escalated": True,
-                "reason": f"[ASSIGN TO CS AGENT] {reason}",
-                "sentiment": "negative",
-                "assigned_to_agent": True
-            }
+            # Check for escalation keywords
+            needs_escalation, reason = self._needs_escalation(guest_message, hits)
+            if needs_escalation:
+                return BotResult(
+                    source="escalated",
+                    escalated=True,
+                    reason=f"[ASSIGN TO CS AGENT] {reason}",
+                    sentiment="negative",
+                    assigned_to_agent=True
+                )
 
         # STEP 2: Try to match saved replies first (highest priority)
         matched_reply, match_score = self._match_saved_reply(guest_message, listing_id)
 
-        if matched_reply and match_score >= 0.6:
-            # Good match found in saved replies
+        if matched_reply and match_score >= self.SAVED_REPLY_MATCH_THRESHOLD:
+            # Good match found in saved replies - no classification or generation needed
+            self._llm_calls_saved += 1
             reply_body = matched_reply.get('body', matched_reply.get('text', ''))
-            return {
-                "response": reply_body,
-                "confidence": match_score,
-                "source": "saved_reply",
-                "escalated": False,
-                "reason": None,
-                "sentiment": "neutral",
-                "assigned_to_agent": False,
-                "matched_reply_title": matched_reply.get('title', 'Untitled')
-            }
+            return BotResult(
+                response=reply_body,
+                confidence=match_score,
+                source="saved_reply",
+                matched_reply_title=matched_reply.get('title', 'Untitled')
+            )
 
         # STEP 3: Check if web info can help (weather, events, transportation)
-        needs_web, search_type = self._needs_web_search(guest_message)
+        needs_web, search_type = self._needs_web_search(guest_message, hits)
         if needs_web:
             response = self._generate_web_search_response(guest_message, search_type, context)
+            self._llm_calls_saved += 1
             # Web info responses are >= 75% effective for these topics
-            return {
-                "response": response,
-                "confidence": 0.85,
-                "source": "web_info",
-                "escalated": False,
-                "reason": None,
-                "sentiment": "neutral",
-                "assigned_to_agent": False
-            }
+            return BotResult(response=response, confidence=0.85, source="web_info")
+
+        return None
 
-        # STEP 4: Classify intent and generate AI response
-        classification = self._classify_intent(guest_message)
+    def _classification_escalation(self, classification: Dict) -> Optional[BotResult]:
+        """Return an escalation result if the AI classification requires a human"""
         sentiment = classification.get('sentiment', 'neutral')
 
         # Double-check sentiment from classification
         if sentiment == 'negative':
-            return {
-                "response": None,
-                "confidence": classification.get('confidence', 0.0),
-                "source": "escalated",
-                "escalated": True,
-                "reason": "[ASSIGN TO CS AGENT] Negative sentiment detected by AI classifier",
-                "sentiment": "negative",
-                "assigned_to_agent": True
-            }
+            return BotResult(
+                confidence=classification.get('confidence', 0.0),
+                source="escalated",
+                escalated=True,
+                reason="[ASSIGN TO CS AGENT] Negative sentiment detected by AI classifier",
+                sentiment="negative",
+                assigned_to_agent=True
+            )
 
         if classification.get('needs_human'):
-            return {
-                "response": None,
-                "confidence": classification.get('confidence', 0.0),
-                "source": "escalated",
-                "escalated": True,
-                "reason": f"Requires human judgment: {classification.get('summary', '')}",
-                "sentiment": sentiment,
-                "assigned_to_agent": False
-            }
+            return BotResult(
+                confidence=classification.get('confidence', 0.0),
+                source="escalated",
+                escalated=True,
+                reason=f"Requires human judgment: {classification.get('summary', '')}",
+                sentiment=sentiment
+            )
 
-        # Build knowledge base from saved replies for AI context
-        knowledge_base = self._build_knowledge_base(listing_id)
+        return None
+
+    def _build_generation_prompts(self, guest_message: str, context: Dict = None) -> Tuple[str, str, int]:
+        """
+        Build (system_prompt, prompt, num_keep) for the AI response draft.
+        num_keep is a rough token count (~4 chars/token) of the static prefix.
+        """
+        listing_id = context.get('listing_id') if context else None
 
         # Build training context from past conversations
         training_context = self._build_training_context(guest_message)
 
-        # Generate response using Ollama with saved replies context and brand personality
-        system_prompt = f"""{self.BRAND_PERSONALITY}
+        # Stable prefix (personality + saved replies) first so Ollama can reuse its
+        # prompt cache up to the separator; per-message examples go after it
+        system_prefix = self._get_system_prefix(listing_id)
+        system_prompt = f"""{system_prefix}---
+{training_context}
+"""
+
+        prompt = f"""CURRENT GUEST CONTEXT:
+{json.dumps(context or {}, indent=2)}
+
+Guest says: "{guest_message}"
+
+Respond naturally, like you're texting a friend who's staying at your place. Keep it helpful and brief.
+
+{self.GENERATION_JSON_INSTRUCTIONS}"""
+
+        return system_prompt, prompt, len(system_prefix) // 4
+
+    def _get_system_prefix(self, listing_id: str = None) -> str:
+        """
+        Get the static part of the generation system prompt for a listing.
+        Memoized until the listing's saved replies are reloaded.
+        """
+        # Get listing-specific replies first, then global
+        replies = self._load_saved_replies(listing_id) or self._load_saved_replies(None)
+        cache_key = listing_id or 'global'
+
+        cached = self._system_prefix_cache.get(cache_key)
+        if cached is not None and cached[0] is replies:
+            return cached[1]
+
+        # Build knowledge base from saved replies for AI context
+        knowledge_base = self._build_knowledge_base(listing_id)
+
+        prefix = f"""{self.BRAND_PERSONALITY}
 
 PRIORITY ORDER FOR RESPONDING:
 1. Use saved replies from KNOWLEDGE BASE below if they match
@@ -790,58 +1814,44 @@ PRIORITY ORDER FOR RESPONDING:
 3. Reference the CONVERSATION EXAMPLES to match your team's style
 4. If you can't answer confidently, say: "Let me check with the team and get back to you on that."
 
+Remember: Be conversational, not corporate. You're helping a guest, not writing a formal letter.
+
 KNOWLEDGE BASE (Saved Replies):
 {knowledge_base}
-
-{training_context}
-
-CURRENT GUEST CONTEXT:
-{json.dumps(context or {}, indent=2)}
-
-Remember: Be conversational, not corporate. You're helping a guest, not writing a formal letter.
 """
+        self._system_prefix_cache[cache_key] = (replies, prefix)
+        return prefix
 
-        prompt = f"Guest says: \"{guest_message}\"\n\nRespond naturally, like you're texting a friend who's staying at your place. Keep it helpful and brief:"
-
-        response = self._call_ollama(prompt, system_prompt, temperature=0.3)
+    def _finalize_ai_response(self, classification: Dict, response: str) -> BotResult:
+        """Apply confidence/deferral checks to an AI-generated response"""
+        sentiment = classification.get('sentiment', 'neutral')
 
         # Calculate effectiveness score
         confidence = classification.get('confidence', 0.5)
 
         # If AI had to defer to team, escalate
         if "connect you with our team" in response.lower():
-            return {
-                "response": response,
-                "confidence": confidence,
-                "source": "ai",
-                "escalated": True,
-                "reason": "Unable to answer from knowledge base - needs human review",
-                "sentiment": sentiment,
-                "assigned_to_agent": False
-            }
+            return BotResult(
+                response=response,
+                confidence=confidence,
+                escalated=True,
+                reason="Unable to answer from knowledge base - needs human review",
+                sentiment=sentiment
+            )
 
         # STEP 5: Check confidence threshold (75%)
         if confidence < 0.75:
-            return {
-                "response": response,
-                "confidence": confidence,
-                "source": "ai",
-                "escalated": True,
-                "reason": f"[ASSIGN TO CS AGENT] Low confidence ({confidence:.0%})",
-                "sentiment": sentiment,
-                "assigned_to_agent": True
-            }
+            return BotResult(
+                response=response,
+                confidence=confidence,
+                escalated=True,
+                reason=f"[ASSIGN TO CS AGENT] Low confidence ({confidence:.0%})",
+                sentiment=sentiment,
+                assigned_to_agent=True
+            )
 
         # High confidence AI response
-        return {
-            "response": response,
-            "confidence": confidence,
-            "source": "ai",
-            "escalated": False,
-            "reason": None,
-            "sentiment": sentiment,
-            "assigned_to_agent": False
-        }
+        return BotResult(response=response, confidence=confidence, sentiment=sentiment)
 
     # ============================================
     # CONVERSATION HANDLING
@@ -863,90 +1873,141 @@ Remember: Be conversational, not corporate. You're helping a guest, not writing
             return {"error": "Guesty client not configured"}
 
         try:
-            # Get conversation details
-            conversation = self.guesty.get_conversation(conversation_id)
-            messages = self.guesty.get_conversation_messages(conversation_id, limit=10)
-
-            if not messages:
-                return {"error": "No messages in conversation"}
-
-            # Get latest guest message
-            latest_message = None
-            for msg in messages:
-                if msg.get('from') == 'guest' or msg.get('type') == 'fromGuest':
-                    latest_message = msg
-                    break
+            message, context = self._load_conversation_input(conversation_id)
+            if context is None:
+                return message
 
-            if not latest_message:
-                return {"info": "No new guest messages"}
-
-            # Build context
-            listing_id = conversation.get('listingId')
-            context = {
-                "guest_name": conversation.get('guest', {}).get('firstName', 'Guest'),
-                "listing_id": listing_id,
-                "check_in": conversation.get('checkIn'),
-                "check_out": conversation.get('checkOut'),
-                "listing_address": conversation.get('listing', {}).get('address', {}).get('city', 'Miami Beach, FL')
-            }
+            result = self.generate_response(message, context)
+            return self._act_on_result(conversation_id, result, auto_respond)
 
-            # Generate response
-            result = self.generate_response(
-                latest_message.get('body', latest_message.get('text', '')),
-                context
-            )
+        except Exception as e:
+            return {"error": str(e)}
 
-            # Handle response based on result
-            if result.get('assigned_to_agent'):
-                # Negative sentiment or escalation - assign to human agent
-                assignment = self.assign_to_agent(
-                    conversation_id,
-                    result.get('reason', 'Requires human attention')
-                )
-                return {
-                    "action": "assigned_to_agent",
-                    "reason": result['reason'],
-                    "sentiment": result.get('sentiment', 'unknown'),
-                    "assignment_result": assignment
-                }
-
-            elif result['escalated']:
-                # Create draft for human review (but not urgent)
-                if result['response']:
-                    self.guesty.create_draft_message(conversation_id, result['response'])
-                return {
-                    "action": "escalated",
-                    "reason": result['reason'],
-                    "draft_created": result['response'] is not None,
-                    "response": result['response'],
-                    "sentiment": result.get('sentiment', 'neutral')
-                }
-
-            elif auto_respond and result['confidence'] >= 0.8:
-                # Auto-send high confidence responses
-                self.guesty.send_message(conversation_id, result['response'])
-                return {
-                    "action": "auto_responded",
-                    "response": result['response'],
-                    "confidence": result['confidence'],
-                    "source": result.get('source', 'ai'),
-                    "sentiment": result.get('sentiment', 'neutral')
-                }
+    async def aprocess_conversation(self, conversation_id: str,
+                                    auto_respond: bool = False) -> Dict:
+        """Async variant of process_conversation (Guesty calls run in worker threads)"""
+        if not self.guesty:
+            return {"error": "Guesty client not configured"}
 
-            else:
-                # Create draft for review
-                self.guesty.create_draft_message(conversation_id, result['response'])
-                return {
-                    "action": "draft_created",
-                    "response": result['response'],
-                    "confidence": result['confidence'],
-                    "source": result.get('source', 'ai'),
-                    "sentiment": result.get('sentiment', 'neutral')
-                }
+        try:
+            message, context = await asyncio.to_thread(self._load_conversation_input, conversation_id)
+            if context is None:
+                return message
+
+            result = await self.agenerate_response(message, context)
+            return await asyncio.to_thread(self._act_on_result, conversation_id, result, auto_respond)
 
         except Exception as e:
             return {"error": str(e)}
 
+    async def process_conversations(self, conversation_ids: List[str], auto_respond: bool = False,
+                                    concurrency: int = 16) -> Dict[str, Dict]:
+        """
+        Process many conversations concurrently.
+        Guesty fetches, Ollama generations and replies of different conversations overlap.
+
+        Args:
+            conversation_ids: Guesty conversation IDs
+            auto_respond: If True, auto-send high-confidence responses
+            concurrency: Maximum conversations in flight
+
+        Returns:
+            Processing result per conversation ID
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def process(conversation_id: str) -> Dict:
+            async with semaphore:
+                return await self.aprocess_conversation(conversation_id, auto_respond)
+
+        results = await asyncio.gather(*[process(cid) for cid in conversation_ids])
+        return dict(zip(conversation_ids, results))
+
+    def _load_conversation_input(self, conversation_id: str) -> Tuple[Any, Optional[Dict]]:
+        """
+        Fetch a conversation and pick the message to answer.
+
+        Returns:
+            (latest guest message, context), or (result dict, None) when there is nothing to answer
+        """
+        # Get conversation details
+        conversation = self.guesty.get_conversation(conversation_id)
+        messages = self.guesty.get_conversation_messages(conversation_id, limit=10)
+
+        if not messages:
+            return {"error": "No messages in conversation"}, None
+
+        # Get latest guest message
+        latest_message = next(
+            (msg for msg in messages if msg.get('from') == 'guest' or msg.get('type') == 'fromGuest'),
+            None
+        )
+
+        if not latest_message:
+            return {"info": "No new guest messages"}, None
+
+        # Build context
+        context = {
+            "guest_name": _dig(conversation, 'guest', 'firstName', default='Guest'),
+            "listing_id": conversation.get('listingId'),
+            "check_in": conversation.get('checkIn'),
+            "check_out": conversation.get('checkOut'),
+            "listing_address": _dig(conversation, 'listing', 'address', 'city', default='Miami Beach, FL')
+        }
+
+        return latest_message.get('body', latest_message.get('text', '')), context
+
+    def _act_on_result(self, conversation_id: str, result: BotResult, auto_respond: bool) -> Dict:
+        """Assign, draft or send a generated response in Guesty"""
+        response = result.response
+        reason = result.reason
+
+        # Handle response based on result
+        if result.assigned_to_agent:
+            # Negative sentiment or escalation - assign to human agent
+            assignment = self.assign_to_agent(
+                conversation_id,
+                reason or 'Requires human attention'
+            )
+            return {
+                "action": "assigned_to_agent",
+                "reason": reason,
+                "sentiment": result.sentiment,
+                "assignment_result": assignment
+            }
+
+        sentiment = result.sentiment
+
+        if result.escalated:
+            # Create draft for human review (but not urgent)
+            if response:
+                self.guesty.create_draft_message(conversation_id, response)
+            return {
+                "action": "escalated",
+                "reason": reason,
+                "draft_created": response is not None,
+                "response": response,
+                "sentiment": sentiment
+            }
+
+        confidence = result.confidence
+        auto_send = auto_respond and confidence >= 0.8
+
+        if auto_send:
+            # Auto-send high confidence responses
+            self.guesty.send_message(conversation_id, response)
+        else:
+            # Create draft for review
+            self.guesty.create_draft_message(conversation_id, response)
+
+        return {
+            "action": "auto_responded" if auto_send else "draft_created",
+            "response": response,
+            "confidence": confidence,
+            "source": result.source,
+            "sentiment": sentiment
+        }
+
     # ============================================
     # UTILITY METHODS
     # ============================================
@@ -968,10 +2029,12 @@ Remember: Be conversational, not corporate. You're helping a guest, not writing
             "saved_replies_count": len(replies),
             "confidence_threshold": self.CONFIDENCE_THRESHOLD,
             "training_loaded": training_stats.get('loaded', False),
-            "training_examples": training_stats.get('total_examples', 0)
+            "training_examples": training_stats.get('total_examples', 0),
+            "llm_calls_saved": self._llm_calls_saved,
+            "response_cache_hits": self._response_cache_hits
         }
 
-    def test_response(self, message: str) -> Dict:
+    def test_response(self, message: str) -> BotResult:
         """Test response generation without sending"""
         return self.generate_response(message)
 
@@ -980,12 +2043,23 @@ Remember: Be conversational, not corporate. You're helping a guest, not writing
 # HELPER FUNCTIONS
 # ============================================
 
+_warm_up_started = False
+
+
 def get_ai_bot(guesty_client=None) -> CasitaAIBot:
-    """Get AI Bot instance"""
+    """Get AI Bot instance (the first one also warms up the model in the background)"""
+    global _warm_up_started
+
     if guesty_client is None:
         from guesty_api import get_guesty_client
         guesty_client = get_guesty_client()
-    return CasitaAIBot(guesty_client)
+    bot = CasitaAIBot(guesty_client)
+
+    if not _warm_up_started:
+        _warm_up_started = True
+        threading.Thread(target=bot.warm_up, daemon=True).start()
+
+    return bot
 
 
 def test_ollama_connection() -> bool:
@@ -1019,14 +2093,20 @@ if __name__ == "__main__":
             "What's the wifi password?",
         ]
 
-        for msg in test_messages:
+        async def run_test_messages():
+            # Send all test messages at once instead of waiting on each in turn
+            try:
+                return await asyncio.gather(*[bot.agenerate_response(msg) for msg in test_messages])
+            finally:
+                await bot.aclose()
+
+        for msg, result in zip(test_messages, asyncio.run(run_test_messages())):
             print(f"\nGuest: {msg}")
-            result = bot.test_response(msg)
-            print(f"Response: {result.get('response', 'N/A')}")
-            print(f"Confidence: {result['confidence']:.2f}")
-            print(f"Escalated: {result['escalated']}")
-            if result.get('reason'):
-                print(f"Reason: {result['reason']}")
+            print(f"Response: {result.response}")
+            print(f"Confidence: {result.confidence:.2f}")
+            print(f"Escalated: {result.escalated}")
+            if result.reason:
+                print(f"Reason: {result.reason}")
     else:
         print("\nOllama not available. Please ensure Ollama is running with a model.")
         print("Run: ollama pull llama3.2")
@@ -5,25 +5,80 @@ from amadeus import Client
 import hotel_intel
 import os
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import date
 import bcrypt
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # --- NEW: SECURITY LOGIC ---
+@st.cache_resource
+def get_auth_db():
+    # One connection shared by all reruns/sessions; sqlite keeps the prepared SELECT cached on it.
+    # Its lock is cached with it: a module-level Lock would be recreated on every rerun.
+    conn = sqlite3.connect('casita.db', check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn, threading.Lock()
+
+@st.cache_resource
+def get_hash_pool():
+    # bcrypt releases the GIL while hashing; two workers cap CPU spent on concurrent logins
+    return ThreadPoolExecutor(max_workers=2)
+
 def verify_user(email, password):
-    conn = sqlite3.connect('casita.db')
-    c = conn.cursor()
-    c.execute("SELECT password_hash FROM users WHERE email=?", (email,))
-    result = c.fetchone()
-    conn.close()
+    conn, lock = get_auth_db()
+    with lock:
+        result = conn.execute(
+            "SELECT password_hash FROM users WHERE email=?", (email,)
+        ).fetchone()
     
     if result:
         stored_hash = result[0]
+        # Hashes stored as BLOB come back as bytes already
+        if isinstance(stored_hash, str):
+            stored_hash = stored_hash.encode('utf-8')
         # Check password against stored hash (bytes comparison)
-        return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+        future = get_hash_pool().submit(bcrypt.checkpw, password.encode('utf-8'), stored_hash)
+        try:
+            return future.result(timeout=5)
+        except FutureTimeoutError:
+            # Pool backed up: drop the queued check and let the caller ask for a retry,
+            # rather than reporting a correct password as invalid
+            future.cancel()
+            raise
     return False
 
+# --- CACHED AMADEUS LOOKUPS ---
+# Streamlit reruns the whole script on every widget event; reuse recent API results.
+# The leading underscore keeps the client object out of the cache key.
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_monitored_leads(_amadeus):
+    hotels = hotel_intel.get_monitored_leads(_amadeus)
+    # Lowercased names, parallel to hotels, so the search box doesn't re-lower them per keystroke
+    names_lower = [h['hotel']['name'].lower() for h in hotels]
+    return hotels, names_lower
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_60_day_insight(_amadeus, hotel_id, day_bucket):
+    # day_bucket (today's date) rolls the 60-day window over at midnight
+    return hotel_intel.get_60_day_insight(_amadeus, hotel_id)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_room_figures(room_df):
+    # Streamlit hashes the DataFrame contents, so unchanged rooms reuse their figures
+    fig_p = px.line(room_df, x="Date", y="Rate_Float", 
+                   title="Price Trend ($)", 
+                   color_discrete_sequence=["#FFA500"])
+    fig_i = px.bar(room_df, x="Date", y="Rooms Available", 
+                  title="Units Available",
+                  color_discrete_sequence=["#0078D4"])
+    fig_i.add_hline(y=10, line_dash="dash", line_color="red", annotation_text="Target: 10")
+    return fig_p, fig_i
+
 # --- UI: INITIAL STATE ---
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False  # Set to False by default now
@@ -40,11 +95,18 @@ if not st.session_state.logged_in:
         submit = st.form_submit_button("Log In", use_container_width=True)
         
         if submit:
-            if verify_user(email, password):
+            try:
+                verified = verify_user(email, password)
+            except FutureTimeoutError:
+                verified = None
+
+            if verified:
                 st.session_state.logged_in = True
                 st.session_state.user_email = email
                 st.success("Access Granted")
                 st.rerun()
+            elif verified is None:
+                st.error("Login is busy right now, please try again in a moment")
             else:
                 st.error("Invalid credentials")
     st.stop() # Prevents the rest of the app from loading
@@ -83,9 +145,10 @@ with st.sidebar:
     st.divider()
     
     st.subheader("Monitored Properties")
-    all_hotels = hotel_intel.get_monitored_leads(amadeus)
+    all_hotels, names_lower = cached_monitored_leads(amadeus)
     
-    filtered = [h for h in all_hotels if search_query.lower() in h['hotel']['name'].lower()]
+    q = search_query.lower()
+    filtered = [all_hotels[i] for i, name in enumerate(names_lower) if q in name] if q else all_hotels
     
     with st.container(height=800, border=False):
         if filtered:
@@ -121,31 +184,27 @@ if not st.session_state.logged_in:
 if st.session_state.selected_hotel_id:
     st.header(st.session_state.current_hotel_name)
     
-    df = hotel_intel.get_60_day_insight(amadeus, st.session_state.selected_hotel_id)
+    df = cached_60_day_insight(amadeus, st.session_state.selected_hotel_id, date.today().isoformat())
     
     if not df.empty:
-        room_types = list(df["Unit Type"].unique())
+        # Split by unit type once (in first-seen order) instead of re-filtering per tab
+        room_dfs = dict(tuple(df.groupby("Unit Type", sort=False)))
+        room_types = list(room_dfs)
         tabs = st.tabs(room_types)
 
         for i, tab in enumerate(tabs):
             with tab:
                 current_room = room_types[i]
-                room_df = df[df["Unit Type"] == current_room]
+                room_df = room_dfs[current_room]
+                fig_p, fig_i = build_room_figures(room_df)
 
                 # 1. VISUAL INTELLIGENCE (Fixed with Unique Keys)
                 c1, c2 = st.columns(2)
                 with c1:
-                    fig_p = px.line(room_df, x="Date", y="Rate_Float", 
-                                   title="Price Trend ($)", 
-                                   color_discrete_sequence=["#FFA500"])
                     # Added unique key using room name and index
                     st.plotly_chart(fig_p, use_container_width=True, key=f"price_chart_{current_room}_{i}")
                 
                 with c2:
-                    fig_i = px.bar(room_df, x="Date", y="Rooms Available", 
-                                  title="Units Available",
-                                  color_discrete_sequence=["#0078D4"])
-                    fig_i.add_hline(y=10, line_dash="dash", line_color="red", annotation_text="Target: 10")
                     # Added unique key
                     st.plotly_chart(fig_i, use_container_width=True, key=f"inv_chart_{current_room}_{i}")
 
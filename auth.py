@@ -1,20 +1,46 @@
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+import os
+import hmac
+import json
+import base64
+import hashlib
+import calendar
+import bcrypt
 from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
 
 # Setup for security
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-SECRET_KEY = "YOUR_SUPER_SECRET_KEY" # Change this!
+SECRET_KEY = os.getenv('CASITA_JWT_SECRET')
+if not SECRET_KEY:
+    # Never fall back to a known key: tokens signed with it could be forged
+    raise RuntimeError("CASITA_JWT_SECRET is not set. Add it to .env before importing auth.")
 ALGORITHM = "HS256"
+BCRYPT_ROUNDS = 12
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+# Tokens are always HS256, so the key bytes and encoded header never change
+_SECRET_KEY_BYTES = SECRET_KEY.encode('utf-8')
+_JWT_HEADER_B64 = _b64url(b'{"alg":"HS256","typ":"JWT"}')
 
 def hash_password(password):
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    except ValueError:
+        # Malformed hash
+        return False
 
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(hours=8) # Team shift length
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
\ No newline at end of file
+    to_encode.update({"exp": calendar.timegm(expire.utctimetuple())})
+
+    payload_b64 = _b64url(json.dumps(to_encode, separators=(',', ':')).encode('utf-8'))
+    signing_input = _JWT_HEADER_B64 + b'.' + payload_b64
+    signature = hmac.new(_SECRET_KEY_BYTES, signing_input, hashlib.sha256).digest()
+    return (signing_input + b'.' + _b64url(signature)).decode('ascii')
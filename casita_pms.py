@@ -14,11 +14,237 @@ Features:
 
 import sqlite3
 import json
+import queue
+import numpy as np
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, ClassVar
 import os
 
+try:
+    from numba import njit  # Optional JIT for the calendar pricing loop
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernel below still defines without Numba"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# ============================================
+# CONNECTION POOL
+# ============================================
+
+class _ConnectionPool:
+    """Small pool of reusable SQLite connections for one database file"""
+
+    def __init__(self, db_path: str, size: int = 5):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        # Read-heavy pricing workload: bigger page cache, memory-mapped reads, temp tables in RAM
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MB (negative = KiB)
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take an idle connection, opening a new one while under the size limit"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._created < self.size
+            if can_open:
+                self._created += 1
+
+        if not can_open:
+            # Pool is full - wait for another caller to release one
+            return self._idle.get()
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def release(self, conn: sqlite3.Connection):
+        self._idle.put(conn)
+
+
+_pools: Dict[str, _ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(db_path: str) -> _ConnectionPool:
+    """Get the shared pool for a database file (one per path per process)"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _ConnectionPool(db_path, int(os.getenv('CASITA_DB_POOL_SIZE', '5')))
+            _pools[key] = pool
+        return pool
+
+
+# ============================================
+# PRICING CALENDAR
+# ============================================
+
+@dataclass
+class PricingCalendar:
+    """
+    Priced consecutive dates for one unit, stored column-wise.
+    Money columns are int64 cents; to_columns() and to_list_of_dicts() give dollars.
+    """
+    unit_id: int
+    price_source: str
+    base_cents: int
+    dates: np.ndarray        # datetime64[D]
+    seasonal: np.ndarray
+    day_of_week: np.ndarray
+    last_minute: np.ndarray
+    orphan_day: np.ndarray
+    adjusted: np.ndarray
+    final: np.ndarray
+
+    ARRAYS: ClassVar[tuple] = ('dates', 'seasonal', 'day_of_week', 'last_minute',
+                               'orphan_day', 'adjusted', 'final')
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index: slice) -> 'PricingCalendar':
+        """Run of consecutive dates (array views, nothing is copied)"""
+        return PricingCalendar(self.unit_id, self.price_source, self.base_cents,
+                               *(getattr(self, name)[index] for name in self.ARRAYS))
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """Dollar columns named like the calendar dict keys (adjustments flattened), e.g. for pd.DataFrame"""
+        return {
+            'date': np.datetime_as_string(self.dates),
+            'base_price': np.full(len(self), self.base_cents / 100),
+            'seasonal': self.seasonal / 100,
+            'day_of_week': self.day_of_week / 100,
+            'last_minute': self.last_minute / 100,
+            'orphan_day': self.orphan_day / 100,
+            'adjusted_price': self.adjusted / 100,
+            'final_price': self.final / 100
+        }
+
+    def to_list_of_dicts(self) -> List[Dict[str, Any]]:
+        """One price dict per date, as returned by generate_pricing_calendar"""
+        base_price = self.base_cents / 100
+        return [
+            {
+                'unit_id': self.unit_id,
+                'date': date_str,
+                'base_price': base_price,
+                'adjustments': {
+                    'seasonal': s / 100,
+                    'day_of_week': d / 100,
+                    'last_minute': l / 100,
+                    'orphan_day': o / 100
+                },
+                'adjusted_price': a / 100,
+                'final_price': f / 100,
+                'price_source': self.price_source
+            }
+            for date_str, s, d, l, o, a, f in zip(
+                np.datetime_as_string(self.dates).tolist(), self.seasonal.tolist(),
+                self.day_of_week.tolist(), self.last_minute.tolist(), self.orphan_day.tolist(),
+                self.adjusted.tolist(), self.final.tolist()
+            )
+        ]
+
+
+# ============================================
+# PRICING KERNEL
+# ============================================
+
+def _to_cents(value) -> int:
+    """Dollar amount as integer cents"""
+    return int(round(float(value) * 100))
+
+
+@njit(cache=True)
+def _calendar_kernel(base_cents, days, start_weekday, days_until_start,
+                     season_start, season_end, season_cents,
+                     dow_cents, lastmin_days, lastmin_cents,
+                     min_cents, max_cents):
+    """
+    Per-day adjustments for a run of consecutive dates, in integer cents.
+    Seasons and last minute windows are in priority order; the first match wins.
+    Season bounds are day offsets from the first date.
+
+    Returns:
+        5 x days int64 array: seasonal, day of week, last minute, adjusted, final
+    """
+    out = np.zeros((5, days), dtype=np.int64)
+    for i in range(days):
+        seasonal = 0
+        for k in range(season_start.size):
+            if season_start[k] <= i <= season_end[k]:
+                seasonal = season_cents[k]
+                break
+
+        day_of_week = dow_cents[(start_weekday + i) % 7]
+
+        last_minute = 0
+        days_until = days_until_start + i
+        if days_until >= 0:
+            for k in range(lastmin_days.size):
+                if days_until <= lastmin_days[k]:
+                    last_minute = lastmin_cents[k]
+                    break
+
+        adjusted = base_cents + seasonal + day_of_week + last_minute
+        out[0, i] = seasonal
+        out[1, i] = day_of_week
+        out[2, i] = last_minute
+        out[3, i] = adjusted
+        out[4, i] = max(min_cents, min(max_cents, adjusted))
+    return out
+
+
+@lru_cache(maxsize=64)
+def _insert_sql(table: str, columns: tuple) -> str:
+    """INSERT statement for a table/column set; identical strings reuse sqlite3's statement cache"""
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+# Pricing rules by (database path, property_id) - rules change rarely but are read
+# for every price calculation. Shared by all CasitaPMS instances in the process.
+_rule_cache: Dict[tuple, Dict[str, list]] = {}
+_rule_versions: Dict[tuple, int] = {}
+_rule_cache_lock = threading.Lock()
+
+# Priced calendars from today over the full horizon, by (database path, unit_id) plus
+# everything the prices depend on; calendar requests are slices of these. LRU.
+CALENDAR_CACHE_SIZE = 256
+_calendar_cache: "OrderedDict[tuple, PricingCalendar]" = OrderedDict()
+_calendar_cache_lock = threading.Lock()
+
 
 class CasitaPMS:
     """Core PMS class for Casita Revenue Management"""
@@ -29,23 +255,81 @@ class CasitaPMS:
 
     def __init__(self, db_path: str = "casita_pms.db"):
         self.db_path = db_path
+        self._db_key = os.path.abspath(db_path)
+        self._pool = _get_pool(db_path)
+        self._local = threading.local()  # Per-thread open transaction, see transaction()
         self._init_database()
 
-    def _get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    @contextmanager
+    def _conn(self):
+        """
+        Borrow a pooled database connection.
+        Commits when the block finishes, rolls back if it raises.
+        Inside transaction() the block joins that transaction instead.
+        """
+        tx_conn = getattr(self._local, 'conn', None)
+        if tx_conn is not None:
+            yield tx_conn
+            return
+
+        conn = self._pool.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run several PMS calls as one write transaction on one pooled connection.
+        Takes the write lock up front (BEGIN IMMEDIATE), commits when the block
+        finishes and rolls back if it raises. Nested calls join the outer one.
+
+        Usage:
+            with pms.transaction():
+                prop_id = pms.create_property("Beach House")
+                pms.add_day_of_week_pricing(prop_id, 5, 20)
+        """
+        if getattr(self._local, 'conn', None) is not None:
+            yield self._local.conn
+            return
+
+        conn = self._pool.acquire()
+        self._local.conn = conn
+        self._local.rule_changes = set()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            changed = self._local.rule_changes
+            self._local.conn = None
+            self._local.rule_changes = None
+            self._pool.release(conn)
+            # Rules read mid-transaction may have been cached; drop them now it has ended
+            for property_id in changed:
+                self._invalidate_pricing_rules(property_id)
 
     def _init_database(self):
         """Initialize database with schema"""
         schema_path = os.path.join(os.path.dirname(__file__), "casita_pms_schema.sql")
         if os.path.exists(schema_path):
-            conn = self._get_connection()
-            with open(schema_path, 'r') as f:
-                conn.executescript(f.read())
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                with open(schema_path, 'r') as f:
+                    conn.executescript(f.read())
+
+                # Give the planner table statistics once; afterwards only refresh when stale
+                has_stats = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+                ).fetchone()
+                conn.execute("PRAGMA optimize" if has_stats else "ANALYZE")
 
     # ============================================
     # PROPERTY MANAGEMENT (Parent Listings)
@@ -53,57 +337,49 @@ class CasitaPMS:
 
     def create_property(self, name: str, **kwargs) -> int:
         """Create a new parent property/listing"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._conn() as conn:
+            cursor = conn.cursor()
 
-        fields = ['name'] + list(kwargs.keys())
-        placeholders = ['?'] * len(fields)
-        values = [name] + list(kwargs.values())
+            fields = ('name',) + tuple(kwargs.keys())
+            values = [name] + list(kwargs.values())
 
-        sql = f"INSERT INTO properties ({', '.join(fields)}) VALUES ({', '.join(placeholders)})"
-        cursor.execute(sql, values)
-        property_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+            cursor.execute(_insert_sql('properties', fields), values)
+            property_id = cursor.lastrowid
 
         return property_id
 
     def get_property(self, property_id: int) -> Optional[Dict]:
         """Get property by ID"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM properties WHERE id = ?", (property_id,))
-        row = cursor.fetchone()
-        conn.close()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM properties WHERE id = ?", (property_id,))
+            row = cursor.fetchone()
         return dict(row) if row else None
 
     def get_all_properties(self, active_only: bool = True) -> List[Dict]:
         """Get all properties"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        sql = "SELECT * FROM properties"
-        if active_only:
-            sql += " WHERE is_active = 1"
-        cursor.execute(sql)
-        rows = cursor.fetchall()
-        conn.close()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            sql = "SELECT * FROM properties"
+            if active_only:
+                sql += " WHERE is_active = 1"
+            cursor.execute(sql)
+            rows = cursor.fetchall()
         return [dict(row) for row in rows]
 
     def update_property_pricing(self, property_id: int, base_price: float,
                                  min_price: float = None, max_price: float = None):
         """Update parent property base pricing (from Airbnb Smart Pricing)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE properties
-            SET base_price = ?, min_price = ?, max_price = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (base_price, min_price, max_price, property_id))
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE properties
+                SET base_price = ?, min_price = ?, max_price = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (base_price, min_price, max_price, property_id))
 
-        # Cascade to child units
-        self._cascade_pricing_to_units(property_id)
+            # Cascade to child units
+            self._cascade_pricing_to_units(cursor, property_id)
 
     # ============================================
     # UNIT MANAGEMENT (Child Listings)
@@ -111,65 +387,74 @@ class CasitaPMS:
 
     def create_unit(self, property_id: int, unit_name: str, **kwargs) -> int:
         """Create a child unit under a parent property"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._conn() as conn:
+            cursor = conn.cursor()
 
-        fields = ['property_id', 'unit_name'] + list(kwargs.keys())
-        placeholders = ['?'] * len(fields)
-        values = [property_id, unit_name] + list(kwargs.values())
+            fields = ('property_id', 'unit_name') + tuple(kwargs.keys())
+            values = [property_id, unit_name] + list(kwargs.values())
 
-        sql = f"INSERT INTO units ({', '.join(fields)}) VALUES ({', '.join(placeholders)})"
-        cursor.execute(sql, values)
-        unit_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+            cursor.execute(_insert_sql('units', fields), values)
+            unit_id = cursor.lastrowid
 
         return unit_id
 
+    def create_units_bulk(self, property_id: int, units: List[Dict[str, Any]]) -> List[int]:
+        """
+        Create several child units under a property in one transaction.
+
+        Args:
+            property_id: Parent property ID
+            units: One dict per unit with 'unit_name' plus any create_unit kwargs
+
+        Returns:
+            New unit IDs, in the same order as units
+        """
+        unit_ids = []
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            for unit in units:
+                fields = ('property_id',) + tuple(unit.keys())
+                cursor.execute(_insert_sql('units', fields), [property_id] + list(unit.values()))
+                unit_ids.append(cursor.lastrowid)
+
+        return unit_ids
+
     def get_units_by_property(self, property_id: int) -> List[Dict]:
         """Get all units for a property"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM units WHERE property_id = ? AND is_active = 1", (property_id,))
-        rows = cursor.fetchall()
-        conn.close()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM units WHERE property_id = ? AND is_active = 1", (property_id,))
+            rows = cursor.fetchall()
         return [dict(row) for row in rows]
 
     def set_unit_price_modifier(self, unit_id: int, modifier: float,
                                  modifier_type: str = 'percent'):
         """Set price modifier for a child unit relative to parent"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE units
-            SET price_modifier = ?, price_modifier_type = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (modifier, modifier_type, unit_id))
-        conn.commit()
-        conn.close()
-
-    def _cascade_pricing_to_units(self, property_id: int):
-        """Cascade parent pricing to all child units"""
-        property_data = self.get_property(property_id)
-        if not property_data:
-            return
-
-        base_price = property_data['base_price']
-        units = self.get_units_by_property(property_id)
-
-        for unit in units:
-            if unit['inherit_parent_pricing']:
-                # Calculate unit price based on modifier
-                modifier = unit['price_modifier'] or 0
-                modifier_type = unit['price_modifier_type']
-
-                if modifier_type == 'percent':
-                    unit_price = base_price * (1 + modifier / 100)
-                else:  # fixed
-                    unit_price = base_price + modifier
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE units
+                SET price_modifier = ?, price_modifier_type = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (modifier, modifier_type, unit_id))
 
-                # Update unit's effective price in calendar
-                self._update_unit_calendar_base_price(unit['id'], unit_price)
+    def _cascade_pricing_to_units(self, cursor, property_id: int):
+        """Cascade parent pricing to the future calendar of all inheriting child units"""
+        cursor.execute("""
+            UPDATE pricing_calendar
+            SET base_price = CASE u.price_modifier_type
+                    WHEN 'percent' THEN p.base_price * (1 + COALESCE(u.price_modifier, 0) / 100.0)
+                    ELSE p.base_price + COALESCE(u.price_modifier, 0)
+                END,
+                last_updated = CURRENT_TIMESTAMP
+            FROM units u
+            JOIN properties p ON p.id = u.property_id
+            WHERE pricing_calendar.unit_id = u.id
+              AND u.property_id = ?
+              AND u.is_active = 1
+              AND u.inherit_parent_pricing
+              AND pricing_calendar.calendar_date >= date('now')
+        """, (property_id,))
 
     # ============================================
     # PRICING RULES ENGINE
@@ -181,16 +466,15 @@ class CasitaPMS:
                               adjustment_type: str = 'percent',
                               min_nights: int = None) -> int:
         """Add seasonal pricing adjustment"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO seasonal_pricing
-            (property_id, season_name, start_date, end_date, adjustment_type, adjustment_value, min_nights)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (property_id, season_name, start_date, end_date, adjustment_type, adjustment_value, min_nights))
-        rule_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO seasonal_pricing
+                (property_id, season_name, start_date, end_date, adjustment_type, adjustment_value, min_nights)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (property_id, season_name, start_date, end_date, adjustment_type, adjustment_value, min_nights))
+            rule_id = cursor.lastrowid
+        self._invalidate_pricing_rules(property_id)
         return rule_id
 
     def add_day_of_week_pricing(self, property_id: int, day_of_week: int,
@@ -198,42 +482,38 @@ class CasitaPMS:
                                  adjustment_type: str = 'percent',
                                  min_nights: int = 1):
         """Add day of week adjustment (0=Monday, 6=Sunday)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT OR REPLACE INTO day_of_week_pricing
-            (property_id, day_of_week, adjustment_type, adjustment_value, min_nights)
-            VALUES (?, ?, ?, ?, ?)
-        """, (property_id, day_of_week, adjustment_type, adjustment_value, min_nights))
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO day_of_week_pricing
+                (property_id, day_of_week, adjustment_type, adjustment_value, min_nights)
+                VALUES (?, ?, ?, ?, ?)
+            """, (property_id, day_of_week, adjustment_type, adjustment_value, min_nights))
+        self._invalidate_pricing_rules(property_id)
 
     def add_last_minute_discount(self, property_id: int, days_before: int,
                                   discount_percent: float):
         """Add last minute discount (negative adjustment)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO last_minute_pricing
-            (property_id, days_before_checkin, adjustment_type, adjustment_value)
-            VALUES (?, ?, 'percent', ?)
-        """, (property_id, days_before, -abs(discount_percent)))
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO last_minute_pricing
+                (property_id, days_before_checkin, adjustment_type, adjustment_value)
+                VALUES (?, ?, 'percent', ?)
+            """, (property_id, days_before, -abs(discount_percent)))
+        self._invalidate_pricing_rules(property_id)
 
     def add_orphan_day_pricing(self, property_id: int, gap_nights: int,
                                 discount_percent: float,
                                 reduce_min_stay: bool = True):
         """Add orphan day discount for gap nights"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO orphan_day_pricing
-            (property_id, gap_nights, adjustment_type, adjustment_value, reduce_min_stay)
-            VALUES (?, ?, 'percent', ?, ?)
-        """, (property_id, gap_nights, -abs(discount_percent), reduce_min_stay))
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO orphan_day_pricing
+                (property_id, gap_nights, adjustment_type, adjustment_value, reduce_min_stay)
+                VALUES (?, ?, 'percent', ?, ?)
+            """, (property_id, gap_nights, -abs(discount_percent), reduce_min_stay))
 
     # ============================================
     # PRICING CALCULATOR
@@ -241,9 +521,24 @@ class CasitaPMS:
 
     def calculate_price(self, unit_id: int, target_date: date) -> Dict[str, Any]:
         """Calculate final price for a unit on a specific date"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            context = self._load_pricing_context(cursor, unit_id)
 
+        if not context:
+            return None
+
+        return self._price_from_rules(context, target_date, 1, date.today()).to_list_of_dicts()[0]
+
+    def _load_pricing_context(self, cursor, unit_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Load everything needed to price a unit: the unit/property row and all of
+        the property's seasonal, day of week and last minute rules.
+
+        Returns:
+            Dict with unit, base_price, seasonal, day_of_week and last_minute rules,
+            or None if the unit doesn't exist
+        """
         # Get unit and parent property
         cursor.execute("""
             SELECT u.*, p.base_price as parent_base_price, p.min_price, p.max_price, p.id as property_id
@@ -254,7 +549,6 @@ class CasitaPMS:
         unit = cursor.fetchone()
 
         if not unit:
-            conn.close()
             return None
 
         unit = dict(unit)
@@ -272,81 +566,225 @@ class CasitaPMS:
         else:
             base_price = float(unit['custom_base_price'] or 0)
 
-        adjustments = {
+        rules = self._get_pricing_rules(cursor, property_id)
+
+        return {
+            'unit_id': unit_id,
+            'unit': unit,
             'base_price': base_price,
-            'seasonal': 0,
-            'day_of_week': 0,
-            'last_minute': 0,
-            'orphan_day': 0
+            **rules
         }
 
-        # Apply seasonal adjustment
+    def _get_pricing_rules(self, cursor, property_id: int) -> Dict[str, list]:
+        """
+        Get a property's seasonal, day of week and last minute rules.
+        Cached per property until a rule is added through this module.
+        """
+        key = (self._db_key, property_id)
+        with _rule_cache_lock:
+            rules = _rule_cache.get(key)
+            version = _rule_versions.get(key, 0)
+        if rules is not None:
+            return rules
+
+        # Seasonal rules, highest adjustment first, oldest first on ties (first matching season wins)
         cursor.execute("""
             SELECT * FROM seasonal_pricing
-            WHERE property_id = ? AND start_date <= ? AND end_date >= ?
-            ORDER BY adjustment_value DESC LIMIT 1
-        """, (property_id, target_date.isoformat(), target_date.isoformat()))
-        seasonal = cursor.fetchone()
-        if seasonal:
-            seasonal = dict(seasonal)
-            if seasonal['adjustment_type'] == 'percent':
-                adjustments['seasonal'] = base_price * (seasonal['adjustment_value'] / 100)
-            else:
-                adjustments['seasonal'] = seasonal['adjustment_value']
+            WHERE property_id = ?
+            ORDER BY adjustment_value DESC, id
+        """, (property_id,))
+        seasonal = [dict(row) for row in cursor.fetchall()]
 
-        # Apply day of week adjustment
-        day_num = target_date.weekday()
+        # Day of week rules, indexed by weekday (0=Monday)
+        day_of_week = [None] * 7
+        cursor.execute("SELECT * FROM day_of_week_pricing WHERE property_id = ?", (property_id,))
+        for row in cursor.fetchall():
+            if 0 <= row['day_of_week'] <= 6:
+                day_of_week[row['day_of_week']] = dict(row)
+
+        # Last minute rules, nearest window first
         cursor.execute("""
-            SELECT * FROM day_of_week_pricing
-            WHERE property_id = ? AND day_of_week = ?
-        """, (property_id, day_num))
-        dow = cursor.fetchone()
-        if dow:
-            dow = dict(dow)
-            if dow['adjustment_type'] == 'percent':
-                adjustments['day_of_week'] = base_price * (dow['adjustment_value'] / 100)
-            else:
-                adjustments['day_of_week'] = dow['adjustment_value']
+            SELECT * FROM last_minute_pricing
+            WHERE property_id = ?
+            ORDER BY days_before_checkin ASC, id
+        """, (property_id,))
+        last_minute = [dict(row) for row in cursor.fetchall()]
+
+        rules = {'seasonal': seasonal, 'day_of_week': day_of_week, 'last_minute': last_minute,
+                 **self._rule_tables(seasonal, day_of_week, last_minute)}
+
+        with _rule_cache_lock:
+            # Skip caching if a rule changed while we were reading
+            if _rule_versions.get(key, 0) == version:
+                _rule_cache[key] = rules
+        return rules
+
+    def _invalidate_pricing_rules(self, property_id: int):
+        """Drop cached rules for a property after one of its rules changes"""
+        pending = getattr(self._local, 'rule_changes', None)
+        if pending is not None:
+            pending.add(property_id)
+
+        key = (self._db_key, property_id)
+        with _rule_cache_lock:
+            _rule_cache.pop(key, None)
+            _rule_versions[key] = _rule_versions.get(key, 0) + 1
+
+    def _price_from_rules(self, context: Dict[str, Any], start_date: date, days: int,
+                          today: date) -> PricingCalendar:
+        """
+        Price consecutive dates from a context loaded by _load_pricing_context.
+        Adjustments are computed for all dates at once in integer cents, with the
+        Numba kernel when available and NumPy otherwise (no DB access).
 
-        # Apply last minute discount
-        days_until = (target_date - date.today()).days
-        if days_until >= 0:
-            cursor.execute("""
-                SELECT * FROM last_minute_pricing
-                WHERE property_id = ? AND days_before_checkin >= ?
-                ORDER BY days_before_checkin ASC LIMIT 1
-            """, (property_id, days_until))
-            last_min = cursor.fetchone()
-            if last_min:
-                last_min = dict(last_min)
-                adjustments['last_minute'] = base_price * (last_min['adjustment_value'] / 100)
-
-        conn.close()
-
-        # Calculate final price
-        adjusted_price = base_price + sum([
-            adjustments['seasonal'],
-            adjustments['day_of_week'],
-            adjustments['last_minute'],
-            adjustments['orphan_day']
-        ])
+        Args:
+            context: Unit and pricing rules
+            start_date: First date to price
+            days: Number of consecutive dates
+            today: Reference date for last minute discounts
 
-        # Apply min/max bounds
-        min_price = float(unit['min_price'] or 0)
-        max_price = float(unit['max_price'] or 999999)
+        Returns:
+            PricingCalendar for the dates (empty if days <= 0)
+        """
+        days = max(days, 0)
+        unit = context['unit']
+        base_cents = _to_cents(context['base_price'])
+        dates = np.datetime64(start_date, 'D') + np.arange(days)
 
-        final_price = max(min_price, min(max_price, adjusted_price))
+        # Apply min/max bounds
+        min_cents = _to_cents(unit['min_price'] or 0)
+        max_cents = _to_cents(unit['max_price'] or 999999)
+
+        components = None
+        if NUMBA_AVAILABLE:
+            components = self._price_components_jit(context, start_date, days, today,
+                                                    base_cents, min_cents, max_cents)
+        if components is None:
+            components = self._price_components_numpy(context, start_date, days, today,
+                                                      np.datetime_as_string(dates),
+                                                      base_cents, min_cents, max_cents)
+        seasonal, day_of_week, last_minute, adjusted, final = components
+
+        return PricingCalendar(
+            unit_id=context['unit_id'],
+            price_source='smart_pricing' if unit['inherit_parent_pricing'] else 'manual',
+            base_cents=base_cents,
+            dates=dates,
+            seasonal=seasonal,
+            day_of_week=day_of_week,
+            last_minute=last_minute,
+            orphan_day=np.zeros(days, dtype=np.int64),
+            adjusted=adjusted,
+            final=final
+        )
+
+    @staticmethod
+    def _rule_tables(seasonal: List[Dict], day_of_week: List[Optional[Dict]],
+                     last_minute: List[Dict]) -> Dict[str, Any]:
+        """
+        Array form of a property's rules, built once per rules load so pricing is
+        pure array math. Percent and fixed parts are kept apart because percents
+        scale with each unit's base price.
+        """
+        def split(rules):
+            percent = np.zeros(len(rules))
+            fixed_cents = np.zeros(len(rules), dtype=np.int64)
+            for i, rule in enumerate(rules):
+                if not rule:
+                    continue
+                if rule['adjustment_type'] == 'percent':
+                    percent[i] = rule['adjustment_value']
+                else:
+                    fixed_cents[i] = _to_cents(rule['adjustment_value'])
+            return percent, fixed_cents
+
+        season_percent, season_fixed_cents = split(seasonal)
+        dow_percent, dow_fixed_cents = split(day_of_week)
+
+        # Season bounds as day ordinals for the kernel; None if a date isn't plain ISO
+        try:
+            season_ordinals = (
+                np.array([date.fromisoformat(r['start_date']).toordinal() for r in seasonal], dtype=np.int64),
+                np.array([date.fromisoformat(r['end_date']).toordinal() for r in seasonal], dtype=np.int64)
+            )
+        except (TypeError, ValueError):
+            season_ordinals = None
 
         return {
-            'unit_id': unit_id,
-            'date': target_date.isoformat(),
-            'base_price': round(base_price, 2),
-            'adjustments': {k: round(v, 2) for k, v in adjustments.items() if k != 'base_price'},
-            'adjusted_price': round(adjusted_price, 2),
-            'final_price': round(final_price, 2),
-            'price_source': 'smart_pricing' if unit['inherit_parent_pricing'] else 'manual'
+            'season_percent': season_percent,
+            'season_fixed_cents': season_fixed_cents,
+            'season_ordinals': season_ordinals,
+            'dow_percent': dow_percent,
+            'dow_fixed_cents': dow_fixed_cents,
+            # Last minute rules are always percent discounts
+            'last_minute_days': np.array([r['days_before_checkin'] for r in last_minute], dtype=np.int64),
+            'last_minute_percent': np.array([r['adjustment_value'] for r in last_minute], dtype=float)
         }
 
+    @staticmethod
+    def _adjustment_cents(percent: np.ndarray, fixed_cents: np.ndarray, base_cents: int) -> np.ndarray:
+        """Cent amounts for rule tables from _rule_tables, rounded to the nearest cent"""
+        return np.rint(base_cents * percent / 100).astype(np.int64) + fixed_cents
+
+    def _price_components_numpy(self, context: Dict[str, Any], start_date: date, days: int,
+                                today: date, date_arr: np.ndarray, base_cents: int,
+                                min_cents: int, max_cents: int) -> tuple:
+        """Seasonal, day of week, last minute, adjusted and final cents arrays via NumPy masks"""
+        offsets = np.arange(days)
+
+        # Apply seasonal adjustment - the first rule (highest adjustment) covering a date wins
+        season_cents = self._adjustment_cents(context['season_percent'],
+                                              context['season_fixed_cents'], base_cents)
+        seasonal = np.zeros(days, dtype=np.int64)
+        unmatched = np.ones(days, dtype=bool)
+        for rule, cents in zip(context['seasonal'], season_cents):
+            mask = unmatched & (date_arr >= rule['start_date']) & (date_arr <= rule['end_date'])
+            seasonal[mask] = cents
+            unmatched &= ~mask
+
+        # Apply day of week adjustment
+        dow_cents = self._adjustment_cents(context['dow_percent'], context['dow_fixed_cents'], base_cents)
+        day_of_week = dow_cents[(start_date.weekday() + offsets) % 7]
+
+        # Apply last minute discount - the nearest window covering days_until wins
+        lastmin_cents = self._adjustment_cents(context['last_minute_percent'], 0, base_cents)
+        last_minute = np.zeros(days, dtype=np.int64)
+        days_until = (start_date - today).days + offsets
+        unmatched = days_until >= 0
+        for window, cents in zip(context['last_minute_days'], lastmin_cents):
+            mask = unmatched & (days_until <= window)
+            last_minute[mask] = cents
+            unmatched &= ~mask
+
+        # Calculate final price (orphan day adjustment is 0)
+        adjusted = base_cents + seasonal + day_of_week + last_minute
+        final = np.maximum(min_cents, np.minimum(max_cents, adjusted))
+        return seasonal, day_of_week, last_minute, adjusted, final
+
+    def _price_components_jit(self, context: Dict[str, Any], start_date: date, days: int,
+                              today: date, base_cents: int, min_cents: int,
+                              max_cents: int) -> Optional[tuple]:
+        """
+        Same arrays as _price_components_numpy, computed by the Numba kernel.
+        Returns None if a seasonal rule has a date the kernel can't use.
+        """
+        if context['season_ordinals'] is None:
+            return None
+        start_ordinal = start_date.toordinal()
+        season_start, season_end = (ords - start_ordinal for ords in context['season_ordinals'])
+
+        out = _calendar_kernel(base_cents, days, start_date.weekday(),
+                               (start_date - today).days,
+                               season_start, season_end,
+                               self._adjustment_cents(context['season_percent'],
+                                                      context['season_fixed_cents'], base_cents),
+                               self._adjustment_cents(context['dow_percent'],
+                                                      context['dow_fixed_cents'], base_cents),
+                               context['last_minute_days'],
+                               self._adjustment_cents(context['last_minute_percent'], 0, base_cents),
+                               min_cents, max_cents)
+        return out[0], out[1], out[2], out[3], out[4]
+
     def generate_pricing_calendar(self, unit_id: int, days: int = None,
                                      start_date: date = None, end_date: date = None) -> List[Dict]:
         """
@@ -358,6 +796,18 @@ class CasitaPMS:
             start_date: Optional start date (default: today)
             end_date: Optional end date (overrides days if provided)
         """
+        calendar = self.generate_pricing_arrays(unit_id, days, start_date, end_date)
+        return calendar.to_list_of_dicts() if calendar is not None else []
+
+    def generate_pricing_arrays(self, unit_id: int, days: int = None,
+                                start_date: date = None,
+                                end_date: date = None) -> Optional[PricingCalendar]:
+        """
+        Same as generate_pricing_calendar, as a column-wise PricingCalendar.
+
+        Returns:
+            PricingCalendar, or None if the unit doesn't exist
+        """
         if days is None:
             days = self.DEFAULT_CALENDAR_DAYS
 
@@ -370,19 +820,76 @@ class CasitaPMS:
         # Cap at max calendar days
         days = min(days, self.MAX_CALENDAR_DAYS)
 
-        calendar = []
-        for i in range(days):
-            target_date = start_date + timedelta(days=i)
-            price_data = self.calculate_price(unit_id, target_date)
-            if price_data:
-                calendar.append(price_data)
-        return calendar
+        today = date.today()
+        offset = (start_date - today).days
+        if days > 0 and 0 <= offset and offset + days <= self.MAX_CALENDAR_DAYS:
+            horizon = self._cached_horizon(unit_id, today)
+            return horizon[offset:offset + days] if horizon is not None else None
+
+        # Load the unit and its rules once, then price every date in memory
+        with self._conn() as conn:
+            context = self._load_pricing_context(conn.cursor(), unit_id)
+
+        if not context:
+            return None
+
+        return self._price_from_rules(context, start_date, days, today)
+
+    def _cached_horizon(self, unit_id: int, today: date) -> Optional[PricingCalendar]:
+        """
+        Priced calendar from today for MAX_CALENDAR_DAYS, shared by all calendar requests.
+        Keyed on the rules version and the unit's pricing inputs, so rule or price
+        changes made through this class start a new entry.
+        """
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            # Read the property's rules version before the rules themselves
+            cursor.execute("SELECT property_id FROM units WHERE id = ?", (unit_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            with _rule_cache_lock:
+                rules_version = _rule_versions.get((self._db_key, row['property_id']), 0)
+            context = self._load_pricing_context(cursor, unit_id)
+
+        if not context:
+            return None
+
+        unit = context['unit']
+        key = (self._db_key, unit_id, rules_version, today, context['base_price'],
+               unit['min_price'], unit['max_price'], unit['inherit_parent_pricing'])
+        with _calendar_cache_lock:
+            horizon = _calendar_cache.get(key)
+            if horizon is not None:
+                _calendar_cache.move_to_end(key)
+                return horizon
+
+        horizon = self._price_from_rules(context, today, self.MAX_CALENDAR_DAYS, today)
+        with _calendar_cache_lock:
+            _calendar_cache[key] = horizon
+            if len(_calendar_cache) > CALENDAR_CACHE_SIZE:
+                _calendar_cache.popitem(last=False)
+        return horizon
+
+    def warm_all_units(self):
+        """Prebuild the calendar cache for every active unit (e.g. at app startup)"""
+        with self._conn() as conn:
+            unit_ids = [row['id'] for row in conn.execute("SELECT id FROM units WHERE is_active = 1")]
+
+        today = date.today()
+        for unit_id in unit_ids:
+            self._cached_horizon(unit_id, today)
 
     def generate_yearly_calendar(self, unit_id: int, year: int = None) -> List[Dict]:
         """Generate full year calendar for a specific year"""
         if year is None:
             year = date.today().year
 
+        start_date, end_date = self._year_range(year)
+        return self.generate_pricing_calendar(unit_id, start_date=start_date, end_date=end_date)
+
+    def _year_range(self, year: int) -> tuple:
+        """First and last calendar date of a year"""
         start_date = date(year, 1, 1)
         end_date = date(year, 12, 31)
 
@@ -390,7 +897,7 @@ class CasitaPMS:
         if start_date < date.today():
             start_date = date.today()
 
-        return self.generate_pricing_calendar(unit_id, start_date=start_date, end_date=end_date)
+        return start_date, end_date
 
     def generate_monthly_calendar(self, unit_id: int, year: int, month: int) -> List[Dict]:
         """Generate calendar for a specific month"""
@@ -408,20 +915,6 @@ class CasitaPMS:
 
         return self.generate_pricing_calendar(unit_id, start_date=start_date, end_date=end_date)
 
-    def _update_unit_calendar_base_price(self, unit_id: int, base_price: float):
-        """Update calendar entries with new base price"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        # Update future dates
-        cursor.execute("""
-            UPDATE pricing_calendar
-            SET base_price = ?, last_updated = CURRENT_TIMESTAMP
-            WHERE unit_id = ? AND calendar_date >= date('now')
-        """, (base_price, unit_id))
-        conn.commit()
-        conn.close()
-
     # ============================================
     # AIRBNB SMART PRICING SYNC
     # ============================================
@@ -429,40 +922,36 @@ class CasitaPMS:
     def sync_smart_pricing(self, property_id: int, smart_price: float,
                            demand_score: int = None):
         """Record smart pricing sync from Airbnb"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        # Record sync
-        cursor.execute("""
-            INSERT OR REPLACE INTO smart_pricing_sync
-            (property_id, sync_date, smart_price, demand_score, sync_timestamp)
-            VALUES (?, date('now'), ?, ?, CURRENT_TIMESTAMP)
-        """, (property_id, smart_price, demand_score))
+        with self._conn() as conn:
+            cursor = conn.cursor()
 
-        # Update property base price
-        cursor.execute("""
-            UPDATE properties
-            SET base_price = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (smart_price, property_id))
+            # Record sync
+            cursor.execute("""
+                INSERT OR REPLACE INTO smart_pricing_sync
+                (property_id, sync_date, smart_price, demand_score, sync_timestamp)
+                VALUES (?, date('now'), ?, ?, CURRENT_TIMESTAMP)
+            """, (property_id, smart_price, demand_score))
 
-        conn.commit()
-        conn.close()
+            # Update property base price
+            cursor.execute("""
+                UPDATE properties
+                SET base_price = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (smart_price, property_id))
 
-        # Cascade to units
-        self._cascade_pricing_to_units(property_id)
+            # Cascade to units
+            self._cascade_pricing_to_units(cursor, property_id)
 
     def get_smart_pricing_history(self, property_id: int, days: int = 30) -> List[Dict]:
         """Get smart pricing history"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM smart_pricing_sync
-            WHERE property_id = ? AND sync_date >= date('now', ?)
-            ORDER BY sync_date DESC
-        """, (property_id, f'-{days} days'))
-        rows = cursor.fetchall()
-        conn.close()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM smart_pricing_sync
+                WHERE property_id = ? AND sync_date >= date('now', ?)
+                ORDER BY sync_date DESC
+            """, (property_id, f'-{days} days'))
+            rows = cursor.fetchall()
         return [dict(row) for row in rows]
 
     # ============================================
@@ -472,82 +961,74 @@ class CasitaPMS:
     def create_reservation(self, unit_id: int, check_in: str, check_out: str,
                            guest_name: str = None, **kwargs) -> int:
         """Create a reservation"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        check_in_date = datetime.strptime(check_in, '%Y-%m-%d').date()
-        check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
-        nights = (check_out_date - check_in_date).days
-
-        # Calculate total price
-        total_price = 0
-        for i in range(nights):
-            day_date = check_in_date + timedelta(days=i)
-            price_data = self.calculate_price(unit_id, day_date)
-            if price_data:
-                total_price += price_data['final_price']
-
-        fields = ['unit_id', 'check_in', 'check_out', 'nights', 'total_price']
-        values = [unit_id, check_in, check_out, nights, total_price]
-
-        if guest_name:
-            fields.append('guest_name')
-            values.append(guest_name)
-
-        for key, value in kwargs.items():
-            fields.append(key)
-            values.append(value)
-
-        placeholders = ['?'] * len(fields)
-        sql = f"INSERT INTO reservations ({', '.join(fields)}) VALUES ({', '.join(placeholders)})"
-        cursor.execute(sql, values)
-        reservation_id = cursor.lastrowid
-
-        # Block calendar dates
-        for i in range(nights):
-            day_date = check_in_date + timedelta(days=i)
-            cursor.execute("""
+        # Take the write lock up front so pricing and blocking see the same rules
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+
+            check_in_date = datetime.strptime(check_in, '%Y-%m-%d').date()
+            check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
+            nights = (check_out_date - check_in_date).days
+
+            # Calculate total price from the nightly calendar
+            total_price = 0
+            context = self._load_pricing_context(cursor, unit_id)
+            if context:
+                nightly = self._price_from_rules(context, check_in_date, nights, date.today())
+                total_price = int(nightly.final.sum()) / 100
+
+            fields = ['unit_id', 'check_in', 'check_out', 'nights', 'total_price']
+            values = [unit_id, check_in, check_out, nights, total_price]
+
+            if guest_name:
+                fields.append('guest_name')
+                values.append(guest_name)
+
+            for key, value in kwargs.items():
+                fields.append(key)
+                values.append(value)
+
+            cursor.execute(_insert_sql('reservations', tuple(fields)), values)
+            reservation_id = cursor.lastrowid
+
+            # Block calendar dates
+            cursor.executemany("""
                 INSERT OR REPLACE INTO pricing_calendar (unit_id, calendar_date, is_available, is_blocked, block_reason)
                 VALUES (?, ?, 0, 1, 'reservation')
-            """, (unit_id, day_date.isoformat()))
-
-        conn.commit()
-        conn.close()
+            """, [(unit_id, (check_in_date + timedelta(days=i)).isoformat()) for i in range(nights)])
 
         return reservation_id
 
     def get_reservations(self, unit_id: int = None, property_id: int = None,
                          start_date: str = None, end_date: str = None) -> List[Dict]:
         """Get reservations with filters"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        sql = """
-            SELECT r.*, u.unit_name, p.name as property_name
-            FROM reservations r
-            JOIN units u ON r.unit_id = u.id
-            JOIN properties p ON u.property_id = p.id
-            WHERE 1=1
-        """
-        params = []
-
-        if unit_id:
-            sql += " AND r.unit_id = ?"
-            params.append(unit_id)
-        if property_id:
-            sql += " AND u.property_id = ?"
-            params.append(property_id)
-        if start_date:
-            sql += " AND r.check_out >= ?"
-            params.append(start_date)
-        if end_date:
-            sql += " AND r.check_in <= ?"
-            params.append(end_date)
-
-        sql += " ORDER BY r.check_in"
-        cursor.execute(sql, params)
-        rows = cursor.fetchall()
-        conn.close()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+
+            sql = """
+                SELECT r.*, u.unit_name, p.name as property_name
+                FROM reservations r
+                JOIN units u ON r.unit_id = u.id
+                JOIN properties p ON u.property_id = p.id
+                WHERE 1=1
+            """
+            params = []
+
+            if unit_id:
+                sql += " AND r.unit_id = ?"
+                params.append(unit_id)
+            if property_id:
+                sql += " AND u.property_id = ?"
+                params.append(property_id)
+            if start_date:
+                sql += " AND r.check_out >= ?"
+                params.append(start_date)
+            if end_date:
+                sql += " AND r.check_in <= ?"
+                params.append(end_date)
+
+            sql += " ORDER BY r.check_in"
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
         return [dict(row) for row in rows]
 
     # ============================================
@@ -559,43 +1040,37 @@ class CasitaPMS:
         if metric_date is None:
             metric_date = date.today()
 
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        # Get total units
-        cursor.execute("""
-            SELECT COUNT(*) as total FROM units WHERE property_id = ? AND is_active = 1
-        """, (property_id,))
-        total_units = cursor.fetchone()['total']
-
-        # Get occupied units
-        cursor.execute("""
-            SELECT COUNT(DISTINCT r.unit_id) as occupied
-            FROM reservations r
-            JOIN units u ON r.unit_id = u.id
-            WHERE u.property_id = ? AND r.check_in <= ? AND r.check_out > ? AND r.status = 'confirmed'
-        """, (property_id, metric_date.isoformat(), metric_date.isoformat()))
-        occupied_units = cursor.fetchone()['occupied']
-
-        # Get revenue for date
-        cursor.execute("""
-            SELECT SUM(r.total_price / r.nights) as daily_revenue
-            FROM reservations r
-            JOIN units u ON r.unit_id = u.id
-            WHERE u.property_id = ? AND r.check_in <= ? AND r.check_out > ? AND r.status = 'confirmed'
-        """, (property_id, metric_date.isoformat(), metric_date.isoformat()))
-        revenue_row = cursor.fetchone()
-        daily_revenue = revenue_row['daily_revenue'] or 0
-
-        conn.close()
+        with self._conn() as conn:
+            cursor = conn.cursor()
 
+            # Unit count, occupied units and revenue in one statement
+            cursor.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM units WHERE property_id = ? AND is_active = 1) as total,
+                    COUNT(DISTINCT r.unit_id) as occupied,
+                    SUM(r.total_price / r.nights) as daily_revenue
+                FROM reservations r
+                JOIN units u ON r.unit_id = u.id
+                WHERE u.property_id = ? AND r.check_in <= ? AND r.check_out > ? AND r.status = 'confirmed'
+            """, (property_id, property_id, metric_date.isoformat(), metric_date.isoformat()))
+            row = cursor.fetchone()
+            total_units = row['total']
+            occupied_units = row['occupied']
+            daily_revenue = row['daily_revenue'] or 0
+
+        return self._build_metrics(property_id, metric_date.isoformat(), total_units,
+                                   occupied_units, daily_revenue)
+
+    def _build_metrics(self, property_id: int, metric_date: str, total_units: int,
+                       occupied_units: int, daily_revenue: float) -> Dict:
+        """Derive occupancy, ADR and RevPAR from one day's raw counts"""
         occupancy_rate = (occupied_units / total_units * 100) if total_units > 0 else 0
         adr = (daily_revenue / occupied_units) if occupied_units > 0 else 0
         revpar = (daily_revenue / total_units) if total_units > 0 else 0
 
         return {
             'property_id': property_id,
-            'date': metric_date.isoformat(),
+            'date': metric_date,
             'total_units': total_units,
             'occupied_units': occupied_units,
             'occupancy_rate': round(occupancy_rate, 2),
@@ -609,49 +1084,183 @@ class CasitaPMS:
         if days is None:
             days = self.DEFAULT_CALENDAR_DAYS
 
-        forecast = []
-        for i in range(days):
-            forecast_date = date.today() + timedelta(days=i)
-            metrics = self.calculate_metrics(property_id, forecast_date)
-            forecast.append(metrics)
-        return forecast
+        if days <= 0:
+            return []
+
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            total_units = self._query_occupancy(cursor, property_id, days)
+            rows = cursor.fetchall()
+
+        return [
+            self._build_metrics(property_id, row['day'], total_units,
+                                row['occupied'], row['daily_revenue'] or 0)
+            for row in rows
+        ]
+
+    def get_occupancy_columns(self, property_id: int, days: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Occupancy forecast as one NumPy array per metric, for charts and aggregates.
+
+        Returns:
+            Dict with date, occupied_units, occupancy_rate, daily_revenue, adr and
+            revpar arrays, rounded like get_occupancy_forecast (empty if days <= 0)
+        """
+        if days is None:
+            days = self.DEFAULT_CALENDAR_DAYS
+
+        if days <= 0:
+            return {
+                'date': np.array([]),
+                'occupied_units': np.array([], dtype=np.int64),
+                'occupancy_rate': np.array([]),
+                'daily_revenue': np.array([]),
+                'adr': np.array([]),
+                'revpar': np.array([])
+            }
+
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            total_units = self._query_occupancy(cursor, property_id, days)
+            columns = self._fetch_columns(cursor, ('date', 'occupied', 'daily_revenue'))
+
+        occupied = columns['occupied'].astype(np.int64)
+        revenue = np.nan_to_num(columns['daily_revenue'].astype(float))  # SUM over no rows is NULL
+        units = max(total_units, 1)
+
+        return {
+            'date': columns['date'],
+            'occupied_units': occupied,
+            'occupancy_rate': (occupied / units * 100 if total_units > 0 else np.zeros(len(occupied))).round(2),
+            'daily_revenue': revenue.round(2),
+            'adr': np.where(occupied > 0, revenue / np.maximum(occupied, 1), 0).round(2),
+            'revpar': (revenue / units if total_units > 0 else np.zeros(len(revenue))).round(2)
+        }
+
+    def _query_occupancy(self, cursor, property_id: int, days: int) -> int:
+        """
+        Run the per-day occupancy query for the next days (rows: day, occupied, daily_revenue).
+
+        Returns:
+            The property's active unit count
+        """
+        cursor.execute("""
+            SELECT COUNT(*) as total FROM units WHERE property_id = ? AND is_active = 1
+        """, (property_id,))
+        total_units = cursor.fetchone()['total']
+
+        # Occupancy and revenue for every day of the horizon in one query
+        cursor.execute("""
+            WITH RECURSIVE horizon(day, n) AS (
+                SELECT ?, 1
+                UNION ALL
+                SELECT date(day, '+1 day'), n + 1 FROM horizon WHERE n < ?
+            )
+            SELECT h.day,
+                   COUNT(DISTINCT r.unit_id) as occupied,
+                   SUM(r.total_price / r.nights) as daily_revenue
+            FROM horizon h
+            LEFT JOIN (
+                SELECT r.* FROM reservations r
+                JOIN units u ON r.unit_id = u.id
+                WHERE u.property_id = ? AND r.status = 'confirmed'
+            ) r ON r.check_in <= h.day AND r.check_out > h.day
+            GROUP BY h.day
+            ORDER BY h.day
+        """, (date.today().isoformat(), days, property_id))
+        return total_units
+
+    @staticmethod
+    def _fetch_columns(cursor, columns: tuple) -> Dict[str, np.ndarray]:
+        """Remaining rows of a result set as one NumPy array per column, named in SELECT order"""
+        rows = cursor.fetchall()
+        if not rows:
+            return {name: np.array([]) for name in columns}
+        return {name: np.array(values) for name, values in zip(columns, zip(*rows))}
 
     def get_yearly_summary(self, property_id: int, year: Optional[int] = None) -> Dict:
         """Get yearly pricing and occupancy summary"""
         if year is None:
             year = date.today().year
 
-        units = self.get_units_by_property(property_id)
-        if not units:
+        # First active unit is the reference (only its id is needed)
+        with self._conn() as conn:
+            unit = conn.execute(
+                "SELECT id FROM units WHERE property_id = ? AND is_active = 1 LIMIT 1", (property_id,)
+            ).fetchone()
+        if not unit:
             return {}
 
         # Generate full year calendar for first unit as reference
-        calendar = self.generate_yearly_calendar(units[0]['id'], year)
+        start_date, end_date = self._year_range(year)
+        calendar = self.generate_pricing_arrays(unit['id'], start_date=start_date, end_date=end_date)
 
         if not calendar:
             return {}
 
-        prices = [day['final_price'] for day in calendar]
-
-        # Group by month
-        monthly_data = {}
-        for day in calendar:
-            month = day['date'][:7]  # YYYY-MM
-            if month not in monthly_data:
-                monthly_data[month] = []
-            monthly_data[month].append(day['final_price'])
+        prices = calendar.final / 100
 
-        monthly_avg = {month: sum(prices)/len(prices) for month, prices in monthly_data.items()}
+        # Group by month (YYYY-MM); np.unique sorts, which is calendar order
+        months, month_idx = np.unique(np.datetime_as_string(calendar.dates, unit='M'),
+                                      return_inverse=True)
+        monthly_avg = np.bincount(month_idx, weights=prices) / np.bincount(month_idx)
 
         return {
             'year': year,
             'total_days': len(calendar),
-            'avg_price': round(sum(prices) / len(prices), 2),
-            'min_price': round(min(prices), 2),
-            'max_price': round(max(prices), 2),
-            'monthly_averages': {k: round(v, 2) for k, v in monthly_avg.items()}
+            'avg_price': round(float(prices.mean()), 2),
+            'min_price': round(float(prices.min()), 2),
+            'max_price': round(float(prices.max()), 2),
+            'monthly_averages': {month: round(avg, 2)
+                                 for month, avg in zip(months.tolist(), monthly_avg.tolist())}
         }
 
+    # ============================================
+    # COMP SET (Competitor Tracking)
+    # ============================================
+
+    def add_competitor(self, property_id: int, competitor_name: str, **kwargs) -> int:
+        """Add a competitor to a property's comp set"""
+        with self._conn() as conn:
+            fields = ('property_id', 'competitor_name') + tuple(kwargs.keys())
+            cursor = conn.execute(_insert_sql('comp_set', fields),
+                                  [property_id, competitor_name] + list(kwargs.values()))
+            comp_set_id = cursor.lastrowid
+        return comp_set_id
+
+    def record_comp_pricing(self, comp_set_id: int, df) -> int:
+        """
+        Bulk-record competitor prices, e.g. from hotel_intel.get_60_day_insight.
+
+        Args:
+            comp_set_id: Competitor the prices belong to
+            df: DataFrame with a Date column and Rate_Float (or numeric Rate);
+                Rooms Available, when present, sets is_available
+
+        Returns:
+            Number of rows recorded
+        """
+        if df is None or df.empty or 'Date' not in df:
+            return 0
+        price_col = 'Rate_Float' if 'Rate_Float' in df else 'Rate'
+        if price_col not in df:
+            return 0
+
+        # Whole columns at once; str() of a date or Timestamp starts with YYYY-MM-DD
+        dates = [str(d)[:10] for d in df['Date'].tolist()]
+        prices = df[price_col].astype(float).tolist()
+        if 'Rooms Available' in df:
+            available = (df['Rooms Available'] > 0).tolist()
+        else:
+            available = [None] * len(dates)
+
+        with self.transaction() as conn:
+            conn.executemany(
+                _insert_sql('comp_pricing_history', ('comp_set_id', 'tracked_date', 'price', 'is_available')),
+                [(comp_set_id, d, p, a) for d, p, a in zip(dates, prices, available)]
+            )
+        return len(dates)
+
 
 # ============================================
 # STREAMLIT INTEGRATION HELPER
@@ -668,30 +1277,34 @@ if __name__ == "__main__":
     # Quick test
     pms = CasitaPMS("casita_pms_test.db")
 
-    # Create a parent property
-    prop_id = pms.create_property(
-        name="South Beach Suites",
-        nickname="SBS",
-        city="Miami Beach",
-        state="FL",
-        base_price=250.00,
-        min_price=150.00,
-        max_price=500.00
-    )
-    print(f"Created property: {prop_id}")
-
-    # Create child units
-    unit1 = pms.create_unit(prop_id, "Oceanfront Suite 101", unit_type="Oceanfront Suite", price_modifier=20)
-    unit2 = pms.create_unit(prop_id, "Standard King 102", unit_type="Standard King", price_modifier=0)
-    unit3 = pms.create_unit(prop_id, "Economy Room 103", unit_type="Economy", price_modifier=-15)
-    print(f"Created units: {unit1}, {unit2}, {unit3}")
-
-    # Add pricing rules
-    pms.add_seasonal_pricing(prop_id, "Summer Peak", "2026-06-01", "2026-08-31", 30, "percent")
-    pms.add_day_of_week_pricing(prop_id, 4, 15)  # Friday +15%
-    pms.add_day_of_week_pricing(prop_id, 5, 20)  # Saturday +20%
-    pms.add_last_minute_discount(prop_id, 3, 10)  # 10% off within 3 days
-    pms.add_orphan_day_pricing(prop_id, 1, 15)  # 15% off single gap nights
+    # Seed the demo data in one transaction
+    with pms.transaction():
+        # Create a parent property
+        prop_id = pms.create_property(
+            name="South Beach Suites",
+            nickname="SBS",
+            city="Miami Beach",
+            state="FL",
+            base_price=250.00,
+            min_price=150.00,
+            max_price=500.00
+        )
+        print(f"Created property: {prop_id}")
+
+        # Create child units
+        unit1, unit2, unit3 = pms.create_units_bulk(prop_id, [
+            {'unit_name': "Oceanfront Suite 101", 'unit_type': "Oceanfront Suite", 'price_modifier': 20},
+            {'unit_name': "Standard King 102", 'unit_type': "Standard King", 'price_modifier': 0},
+            {'unit_name': "Economy Room 103", 'unit_type': "Economy", 'price_modifier': -15},
+        ])
+        print(f"Created units: {unit1}, {unit2}, {unit3}")
+
+        # Add pricing rules
+        pms.add_seasonal_pricing(prop_id, "Summer Peak", "2026-06-01", "2026-08-31", 30, "percent")
+        pms.add_day_of_week_pricing(prop_id, 4, 15)  # Friday +15%
+        pms.add_day_of_week_pricing(prop_id, 5, 20)  # Saturday +20%
+        pms.add_last_minute_discount(prop_id, 3, 10)  # 10% off within 3 days
+        pms.add_orphan_day_pricing(prop_id, 1, 15)  # 15% off single gap nights
 
     # Generate pricing calendar
     calendar = pms.generate_pricing_calendar(unit1, days=7)
@@ -334,3 +334,8 @@ CREATE INDEX IF NOT EXISTS idx_reservations_dates ON reservations(check_in, chec
 CREATE INDEX IF NOT EXISTS idx_reservations_unit ON reservations(unit_id);
 CREATE INDEX IF NOT EXISTS idx_smart_pricing_date ON smart_pricing_sync(property_id, sync_date);
 CREATE INDEX IF NOT EXISTS idx_daily_metrics_date ON daily_metrics(property_id, metric_date);
+
+-- Pricing rule lookups (rules are read per property, in priority order)
+CREATE INDEX IF NOT EXISTS idx_seasonal_property_adjustment ON seasonal_pricing(property_id, adjustment_value);
+CREATE INDEX IF NOT EXISTS idx_last_minute_property_days ON last_minute_pricing(property_id, days_before_checkin);
+CREATE INDEX IF NOT EXISTS idx_reservations_unit_dates ON reservations(unit_id, check_in, check_out, status);
@@ -7,47 +7,141 @@ API Documentation: https://developers.google.com/hotels/hotel-prices/api-referen
 
 import os
 import json
-import requests
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+import time
+import asyncio
+import threading
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, List, Dict, Any, Iterator, Tuple, Union
 from dotenv import load_dotenv
 
+try:
+    import aiohttp  # Optional, only needed by AsyncGoogleHotelsAPI
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    import orjson  # Faster JSON encoding/decoding for API bodies and reports
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+try:
+    import ijson  # Optional incremental parser for large report responses
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 load_dotenv()
 
 
+def _iso(value: Union[date, datetime, str, None]) -> Optional[str]:
+    """Format a report date as YYYY-MM-DD, validating string input"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()[:10]
+    return date.fromisoformat(value).isoformat()
+
+
+@lru_cache(maxsize=32)
+def _report_window(start_date: Union[date, datetime, str, None],
+                   end_date: Union[date, datetime, str, None]) -> Tuple[Optional[str], Optional[str]]:
+    """(startDate, endDate) strings for a report window; repeated polls hit the cache"""
+    return _iso(start_date), _iso(end_date)
+
+
 class GoogleHotelsAPI:
     """Google Travel Partner API Client for hotel pricing and management"""
 
     BASE_URL = "https://travelpartner.googleapis.com/v3"
     TOKEN_URL = "https://oauth2.googleapis.com/token"
     SCOPE = "https://www.googleapis.com/auth/travelpartner"
+    TOKEN_REFRESH_MARGIN = timedelta(seconds=60)
+    # Hotel IDs sent per hotels:setLiveOnGoogle call
+    LIVE_BATCH_SIZE = 100
+    # Rate limits and transient server errors are retried with exponential backoff
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.5
 
     def __init__(self, service_account_file: str = None, account_id: str = None):
         self.service_account_file = service_account_file or os.getenv(
             'GOOGLE_SERVICE_ACCOUNT_FILE', 'service_account.json'
         )
         self.account_id = account_id or os.getenv('GOOGLE_HOTEL_ACCOUNT_ID', '')
-        self._access_token = None
-        self._token_expiry = None
+        self._credentials = None
+        # One token refresh per expiry window, however many threads are calling
+        self._token_lock = threading.Lock()
+        self._client_lock = threading.Lock()
+        # Built on first request so importing/constructing stays cheap
+        self._http_client = None
+        # Every endpoint is account scoped, so build the prefix once
+        self._url_prefix = f"{self.BASE_URL}/accounts/{self.account_id}"
+        # endpoint -> (ETag, parsed body) for rarely changing GET resources
+        self._etag_cache: Dict[str, Tuple[str, Any]] = {}
+
+    @property
+    def _client(self):
+        """Pooled httpx.Client, created on first use"""
+        if self._http_client is None:
+            with self._client_lock:
+                if self._http_client is None:
+                    self._http_client = self._build_client()
+        return self._http_client
+
+    def _build_client(self):
+        """Keep-alive client; multiplexes concurrent calls over HTTP/2 when h2 is installed"""
+        import httpx
+
+        try:
+            import h2  # noqa: F401 - enables HTTP/2 in httpx (pip install httpx[http2])
+            http2 = True
+        except ImportError:
+            http2 = False
 
-    def _get_access_token(self) -> str:
-        """Get OAuth2 access token using service account credentials"""
-        if self._access_token and self._token_expiry:
-            if datetime.now() < self._token_expiry:
-                return self._access_token
+        headers = {'Content-Type': 'application/json'}
+        # A client rebuilt after close() must carry the still-valid token, since
+        # _get_access_token only sets the header when it refreshes
+        credentials = self._credentials
+        if credentials is not None and credentials.token:
+            headers['Authorization'] = 'Bearer ' + credentials.token
+
+        return httpx.Client(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            headers=headers,
+            # Pool settings go on the transport: httpx ignores the client's when one is given.
+            # Connection errors only; status retries happen in _send
+            transport=httpx.HTTPTransport(
+                http2=http2,
+                limits=httpx.Limits(max_keepalive_connections=8, max_connections=32),
+                retries=3
+            )
+        )
+
+    def close(self):
+        """Release pooled connections"""
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+
+    def _load_credentials(self):
+        """Load service account credentials once; they are refreshed in place"""
+        if self._credentials is not None:
+            return self._credentials
 
         try:
             from google.oauth2 import service_account
-            from google.auth.transport.requests import Request
 
-            credentials = service_account.Credentials.from_service_account_file(
+            self._credentials = service_account.Credentials.from_service_account_file(
                 self.service_account_file,
                 scopes=[self.SCOPE]
             )
-            credentials.refresh(Request())
-            self._access_token = credentials.token
-            self._token_expiry = credentials.expiry or (datetime.now() + timedelta(hours=1))
-            return self._access_token
+            return self._credentials
 
         except ImportError:
             raise Exception(
@@ -60,39 +154,135 @@ class GoogleHotelsAPI:
                 "Set GOOGLE_SERVICE_ACCOUNT_FILE in .env"
             )
 
+    def _token_is_fresh(self, credentials) -> bool:
+        """True while the cached token is more than TOKEN_REFRESH_MARGIN from expiry"""
+        if not credentials.token or not credentials.expiry:
+            return False
+        # google-auth keeps expiry as naive UTC
+        return credentials.expiry - datetime.utcnow() > self.TOKEN_REFRESH_MARGIN
+
+    def _get_access_token(self, force_refresh: bool = False) -> str:
+        """Get OAuth2 access token, refreshing only when close to expiry"""
+        # Lock-free fast path for the common case of a valid cached token
+        credentials = self._credentials
+        if not force_refresh and credentials is not None and self._token_is_fresh(credentials):
+            return credentials.token
+        rejected = credentials.token if credentials is not None else None
+
+        with self._token_lock:
+            # Another thread may have refreshed while this one waited
+            credentials = self._load_credentials()
+            if force_refresh:
+                if credentials.token != rejected and self._token_is_fresh(credentials):
+                    return credentials.token
+            elif self._token_is_fresh(credentials):
+                return credentials.token
+
+            from google.auth.transport.requests import Request
+
+            credentials.refresh(Request())
+            # Sent by every pooled request until the next refresh
+            self._client.headers['Authorization'] = 'Bearer ' + credentials.token
+            return credentials.token
+
+    def _retry_delay(self, response, retry: int) -> float:
+        """Seconds to wait before retrying, honouring Retry-After"""
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return float(retry_after)
+        return self.RETRY_BACKOFF * (2 ** retry)
+
+    def _send(self, method: str, endpoint: str, stream: bool = False, **kwargs):
+        """
+        Send one API call: re-authenticate once on 401, back off on 429/5xx.
+
+        Returns:
+            httpx.Response (unread when stream=True; the caller must close it)
+        """
+        self._get_access_token()
+        reauthenticated = False
+        retries = 0
+
+        while True:
+            # Rebuilt each pass so a refreshed Authorization header is picked up
+            request = self._client.build_request(method, self._url_prefix + endpoint, **kwargs)
+            response = self._client.send(request, stream=stream)
+
+            if response.status_code == 401 and not reauthenticated:
+                reauthenticated = True
+                response.close()
+                self._get_access_token(force_refresh=True)
+                continue
+
+            if response.status_code in self.RETRY_STATUSES and retries < self.MAX_RETRIES:
+                response.close()
+                time.sleep(self._retry_delay(response, retries))
+                retries += 1
+                continue
+
+            return response
+
     def _make_request(self, method: str, endpoint: str, params: Dict = None,
-                      data: Dict = None) -> Dict:
-        """Make authenticated request to Google Travel Partner API"""
-        token = self._get_access_token()
-        url = f"{self.BASE_URL}{endpoint}"
-
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
-
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=headers,
-            params=params,
-            json=data
-        )
+                      data: Dict = None, use_etag: bool = False) -> Dict:
+        """
+        Make authenticated request to an account-scoped Travel Partner endpoint.
+
+        Args:
+            use_etag: Revalidate a cached GET body with If-None-Match
+        """
+        # Serialize once so retried attempts reuse the same body
+        body = _json_dumps(data) if data is not None else None
+        cached = self._etag_cache.get(endpoint) if use_etag else None
+        headers = {'If-None-Match': cached[0]} if cached else None
+
+        response = self._send(method, endpoint, params=params, content=body, headers=headers)
 
-        if response.status_code == 401:
-            self._access_token = None
-            return self._make_request(method, endpoint, params, data)
+        if cached and response.status_code == 304:
+            return cached[1]
 
         if response.status_code >= 400:
             raise Exception(
                 f"Google Hotels API error ({response.status_code}): {response.text}"
             )
 
-        return response.json()
+        result = _json_loads(response.content)
+        if use_etag and response.headers.get('ETag'):
+            self._etag_cache[endpoint] = (response.headers['ETag'], result)
+        return result
 
-    @property
-    def _account_path(self) -> str:
-        return f"/accounts/{self.account_id}"
+    def _make_request_stream(self, method: str, endpoint: str, items_key: str,
+                             params: Dict = None) -> Iterator[Dict]:
+        """
+        Make authenticated request and yield records of one array as they arrive.
+
+        Args:
+            items_key: Top-level response key holding the record array
+
+        Returns:
+            Generator of records, parsed incrementally with ijson
+        """
+        if not IJSON_AVAILABLE:
+            raise Exception("ijson library required. Install with: pip install ijson")
+
+        response = self._send(method, endpoint, stream=True, params=params)
+        try:
+            if response.status_code >= 400:
+                response.read()
+                raise Exception(
+                    f"Google Hotels API error ({response.status_code}): {response.text}"
+                )
+
+            # Push decoded (gunzipped) chunks into ijson as they arrive
+            records = ijson.sendable_list()
+            parser = ijson.items_coro(records, f'{items_key}.item')
+            for chunk in response.iter_bytes():
+                parser.send(chunk)
+                yield from records
+                del records[:]
+            parser.close()
+            yield from records
+        finally:
+            response.close()
 
     # ============================================
     # HOTELS
@@ -102,7 +292,7 @@ class GoogleHotelsAPI:
         """Enable or disable hotels on Google"""
         return self._make_request(
             'POST',
-            f'{self._account_path}/hotels:setLiveOnGoogle',
+            '/hotels:setLiveOnGoogle',
             data={
                 'liveOnGoogle': live,
                 'hotelIds': hotel_ids
@@ -117,7 +307,7 @@ class GoogleHotelsAPI:
         """Get price view for a specific property"""
         return self._make_request(
             'GET',
-            f'{self._account_path}/priceViews/{property_id}'
+            f'/priceViews/{property_id}'
         )
 
     # ============================================
@@ -128,7 +318,8 @@ class GoogleHotelsAPI:
         """List all account links"""
         response = self._make_request(
             'GET',
-            f'{self._account_path}/accountLinks'
+            '/accountLinks',
+            use_etag=True
         )
         return response.get('accountLinks', [])
 
@@ -136,14 +327,15 @@ class GoogleHotelsAPI:
         """Get a specific account link"""
         return self._make_request(
             'GET',
-            f'{self._account_path}/accountLinks/{link_id}'
+            f'/accountLinks/{link_id}',
+            use_etag=True
         )
 
     def create_account_link(self, link_data: Dict) -> Dict:
         """Create a new account link"""
         return self._make_request(
             'POST',
-            f'{self._account_path}/accountLinks',
+            '/accountLinks',
             data=link_data
         )
 
@@ -151,7 +343,7 @@ class GoogleHotelsAPI:
         """Update an account link"""
         return self._make_request(
             'PATCH',
-            f'{self._account_path}/accountLinks/{link_id}',
+            f'/accountLinks/{link_id}',
             data=link_data
         )
 
@@ -159,7 +351,7 @@ class GoogleHotelsAPI:
         """Delete an account link"""
         return self._make_request(
             'DELETE',
-            f'{self._account_path}/accountLinks/{link_id}'
+            f'/accountLinks/{link_id}'
         )
 
     # ============================================
@@ -170,7 +362,8 @@ class GoogleHotelsAPI:
         """List all brands"""
         response = self._make_request(
             'GET',
-            f'{self._account_path}/brands'
+            '/brands',
+            use_etag=True
         )
         return response.get('brands', [])
 
@@ -178,14 +371,15 @@ class GoogleHotelsAPI:
         """Get a specific brand"""
         return self._make_request(
             'GET',
-            f'{self._account_path}/brands/{brand_id}'
+            f'/brands/{brand_id}',
+            use_etag=True
         )
 
     def create_brand(self, brand_data: Dict) -> Dict:
         """Create a new brand"""
         return self._make_request(
             'POST',
-            f'{self._account_path}/brands',
+            '/brands',
             data=brand_data
         )
 
@@ -193,7 +387,7 @@ class GoogleHotelsAPI:
         """Update a brand"""
         return self._make_request(
             'PATCH',
-            f'{self._account_path}/brands/{brand_id}',
+            f'/brands/{brand_id}',
             data=brand_data
         )
 
@@ -201,44 +395,67 @@ class GoogleHotelsAPI:
     # REPORTS & ANALYTICS
     # ============================================
 
-    def get_participation_report(self, start_date: str = None, end_date: str = None) -> Dict:
+    def get_participation_report(self, start_date: Union[date, str] = None,
+                                 end_date: Union[date, str] = None,
+                                 stream: bool = False) -> Union[Dict, Iterator[Dict]]:
         """
         Get participation report showing how properties appear on Google.
 
         Args:
-            start_date: Start date (YYYY-MM-DD)
-            end_date: End date (YYYY-MM-DD)
+            start_date: Start date (date/datetime or YYYY-MM-DD)
+            end_date: End date (date/datetime or YYYY-MM-DD)
+            stream: Yield report rows incrementally instead of loading the whole body
         """
+        start, end = _report_window(start_date, end_date)
         params = {}
-        if start_date:
-            params['startDate'] = start_date
-        if end_date:
-            params['endDate'] = end_date
+        if start:
+            params['startDate'] = start
+        if end:
+            params['endDate'] = end
+
+        if stream:
+            return self._make_request_stream(
+                'GET',
+                '/participationReportViews:query',
+                'participationReportViews',
+                params=params
+            )
 
         return self._make_request(
             'GET',
-            f'{self._account_path}/participationReportViews:query',
+            '/participationReportViews:query',
             params=params
         )
 
-    def get_property_performance_report(self, start_date: str = None,
-                                         end_date: str = None) -> Dict:
+    def get_property_performance_report(self, start_date: Union[date, str] = None,
+                                         end_date: Union[date, str] = None,
+                                         stream: bool = False) -> Union[Dict, Iterator[Dict]]:
         """
         Get property performance report with clicks, impressions, and bookings.
 
         Args:
-            start_date: Start date (YYYY-MM-DD)
-            end_date: End date (YYYY-MM-DD)
+            start_date: Start date (date/datetime or YYYY-MM-DD)
+            end_date: End date (date/datetime or YYYY-MM-DD)
+            stream: Yield report rows incrementally instead of loading the whole body
         """
+        start, end = _report_window(start_date, end_date)
         params = {}
-        if start_date:
-            params['startDate'] = start_date
-        if end_date:
-            params['endDate'] = end_date
+        if start:
+            params['startDate'] = start
+        if end:
+            params['endDate'] = end
+
+        if stream:
+            return self._make_request_stream(
+                'GET',
+                '/propertyPerformanceReportViews:query',
+                'propertyPerformanceReportViews',
+                params=params
+            )
 
         return self._make_request(
             'GET',
-            f'{self._account_path}/propertyPerformanceReportViews:query',
+            '/propertyPerformanceReportViews:query',
             params=params
         )
 
@@ -246,18 +463,25 @@ class GoogleHotelsAPI:
         """Get price accuracy report to identify pricing discrepancies"""
         return self._make_request(
             'GET',
-            f'{self._account_path}/priceAccuracyViews'
+            '/priceAccuracyViews'
         )
 
     # ============================================
     # RECONCILIATION REPORTS
     # ============================================
 
-    def list_reconciliation_reports(self) -> List[Dict]:
-        """List reconciliation reports"""
+    def list_reconciliation_reports(self, stream: bool = False) -> Union[List[Dict], Iterator[Dict]]:
+        """List reconciliation reports (stream=True yields them incrementally)"""
+        if stream:
+            return self._make_request_stream(
+                'GET',
+                '/reconciliationReports',
+                'reconciliationReports'
+            )
+
         response = self._make_request(
             'GET',
-            f'{self._account_path}/reconciliationReports'
+            '/reconciliationReports'
         )
         return response.get('reconciliationReports', [])
 
@@ -265,7 +489,7 @@ class GoogleHotelsAPI:
         """Create a reconciliation report"""
         return self._make_request(
             'POST',
-            f'{self._account_path}/reconciliationReports',
+            '/reconciliationReports',
             data=report_data
         )
 
@@ -273,12 +497,13 @@ class GoogleHotelsAPI:
     # SYNC FROM CASITA PMS
     # ============================================
 
-    def sync_from_casita_pms(self, pms) -> Dict[str, int]:
+    def sync_from_casita_pms(self, pms, max_workers: int = 16) -> Dict[str, int]:
         """
         Sync Casita PMS properties to Google Hotels.
 
         Args:
             pms: CasitaPMS instance
+            max_workers: Batches pushed to Google in parallel
 
         Returns:
             Dict with counts of synced properties
@@ -287,19 +512,155 @@ class GoogleHotelsAPI:
 
         try:
             properties = pms.get_all_properties()
+            batches = self._live_batches(properties)
 
-            for prop in properties:
+            if batches:
+                # Authenticate (and build the client) once before fanning out
                 try:
-                    hotel_id = prop.get('airbnb_listing_id') or str(prop.get('id'))
-                    self.set_live_on_google([hotel_id], live=True)
-                    stats['synced'] += 1
+                    self._get_access_token()
                 except Exception as e:
-                    stats['errors'].append(
-                        f"Property {prop.get('name')}: {str(e)}"
+                    stats['errors'].append(f"Auth Error: {str(e)}")
+                    return stats
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        self.set_live_on_google,
+                        [self._hotel_id(prop) for prop in batch],
+                        True
+                    ): batch
+                    for batch in batches
+                }
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    try:
+                        future.result()
+                        stats['synced'] += len(batch)
+                    except Exception as e:
+                        stats['errors'].append(self._batch_error(batch, e))
+
+        except Exception as e:
+            stats['errors'].append(f"PMS Error: {str(e)}")
+
+        return stats
+
+    @staticmethod
+    def _hotel_id(prop: Dict) -> str:
+        """Google hotel ID for a Casita property"""
+        return prop.get('airbnb_listing_id') or str(prop.get('id'))
+
+    def _live_batches(self, properties: List[Dict]) -> List[List[Dict]]:
+        """Split properties into setLiveOnGoogle-sized batches"""
+        size = self.LIVE_BATCH_SIZE
+        return [properties[i:i + size] for i in range(0, len(properties), size)]
+
+    @staticmethod
+    def _batch_error(batch: List[Dict], error: Exception) -> str:
+        """Error line naming the properties a failed batch covered"""
+        if len(batch) == 1:
+            return f"Property {batch[0].get('name')}: {str(error)}"
+        return (f"Properties {batch[0].get('name')} .. {batch[-1].get('name')} "
+                f"({len(batch)}): {str(error)}")
+
+
+class AsyncGoogleHotelsAPI(GoogleHotelsAPI):
+    """asyncio variant that pushes many properties to Google concurrently"""
+
+    MAX_CONCURRENCY = 32
+
+    async def _aget_access_token(self, force_refresh: bool = False) -> str:
+        """_get_access_token, with a google-auth refresh run off the event loop"""
+        credentials = self._credentials
+        if not force_refresh and credentials is not None and self._token_is_fresh(credentials):
+            return credentials.token
+        return await asyncio.to_thread(self._get_access_token, force_refresh)
+
+    async def _make_request_async(self, http, method: str, endpoint: str,
+                                  params: Dict = None, data: Dict = None) -> Dict:
+        """Make authenticated request on a shared aiohttp session"""
+        for attempt in range(2):
+            # Cached token, so every coroutine shares the same one
+            token = await self._aget_access_token(force_refresh=attempt > 0)
+            async with http.request(
+                method,
+                self._url_prefix + endpoint,
+                headers={'Authorization': f'Bearer {token}'},
+                params=params,
+                json=data
+            ) as response:
+                if response.status == 401 and attempt == 0:
+                    continue
+
+                if response.status >= 400:
+                    raise Exception(
+                        f"Google Hotels API error ({response.status}): {await response.text()}"
                     )
 
+                return _json_loads(await response.read())
+
+    async def set_live_on_google_async(self, http, hotel_ids: List[str],
+                                       live: bool = True) -> Dict:
+        """Enable or disable hotels on Google"""
+        return await self._make_request_async(
+            http,
+            'POST',
+            '/hotels:setLiveOnGoogle',
+            data={
+                'liveOnGoogle': live,
+                'hotelIds': hotel_ids
+            }
+        )
+
+    async def sync_from_casita_pms_async(self, pms) -> Dict[str, int]:
+        """
+        Sync Casita PMS properties to Google Hotels concurrently.
+
+        Args:
+            pms: CasitaPMS instance
+
+        Returns:
+            Dict with counts of synced properties
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise Exception("aiohttp library required. Install with: pip install aiohttp")
+
+        stats = {'synced': 0, 'errors': []}
+
+        try:
+            properties = pms.get_all_properties()
         except Exception as e:
             stats['errors'].append(f"PMS Error: {str(e)}")
+            return stats
+
+        batches = self._live_batches(properties)
+        if batches:
+            # Fetch the token up front instead of once per coroutine
+            try:
+                await self._aget_access_token()
+            except Exception as e:
+                stats['errors'].append(f"Auth Error: {str(e)}")
+                return stats
+
+        sem = asyncio.Semaphore(self.MAX_CONCURRENCY)
+
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=64),
+            timeout=aiohttp.ClientTimeout(total=30, sock_connect=3.05)
+        ) as http:
+
+            async def bounded(batch: List[Dict]) -> Dict:
+                async with sem:
+                    hotel_ids = [self._hotel_id(prop) for prop in batch]
+                    return await self.set_live_on_google_async(http, hotel_ids, live=True)
+
+            tasks = [asyncio.create_task(bounded(batch)) for batch in batches]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                stats['errors'].append(self._batch_error(batch, result))
+            else:
+                stats['synced'] += len(batch)
 
         return stats
 
@@ -6,14 +6,154 @@ API Documentation: https://open-api-docs.guesty.com/
 """
 
 import os
+import time
+import asyncio
+import hashlib
+import tempfile
+import threading
 import requests
+import httpx
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 import json
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict, Any, Iterator, Tuple, Union
 from dotenv import load_dotenv
 
+try:
+    import orjson  # Faster JSON for filters, request bodies and responses
+
+    def _json_dumps(obj) -> str:
+        # Query params need str, orjson returns bytes
+        return orjson.dumps(obj).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx (pip install httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import ijson  # Optional incremental parser for large listing/reservation pages
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 load_dotenv()
 
+# Static listing filters/fields, serialized once instead of on every call
+_FIELDS_LISTING = 'title,nickname,address,prices,bedrooms,bathrooms,accommodates,propertyType,type,active'
+_FIELDS_CHILD_LISTING = _FIELDS_LISTING + ',mtl'
+_FIELDS_RESERVATION = 'listingId,checkIn,checkOut,status,money,guest,source'
+# Exactly what sync_to_casita_pms reads from each listing
+_FIELDS_SYNC = 'title,nickname,address,prices,bedrooms,bathrooms,accommodates,propertyType,type,mtl'
+_FILTER_MTL = _json_dumps({'type': {'$eq': 'MTL'}})
+_FILTER_SINGLE = _json_dumps({'type': {'$eq': 'SINGLE'}})
+_FILTER_ACTIVE = _json_dumps({'active': {'$eq': True}})
+# Child filter frame; the parent-ID list is spliced in per call
+_FILTER_CHILDREN = '{"type":{"$eq":"MTL_CHILD"},"mtl.p":{"$in":%s}}'
+
+# Rate limits and transient gateway errors, retried with backoff
+_RETRY_STATUSES = (429, 502, 503, 504)
+
+# One keep-alive pool per process, shared by every GuestyAPI instance
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    """Keep-alive session so repeated calls reuse TCP/TLS connections"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        # Retry rate limits and transient gateway errors with backoff
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=_RETRY_STATUSES,
+                          raise_on_status=False)
+    )
+    session.mount('https://', adapter)
+    session.headers.update({
+        'Content-Type': 'application/json',
+        # gzip/deflate, plus br when brotli is installed to decode it
+        'Accept-Encoding': make_headers(accept_encoding=True)['accept-encoding']
+    })
+    return session
+
+
+@lru_cache(maxsize=8)
+def _auth_header(token: str) -> Dict[str, str]:
+    """Authorization header for a token, built once per token"""
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _get_session() -> requests.Session:
+    """Shared session, built on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _close_session():
+    """Release the shared pool's connections (process shutdown; in-flight requests on it fail)"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+# On-disk conditional-GET cache, so validators survive between sync runs. One JSON
+# file per request key, each replaced atomically, so the Streamlit app and sync
+# workers can share it without holding a lock. Lives beside the bot's training snapshot.
+HTTP_CACHE_DIR = os.getenv('CASITAI_CACHE_DIR', os.path.expanduser('~/.casitai'))
+HTTP_CACHE_PATH = os.getenv('GUESTY_HTTP_CACHE', os.path.join(HTTP_CACHE_DIR, 'guesty_http_cache'))
+
+
+def _http_cache_file(key: str) -> str:
+    """Path of the cache entry for a request key"""
+    return os.path.join(HTTP_CACHE_PATH, hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '.json')
+
+
+def _http_cache_get(key: str) -> Optional[Dict]:
+    """Cached validators plus body/items for a request key, if any"""
+    try:
+        with open(_http_cache_file(key), 'rb') as f:
+            return _json_loads(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Guesty HTTP cache read failed: {e}")
+        return None
+
+
+def _http_cache_put(key: str, entry: Dict):
+    """Store validators and parsed body/items for a request key"""
+    tmp_path = None
+    try:
+        os.makedirs(HTTP_CACHE_PATH, exist_ok=True)
+        # Write beside the entry and rename over it, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=HTTP_CACHE_PATH, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(_json_dumps(entry))
+        os.replace(tmp_path, _http_cache_file(key))
+    except Exception as e:
+        print(f"Guesty HTTP cache write failed: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
 
 class GuestyAPI:
     """Guesty API Client for fetching listings and data"""
@@ -26,6 +166,20 @@ class GuestyAPI:
     BOOKING_API_BASE_URL = "https://booking.guesty.com/api/v1"
     BOOKING_API_TOKEN_URL = "https://booking.guesty.com/oauth2/token"
 
+    # (client_id, scope, secret digest) -> (token, expiry), shared by all instances
+    _TOKEN_CACHE: Dict[Tuple[str, str, str], Tuple[str, datetime]] = {}
+    _TOKEN_LOCK = threading.Lock()
+    # Refresh this long before the token actually expires
+    TOKEN_REFRESH_SKEW = timedelta(minutes=5)
+    # Listings written per PMS transaction during sync
+    SYNC_CHUNK_SIZE = 500
+    # Saved replies barely change, so reads are served from memory for this long
+    SAVED_REPLIES_TTL = 300
+    SAVED_REPLIES_CACHE_SIZE = 512
+    # (account key, method, args) -> (response, monotonic expiry), oldest first
+    _REPLY_CACHE: "OrderedDict[tuple, Tuple[Any, float]]" = OrderedDict()
+    _REPLY_LOCK = threading.Lock()
+
     def __init__(self, client_id: str = None, client_secret: str = None, use_booking_api: bool = None):
         self.client_id = client_id or os.getenv('GUESTY_CLIENT_ID', '')
         self.client_secret = client_secret or os.getenv('GUESTY_CLIENT_SECRET', '')
@@ -39,69 +193,209 @@ class GuestyAPI:
         self.use_booking_api = use_booking_api
         self.BASE_URL = self.BOOKING_API_BASE_URL if use_booking_api else self.OPEN_API_BASE_URL
         self.TOKEN_URL = self.BOOKING_API_TOKEN_URL if use_booking_api else self.OPEN_API_TOKEN_URL
+        self.scope = 'booking_engine:api' if use_booking_api else 'open-api'
+        # Secret is hashed so the cache never holds it in the clear
+        self._token_key = (self.client_id, self.scope,
+                           hashlib.sha256(self.client_secret.encode()).hexdigest())
+
+    def close(self):
+        """
+        Nothing to release per instance: the connection pool is shared by every
+        client and thread. Call _close_session() to tear the pool down at shutdown.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def _get_access_token(self) -> str:
         """Get OAuth2 access token from Guesty"""
         # Check if we have a valid cached token
         if self._access_token and self._token_expiry:
-            if datetime.now() < self._token_expiry:
+            if datetime.now() + self.TOKEN_REFRESH_SKEW < self._token_expiry:
                 return self._access_token
 
-        # Set scope based on API type
-        scope = 'booking_engine:api' if self.use_booking_api else 'open-api'
+        with self._TOKEN_LOCK:
+            # Another instance (or thread) may already hold a live token
+            cached = self._TOKEN_CACHE.get(self._token_key)
+            if cached and datetime.now() + self.TOKEN_REFRESH_SKEW < cached[1]:
+                self._access_token, self._token_expiry = cached
+                return self._access_token
 
-        # Request new token
-        response = requests.post(
-            self.TOKEN_URL,
-            data={
-                'grant_type': 'client_credentials',
-                'scope': scope,
-                'client_id': self.client_id,
-                'client_secret': self.client_secret
-            },
-            headers={
-                'Content-Type': 'application/x-www-form-urlencoded'
-            }
-        )
+            # Request new token
+            response = _get_session().post(
+                self.TOKEN_URL,
+                data={
+                    'grant_type': 'client_credentials',
+                    'scope': self.scope,
+                    'client_id': self.client_id,
+                    'client_secret': self.client_secret
+                },
+                headers={
+                    'Content-Type': 'application/x-www-form-urlencoded'
+                }
+            )
+
+            if response.status_code != 200:
+                raise Exception(f"Failed to get Guesty access token: {response.text}")
+
+            data = _json_loads(response.content)
+            self._access_token = data['access_token']
+            # Token expires in 24 hours; checks above refresh TOKEN_REFRESH_SKEW early
+            self._token_expiry = datetime.now() + timedelta(seconds=data.get('expires_in', 86400))
+            self._TOKEN_CACHE[self._token_key] = (self._access_token, self._token_expiry)
+
+            return self._access_token
+
+    def _invalidate_token(self):
+        """Drop a token Guesty rejected, here and in the shared cache"""
+        with self._TOKEN_LOCK:
+            cached = self._TOKEN_CACHE.get(self._token_key)
+            if cached and cached[0] == self._access_token:
+                del self._TOKEN_CACHE[self._token_key]
+        self._access_token = None
 
-        if response.status_code != 200:
-            raise Exception(f"Failed to get Guesty access token: {response.text}")
+    def _make_request(self, method: str, endpoint: str, params: Dict = None,
+                      data: Dict = None, conditional: bool = False) -> Dict:
+        """
+        Make authenticated request to Guesty API.
 
-        data = response.json()
-        self._access_token = data['access_token']
-        # Token expires in 24 hours, refresh 1 hour early
-        self._token_expiry = datetime.now() + timedelta(seconds=data.get('expires_in', 86400) - 3600)
+        Args:
+            conditional: For GETs, revalidate a cached body with
+                If-None-Match/If-Modified-Since and reuse it on 304
+        """
+        url = f"{self.BASE_URL}{endpoint}"
+        # Serialize once; the session already sends Content-Type: application/json
+        body = _json_dumps(data) if data is not None else None
+
+        cache_key, cached, validators = None, None, {}
+        if conditional and method == 'GET':
+            cache_key, cached, validators = self._conditional_get(url, params)
+
+        for attempt in range(2):
+            token = self._get_access_token()
+            response = _get_session().request(
+                method=method,
+                url=url,
+                headers={**_auth_header(token), **validators} if validators else _auth_header(token),
+                params=params,
+                data=body
+            )
+
+            if response.status_code == 401 and attempt == 0:
+                # Token expired or revoked: drop it and retry once
+                self._invalidate_token()
+                continue
+            break
+
+        if validators and response.status_code == 304:
+            return cached['body']
 
-        return self._access_token
+        if response.status_code >= 400:
+            raise Exception(f"Guesty API error ({response.status_code}): {response.text}")
 
-    def _make_request(self, method: str, endpoint: str, params: Dict = None,
-                      data: Dict = None) -> Dict:
-        """Make authenticated request to Guesty API"""
-        token = self._get_access_token()
+        result = _json_loads(response.content)
 
-        url = f"{self.BASE_URL}{endpoint}"
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
+        if cache_key:
+            self._store_validated(cache_key, response, 'body', result)
 
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=headers,
-            params=params,
-            json=data
-        )
+        return result
 
-        if response.status_code == 401:
-            # Token expired, clear and retry
-            self._access_token = None
-            return self._make_request(method, endpoint, params, data)
+    def _conditional_get(self, url: str, params: Dict = None,
+                         key_suffix: str = '') -> Tuple[str, Optional[Dict], Dict[str, str]]:
+        """
+        Look up a GET in the conditional cache.
 
-        if response.status_code >= 400:
-            raise Exception(f"Guesty API error ({response.status_code}): {response.text}")
+        Returns:
+            (cache key, cached entry or None, If-None-Match/If-Modified-Since headers)
+        """
+        # Listings differ per account, so the client ID is part of the key
+        cache_key = f"{self.client_id}|{url}|{_json_dumps(sorted((params or {}).items()))}{key_suffix}"
+        cached = _http_cache_get(cache_key)
+        validators = {}
+        if cached:
+            if cached.get('etag'):
+                validators['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                validators['If-Modified-Since'] = cached['last_modified']
+        return cache_key, cached, validators
+
+    def _store_validated(self, cache_key: str, response, field: str, value):
+        """Cache a parsed 200 response under its validators (skipped when Guesty sends none)"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            _http_cache_put(cache_key, {'etag': etag, 'last_modified': last_modified, field: value})
+
+    def _stream_request(self, method: str, endpoint: str, params: Dict = None,
+                        item_prefix: str = 'results.item', conditional: bool = False) -> Iterator[Dict]:
+        """
+        Make authenticated request and yield array items as they are parsed.
+
+        Falls back to a regular request when ijson is not installed.
+
+        Args:
+            item_prefix: ijson prefix of the items to yield ('<key>.item')
+            conditional: For GETs, revalidate the cached items and replay them on 304
+        """
+        if not IJSON_AVAILABLE:
+            response = self._make_request(method, endpoint, params=params, conditional=conditional)
+            yield from response.get(item_prefix.split('.')[0], [])
+            return
+
+        url = f"{self.BASE_URL}{endpoint}"
 
-        return response.json()
+        cache_key, cached, validators = None, None, {}
+        if conditional and method == 'GET':
+            # Items, not whole bodies, are cached here, so keep them apart from _make_request's entries
+            cache_key, cached, validators = self._conditional_get(url, params, key_suffix=f"|{item_prefix}")
+
+        for attempt in range(2):
+            token = self._get_access_token()
+            with _get_session().request(
+                method=method,
+                url=url,
+                headers={**_auth_header(token), **validators} if validators else _auth_header(token),
+                params=params,
+                stream=True
+            ) as response:
+                if response.status_code == 401 and attempt == 0:
+                    self._invalidate_token()
+                    continue
+
+                if validators and response.status_code == 304:
+                    yield from cached['items']
+                    return
+
+                if response.status_code >= 400:
+                    raise Exception(f"Guesty API error ({response.status_code}): {response.text}")
+
+                # Let urllib3 undo gzip before ijson reads the raw stream;
+                # use_float keeps prices as floats (sqlite can't bind Decimal)
+                response.raw.decode_content = True
+                items = ijson.items(response.raw, item_prefix, use_float=True)
+
+                if not cache_key:
+                    yield from items
+                    return
+
+                # Keep the page's items so a later 304 can replay them; only a
+                # fully read response is cached
+                seen = []
+                for item in items:
+                    seen.append(item)
+                    yield item
+                self._store_validated(cache_key, response, 'items', seen)
+                return
+
+    @staticmethod
+    def _unwrap(response: Union[Dict, List]) -> List[Dict]:
+        """Items of a list response, whether or not it is wrapped in {'results': [...]}"""
+        if isinstance(response, dict):
+            return response.get('results', response)
+        return response
 
     # ============================================
     # LISTINGS
@@ -135,26 +429,64 @@ class GuestyAPI:
             params['location'] = location
 
         response = self._make_request('GET', '/search', params=params)
-        return response.get('results', response) if isinstance(response, dict) else response
+        return self._unwrap(response)
+
+    def get_all_listings(self, limit: int = 100, skip: int = 0, active_only: bool = False,
+                         stream: bool = False, fields: str = None) -> Union[List[Dict], Iterator[Dict]]:
+        """
+        Get all listings from Guesty (Open API only).
 
-    def get_all_listings(self, limit: int = 100, skip: int = 0,
-                         active_only: bool = False) -> List[Dict]:
-        """Get all listings from Guesty (Open API only)"""
+        Args:
+            stream: Yield listings as they are parsed instead of returning a list
+            fields: Comma-separated fields to return (defaults to the summary fields plus mtl)
+        """
         if self.use_booking_api:
             # For Booking API, use search endpoint without filters
-            return self.search_listings()
+            listings = self.search_listings()
+            return iter(listings) if stream else listings
 
         params = {
             'limit': limit,
-            'skip': skip
+            'skip': skip,
+            'fields': fields or _FIELDS_CHILD_LISTING
         }
 
         if active_only:
-            params['filters'] = json.dumps({'active': {'$eq': True}})
+            params['filters'] = _FILTER_ACTIVE
 
-        response = self._make_request('GET', '/listings', params=params)
+        if stream:
+            return self._stream_request('GET', '/listings', params=params, conditional=True)
+
+        response = self._make_request('GET', '/listings', params=params, conditional=True)
         return response.get('results', [])
 
+    def iter_listings(self, page_size: int = 100, active_only: bool = False,
+                      fields: str = None) -> Iterator[Dict]:
+        """
+        Yield every listing, fetching the next page only when the previous one is consumed.
+
+        Args:
+            page_size: Listings per request (paged with skip)
+            active_only: Only active listings
+            fields: Comma-separated fields to return (see get_all_listings)
+        """
+        if self.use_booking_api:
+            # Search endpoint has no skip paging
+            yield from self.search_listings()
+            return
+
+        skip = 0
+        while True:
+            count = 0
+            for listing in self.get_all_listings(limit=page_size, skip=skip, active_only=active_only,
+                                                 stream=True, fields=fields):
+                count += 1
+                yield listing
+
+            if count < page_size:
+                return
+            skip += page_size
+
     def get_listing(self, listing_id: str) -> Dict:
         """Get single listing by ID"""
         response = self._make_request('GET', f'/listings/{listing_id}')
@@ -164,33 +496,52 @@ class GuestyAPI:
         """Get all parent (MTL) listings"""
         params = {
             'limit': limit,
-            'fields': 'title,nickname,address,prices,bedrooms,bathrooms,accommodates,propertyType,type,active',
-            'filters': json.dumps({'type': {'$eq': 'MTL'}})
+            'fields': _FIELDS_LISTING,
+            'filters': _FILTER_MTL
         }
 
-        response = self._make_request('GET', '/listings', params=params)
+        response = self._make_request('GET', '/listings', params=params, conditional=True)
         return response.get('results', [])
 
     def get_child_listings(self, parent_id: str) -> List[Dict]:
         """Get all child listings for a parent MTL listing"""
+        return self.get_children_for_parents([parent_id])
+
+    def get_children_for_parents(self, parent_ids: List[str], limit: int = 100) -> List[Dict]:
+        """
+        Get child listings for many parent MTL listings with one $in query per page.
+
+        Args:
+            parent_ids: Parent listing IDs
+            limit: Page size; further pages are fetched with skip
+
+        Returns:
+            Child listings, each carrying mtl.p so callers can group by parent
+        """
+        if not parent_ids:
+            return []
+
         params = {
-            'limit': 100,
-            'fields': 'title,nickname,address,prices,bedrooms,bathrooms,accommodates,propertyType,type,active',
-            'filters': json.dumps({
-                'type': {'$eq': 'MTL_CHILD'},
-                'mtl.p': {'$in': [parent_id]}
-            })
+            'limit': limit,
+            'skip': 0,
+            'fields': _FIELDS_CHILD_LISTING,
+            'filters': _FILTER_CHILDREN % _json_dumps(list(parent_ids))
         }
 
-        response = self._make_request('GET', '/listings', params=params)
-        return response.get('results', [])
+        children = []
+        while True:
+            page = self._make_request('GET', '/listings', params=params).get('results', [])
+            children.extend(page)
+            if len(page) < limit:
+                return children
+            params['skip'] += limit
 
     def get_single_listings(self, limit: int = 100) -> List[Dict]:
         """Get all single (non-MTL) listings"""
         params = {
             'limit': limit,
-            'fields': 'title,nickname,address,prices,bedrooms,bathrooms,accommodates,propertyType,type,active',
-            'filters': json.dumps({'type': {'$eq': 'SINGLE'}})
+            'fields': _FIELDS_LISTING,
+            'filters': _FILTER_SINGLE
         }
 
         response = self._make_request('GET', '/listings', params=params)
@@ -219,42 +570,46 @@ class GuestyAPI:
 
         Returns list of {date, basePrice, price, minNights, available}
         """
-        from datetime import datetime, timedelta
-
-        start = datetime.now().strftime('%Y-%m-%d')
-        end = (datetime.now() + timedelta(days=days)).strftime('%Y-%m-%d')
+        today = date.today()
+        start = today.isoformat()
+        end = (today + timedelta(days=days)).isoformat()
 
         try:
             response = self.get_calendar(listing_id, start, end)
 
             # Parse calendar data
             pricing_data = []
+            append = pricing_data.append
             data = response.get('data', response)  # Handle different response formats
 
             if isinstance(data, dict):
-                # Calendar data is usually keyed by date
-                for date_str, day_data in data.items():
+                # Calendar data is usually keyed by date; walking keys in order keeps output sorted
+                for date_str in sorted(data):
+                    day_data = data[date_str]
                     if isinstance(day_data, dict):
-                        pricing_data.append({
+                        get = day_data.get
+                        append({
                             'date': date_str,
-                            'basePrice': day_data.get('basePrice', day_data.get('price', 0)),
-                            'price': day_data.get('price', day_data.get('basePrice', 0)),
-                            'minNights': day_data.get('minNights', 1),
-                            'available': day_data.get('available', not day_data.get('booked', False)),
-                            'status': day_data.get('status', 'available')
+                            'basePrice': get('basePrice', get('price', 0)),
+                            'price': get('price', get('basePrice', 0)),
+                            'minNights': get('minNights', 1),
+                            'available': get('available', not get('booked', False)),
+                            'status': get('status', 'available')
                         })
             elif isinstance(data, list):
                 for day_data in data:
-                    pricing_data.append({
-                        'date': day_data.get('date'),
-                        'basePrice': day_data.get('basePrice', day_data.get('price', 0)),
-                        'price': day_data.get('price', day_data.get('basePrice', 0)),
-                        'minNights': day_data.get('minNights', 1),
-                        'available': day_data.get('available', True),
-                        'status': day_data.get('status', 'available')
+                    get = day_data.get
+                    append({
+                        'date': get('date'),
+                        'basePrice': get('basePrice', get('price', 0)),
+                        'price': get('price', get('basePrice', 0)),
+                        'minNights': get('minNights', 1),
+                        'available': get('available', True),
+                        'status': get('status', 'available')
                     })
+                pricing_data.sort(key=itemgetter('date'))
 
-            return sorted(pricing_data, key=lambda x: x['date']) if pricing_data else []
+            return pricing_data
 
         except Exception as e:
             print(f"Error fetching calendar pricing: {e}")
@@ -286,7 +641,7 @@ class GuestyAPI:
         """Check availability for listings"""
         params = {
             'ids': ','.join(listing_ids),
-            'available': json.dumps({
+            'available': _json_dumps({
                 'checkIn': check_in,
                 'checkOut': check_out,
                 'minOccupancy': min_occupancy
@@ -300,27 +655,61 @@ class GuestyAPI:
     # MESSAGING & SAVED REPLIES (for AI Bot)
     # ============================================
 
+    def _cached_reply_read(self, name: str, arg, fetch) -> Any:
+        """Return a saved-reply read from the TTL cache, calling fetch() on a miss"""
+        key = (self._token_key, name, arg)
+        now = time.monotonic()
+
+        with self._REPLY_LOCK:
+            entry = self._REPLY_CACHE.get(key)
+            if entry and entry[1] > now:
+                return entry[0]
+
+        # Fetch outside the lock so one slow call doesn't block other reads
+        result = fetch()
+
+        with self._REPLY_LOCK:
+            self._REPLY_CACHE[key] = (result, now + self.SAVED_REPLIES_TTL)
+            self._REPLY_CACHE.move_to_end(key)
+            while len(self._REPLY_CACHE) > self.SAVED_REPLIES_CACHE_SIZE:
+                self._REPLY_CACHE.popitem(last=False)
+
+        return result
+
+    def invalidate_saved_replies(self):
+        """Drop this account's cached saved replies (call after editing them in Guesty)"""
+        with self._REPLY_LOCK:
+            for key in [key for key in self._REPLY_CACHE if key[0] == self._token_key]:
+                del self._REPLY_CACHE[key]
+
     def get_saved_replies(self, limit: int = 100) -> List[Dict]:
-        """Get all saved replies (canned responses) from Guesty"""
-        response = self._make_request('GET', '/saved-replies', params={'limit': limit})
-        return response.get('results', response) if isinstance(response, dict) else response
+        """Get all saved replies (canned responses) from Guesty, cached for SAVED_REPLIES_TTL"""
+        return self._cached_reply_read('all', limit, lambda: self._unwrap(
+            self._make_request('GET', '/saved-replies', params={'limit': limit})
+        ))
 
     def get_saved_reply(self, reply_id: str) -> Dict:
-        """Get a specific saved reply by ID"""
-        return self._make_request('GET', f'/saved-replies/{reply_id}')
+        """Get a specific saved reply by ID, cached for SAVED_REPLIES_TTL"""
+        return self._cached_reply_read('reply', reply_id, lambda: self._make_request(
+            'GET', f'/saved-replies/{reply_id}'
+        ))
 
     def get_saved_replies_by_listing(self, listing_id: str) -> List[Dict]:
-        """Get saved replies assigned to a specific listing"""
-        response = self._make_request('GET', f'/saved-replies/listing/{listing_id}')
-        return response.get('results', response) if isinstance(response, dict) else response
+        """Get saved replies assigned to a specific listing, cached for SAVED_REPLIES_TTL"""
+        return self._cached_reply_read('listing', listing_id, lambda: self._unwrap(
+            self._make_request('GET', f'/saved-replies/listing/{listing_id}')
+        ))
 
-    def get_conversations(self, limit: int = 50, listing_id: str = None) -> List[Dict]:
+    def get_conversations(self, limit: int = 50, listing_id: str = None,
+                          skip: int = 0) -> List[Dict]:
         """Get guest conversations from Guesty inbox"""
         params = {'limit': limit}
+        if skip:
+            params['skip'] = skip
         if listing_id:
             params['listingId'] = listing_id
         response = self._make_request('GET', '/communication/conversations', params=params)
-        return response.get('results', response) if isinstance(response, dict) else response
+        return self._unwrap(response)
 
     def get_conversation(self, conversation_id: str) -> Dict:
         """Get a specific conversation by ID"""
@@ -333,7 +722,7 @@ class GuestyAPI:
             f'/communication/conversations/{conversation_id}/posts',
             params={'limit': limit}
         )
-        return response.get('results', response) if isinstance(response, dict) else response
+        return self._unwrap(response)
 
     def send_message(self, conversation_id: str, message: str, module: str = 'airbnb2') -> Dict:
         """
@@ -366,11 +755,12 @@ class GuestyAPI:
     # ============================================
 
     def get_reservations(self, listing_id: str = None, start_date: str = None,
-                         end_date: str = None, limit: int = 100) -> List[Dict]:
-        """Get reservations"""
+                         end_date: str = None, limit: int = 100, stream: bool = False,
+                         fields: str = None) -> Union[List[Dict], Iterator[Dict]]:
+        """Get reservations (stream=True yields them as they are parsed)"""
         params = {
             'limit': limit,
-            'fields': 'listingId,checkIn,checkOut,status,money,guest,source'
+            'fields': fields or _FIELDS_RESERVATION
         }
 
         filters = {}
@@ -382,7 +772,10 @@ class GuestyAPI:
             filters['checkOut'] = {'$lte': end_date}
 
         if filters:
-            params['filters'] = json.dumps(filters)
+            params['filters'] = _json_dumps(filters)
+
+        if stream:
+            return self._stream_request('GET', '/reservations', params=params)
 
         response = self._make_request('GET', '/reservations', params=params)
         return response.get('results', [])
@@ -403,102 +796,348 @@ class GuestyAPI:
         """
         stats = {'properties': 0, 'units': 0, 'errors': []}
 
+        # Parent listing ID -> Casita property ID (None if creating it failed)
+        parent_props = {}
+        # Children that arrived before their parent, keyed by parent ID
+        children_by_parent = defaultdict(list)
+
+        try:
+            listings = self.iter_listings(fields=_FIELDS_SYNC)
+            while True:
+                # Read a chunk from Guesty first so the write lock isn't held during network I/O
+                chunk = list(islice(listings, self.SYNC_CHUNK_SIZE))
+                if not chunk:
+                    break
+
+                self._sync_chunk(pms, chunk, parent_props, children_by_parent, stats)
+
+        except Exception as e:
+            stats['errors'].append(f"API Error: {str(e)}")
+
+        return stats
+
+    def _sync_chunk(self, pms, chunk: List[Dict], parent_props: Dict[str, Optional[int]],
+                    children_by_parent: Dict[str, List[Dict]], stats: Dict):
+        """
+        Write a chunk of listings in one PMS transaction (one commit per chunk, not per row).
+        Parent IDs, deferred children and counts are merged into the shared dicts only
+        once the chunk commits; a chunk that rolls back is reported as one error.
+        """
+        chunk_parents = dict(parent_props)
+        chunk_children = defaultdict(list, {
+            parent_id: list(children) for parent_id, children in children_by_parent.items()
+        })
+        chunk_stats = {'properties': 0, 'units': 0, 'errors': []}
+
+        try:
+            with pms.transaction():
+                for listing in chunk:
+                    self._sync_listing(pms, listing, chunk_parents, chunk_children, chunk_stats)
+        except Exception as e:
+            stats['errors'].append(f"Chunk of {len(chunk)} listings not written: {str(e)}")
+            return
+
+        parent_props.update(chunk_parents)
+        children_by_parent.clear()
+        children_by_parent.update(chunk_children)
+        stats['properties'] += chunk_stats['properties']
+        stats['units'] += chunk_stats['units']
+        stats['errors'].extend(chunk_stats['errors'])
+
+    def _sync_listing(self, pms, listing: Dict, parent_props: Dict[str, Optional[int]],
+                      children_by_parent: Dict[str, List[Dict]], stats: Dict):
+        """Dispatch one streamed listing on its type and add its results to stats"""
+        listing_type = listing.get('type')
+
+        if listing_type == 'MTL':
+            listing_id = listing.get('_id')
+            prop_id, units, errors = self._sync_parent(
+                pms, listing, children_by_parent.pop(listing_id, [])
+            )
+            parent_props[listing_id] = prop_id
+
+        elif listing_type == 'SINGLE':
+            prop_id, units, errors = self._sync_single(pms, listing)
+
+        elif listing_type == 'MTL_CHILD':
+            parent_id = listing.get('mtl', {}).get('p')
+            if parent_id not in parent_props:
+                children_by_parent[parent_id].append(listing)
+                return
+            if parent_props[parent_id] is None:
+                return
+            prop_id = None
+            units, errors = self._sync_child(pms, parent_props[parent_id], listing)
+
+        else:
+            return
+
+        if prop_id is not None:
+            stats['properties'] += 1
+        stats['units'] += units
+        stats['errors'].extend(errors)
+
+    def _sync_parent(self, pms, listing: Dict,
+                     listing_children: List[Dict]) -> Tuple[Optional[int], int, List[str]]:
+        """
+        Create a parent (MTL) property and the child units already known for it.
+
+        Returns:
+            (Casita property ID or None, units created, error messages)
+        """
+        units = 0
+        errors = []
+
+        try:
+            # Extract data
+            address = listing.get('address', {})
+            prices = listing.get('prices', {})
+
+            prop_id = pms.create_property(
+                name=listing.get('title', 'Unnamed Property'),
+                nickname=listing.get('nickname'),
+                property_type='MTL',
+                city=address.get('city'),
+                state=address.get('state'),
+                address=address.get('full'),
+                base_price=prices.get('basePrice', 0),
+                min_price=prices.get('minPrice', 0),
+                max_price=prices.get('maxPrice', 9999),
+                bedrooms=listing.get('bedrooms'),
+                bathrooms=listing.get('bathrooms'),
+                max_guests=listing.get('accommodates'),
+                airbnb_listing_id=listing.get('_id')
+            )
+
+        except Exception as e:
+            return None, 0, [f"Property {listing.get('title')}: {str(e)}"]
+
+        # Create child units
+        for child in listing_children:
+            created, child_errors = self._sync_child(pms, prop_id, child)
+            units += created
+            errors.extend(child_errors)
+
+        return prop_id, units, errors
+
+    def _sync_child(self, pms, prop_id: int, child: Dict) -> Tuple[int, List[str]]:
+        """
+        Create a child (MTL_CHILD) listing as a unit of its parent property.
+
+        Returns:
+            (units created, error messages)
+        """
+        try:
+            child_prices = child.get('prices', {})
+            pms.create_unit(
+                property_id=prop_id,
+                unit_name=child.get('title', 'Unnamed Unit'),
+                unit_type=child.get('propertyType', 'Standard'),
+                airbnb_listing_id=child.get('_id'),
+                bedrooms=child.get('bedrooms'),
+                bathrooms=child.get('bathrooms'),
+                max_guests=child.get('accommodates'),
+                custom_base_price=child_prices.get('basePrice'),
+                custom_min_price=child_prices.get('minPrice'),
+                custom_max_price=child_prices.get('maxPrice')
+            )
+            return 1, []
+        except Exception as e:
+            return 0, [f"Unit {child.get('title')}: {str(e)}"]
+
+    def _sync_single(self, pms, listing: Dict) -> Tuple[Optional[int], int, List[str]]:
+        """
+        Create a single listing as a property with one unit.
+
+        Returns:
+            (Casita property ID or None, units created, error messages)
+        """
+        prop_id = None
+
+        try:
+            address = listing.get('address', {})
+            prices = listing.get('prices', {})
+
+            prop_id = pms.create_property(
+                name=listing.get('title', 'Unnamed Property'),
+                nickname=listing.get('nickname'),
+                property_type='SINGLE',
+                city=address.get('city'),
+                state=address.get('state'),
+                address=address.get('full'),
+                base_price=prices.get('basePrice', 0),
+                min_price=prices.get('minPrice', 0),
+                max_price=prices.get('maxPrice', 9999),
+                bedrooms=listing.get('bedrooms'),
+                bathrooms=listing.get('bathrooms'),
+                max_guests=listing.get('accommodates'),
+                airbnb_listing_id=listing.get('_id')
+            )
+
+            # Create single unit for the property
+            pms.create_unit(
+                property_id=prop_id,
+                unit_name=listing.get('title', 'Main Unit'),
+                unit_type=listing.get('propertyType', 'Single'),
+                airbnb_listing_id=listing.get('_id'),
+                bedrooms=listing.get('bedrooms'),
+                bathrooms=listing.get('bathrooms'),
+                max_guests=listing.get('accommodates')
+            )
+            return prop_id, 1, []
+
+        except Exception as e:
+            return prop_id, 0, [f"Single {listing.get('title')}: {str(e)}"]
+
+
+class AsyncGuestyAPI(GuestyAPI):
+    """asyncio variant that fetches listing pages concurrently over one pooled (HTTP/2) client"""
+
+    # Listing pages in flight at once
+    MAX_CONCURRENCY = 20
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.2
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._aclient = None  # httpx.AsyncClient, bound to the event loop that created it
+        self._aclient_loop = None
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get the pooled async HTTP client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            # A client can't be shared across event loops (e.g. repeated asyncio.run)
+            self._aclient = httpx.AsyncClient(
+                base_url=self.BASE_URL,
+                timeout=30,
+                headers={'Content-Type': 'application/json'},
+                # Pool settings go on the transport: httpx ignores the client's when one is given.
+                # Retries failed connects; status retries happen in _make_request_async
+                transport=httpx.AsyncHTTPTransport(
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                    retries=3
+                )
+            )
+            self._aclient_loop = loop
+        return self._aclient
+
+    async def aclose(self):
+        """Close the async client; the next request opens a fresh one"""
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+            self._aclient_loop = None
+
+    async def _make_request_async(self, method: str, endpoint: str, params: Dict = None,
+                                  data: Dict = None) -> Dict:
+        """Make authenticated request on the shared async client"""
+        client = self._get_async_client()
+        body = _json_dumps(data) if data is not None else None
+        reauthed = False
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            # Cached token, so every coroutine shares the same one
+            token = self._get_access_token()
+            response = await client.request(
+                method,
+                endpoint,
+                headers=_auth_header(token),
+                params=params,
+                content=body
+            )
+
+            if response.status_code == 401 and not reauthed:
+                # Token expired or revoked: drop it and retry once
+                self._invalidate_token()
+                reauthed = True
+                continue
+
+            if response.status_code in _RETRY_STATUSES and attempt < self.MAX_RETRIES:
+                retry_after = response.headers.get('Retry-After', '')
+                await asyncio.sleep(float(retry_after) if retry_after.isdigit()
+                                    else self.RETRY_BACKOFF * 2 ** attempt)
+                continue
+            break
+
+        if response.status_code >= 400:
+            raise Exception(f"Guesty API error ({response.status_code}): {response.text}")
+
+        return _json_loads(response.content)
+
+    async def _get_listings_page_async(self, skip: int, limit: int, fields: str) -> Dict:
+        """Get one raw /listings page (results plus count)"""
+        return await self._make_request_async('GET', '/listings', params={
+            'limit': limit,
+            'skip': skip,
+            'fields': fields
+        })
+
+    async def sync_to_casita_pms_async(self, pms, page_size: int = 100) -> Dict[str, int]:
+        """
+        Sync all Guesty listings to Casita PMS, fetching pages concurrently.
+
+        Args:
+            pms: CasitaPMS instance
+            page_size: Listings per request; each page is written in one PMS transaction
+
+        Returns:
+            Dict with counts of synced properties and units
+        """
+        stats = {'properties': 0, 'units': 0, 'errors': []}
+        parent_props = {}
+        children_by_parent = defaultdict(list)
+
+        loop = asyncio.get_running_loop()
+        # SQLite has one writer and a PMS transaction is per thread, so pages are
+        # written one at a time off the event loop while other pages download
+        write_lock = asyncio.Lock()
+
+        async def write(chunk: List[Dict]):
+            async with write_lock:
+                await loop.run_in_executor(None, self._sync_chunk, pms, chunk,
+                                           parent_props, children_by_parent, stats)
+
+        sem = asyncio.Semaphore(self.MAX_CONCURRENCY)
+
+        async def fetch(skip: int) -> List[Dict]:
+            async with sem:
+                page = await self._get_listings_page_async(skip, page_size, _FIELDS_SYNC)
+                return page.get('results', [])
+
+        tasks = []
         try:
-            # Get all listings
-            all_listings = self.get_all_listings(limit=200)
-
-            # Separate by type
-            parents = [l for l in all_listings if l.get('type') == 'MTL']
-            singles = [l for l in all_listings if l.get('type') == 'SINGLE']
-            children = [l for l in all_listings if l.get('type') == 'MTL_CHILD']
-
-            # Process parent listings (MTL)
-            for listing in parents:
-                try:
-                    # Extract data
-                    address = listing.get('address', {})
-                    prices = listing.get('prices', {})
-
-                    prop_id = pms.create_property(
-                        name=listing.get('title', 'Unnamed Property'),
-                        nickname=listing.get('nickname'),
-                        property_type='MTL',
-                        city=address.get('city'),
-                        state=address.get('state'),
-                        address=address.get('full'),
-                        base_price=prices.get('basePrice', 0),
-                        min_price=prices.get('minPrice', 0),
-                        max_price=prices.get('maxPrice', 9999),
-                        bedrooms=listing.get('bedrooms'),
-                        bathrooms=listing.get('bathrooms'),
-                        max_guests=listing.get('accommodates'),
-                        airbnb_listing_id=listing.get('_id')
-                    )
-                    stats['properties'] += 1
-
-                    # Get and create child units
-                    listing_children = [c for c in children if c.get('mtl', {}).get('p') == listing.get('_id')]
-                    for child in listing_children:
-                        try:
-                            child_prices = child.get('prices', {})
-                            pms.create_unit(
-                                property_id=prop_id,
-                                unit_name=child.get('title', 'Unnamed Unit'),
-                                unit_type=child.get('propertyType', 'Standard'),
-                                airbnb_listing_id=child.get('_id'),
-                                bedrooms=child.get('bedrooms'),
-                                bathrooms=child.get('bathrooms'),
-                                max_guests=child.get('accommodates'),
-                                custom_base_price=child_prices.get('basePrice'),
-                                custom_min_price=child_prices.get('minPrice'),
-                                custom_max_price=child_prices.get('maxPrice')
-                            )
-                            stats['units'] += 1
-                        except Exception as e:
-                            stats['errors'].append(f"Unit {child.get('title')}: {str(e)}")
-
-                except Exception as e:
-                    stats['errors'].append(f"Property {listing.get('title')}: {str(e)}")
-
-            # Process single listings (create as property + 1 unit)
-            for listing in singles:
-                try:
-                    address = listing.get('address', {})
-                    prices = listing.get('prices', {})
-
-                    prop_id = pms.create_property(
-                        name=listing.get('title', 'Unnamed Property'),
-                        nickname=listing.get('nickname'),
-                        property_type='SINGLE',
-                        city=address.get('city'),
-                        state=address.get('state'),
-                        address=address.get('full'),
-                        base_price=prices.get('basePrice', 0),
-                        min_price=prices.get('minPrice', 0),
-                        max_price=prices.get('maxPrice', 9999),
-                        bedrooms=listing.get('bedrooms'),
-                        bathrooms=listing.get('bathrooms'),
-                        max_guests=listing.get('accommodates'),
-                        airbnb_listing_id=listing.get('_id')
-                    )
-                    stats['properties'] += 1
-
-                    # Create single unit for the property
-                    pms.create_unit(
-                        property_id=prop_id,
-                        unit_name=listing.get('title', 'Main Unit'),
-                        unit_type=listing.get('propertyType', 'Single'),
-                        airbnb_listing_id=listing.get('_id'),
-                        bedrooms=listing.get('bedrooms'),
-                        bathrooms=listing.get('bathrooms'),
-                        max_guests=listing.get('accommodates')
-                    )
-                    stats['units'] += 1
-
-                except Exception as e:
-                    stats['errors'].append(f"Single {listing.get('title')}: {str(e)}")
+            # Fetch the token up front instead of once per coroutine
+            self._get_access_token()
+
+            if self.use_booking_api:
+                # Search endpoint has no skip paging
+                response = await self._make_request_async('GET', '/search')
+                await write(self._unwrap(response))
+                return stats
+
+            first = await self._get_listings_page_async(0, page_size, _FIELDS_SYNC)
+            results = first.get('results', [])
+            await write(results)
+
+            if 'count' in first:
+                # Total is known: request every remaining page at once, write each as it lands
+                tasks = [asyncio.create_task(fetch(skip))
+                         for skip in range(page_size, first['count'], page_size)]
+                for task in asyncio.as_completed(tasks):
+                    await write(await task)
+            else:
+                # No total to fan out on: page sequentially like iter_listings
+                skip = 0
+                while len(results) == page_size:
+                    skip += page_size
+                    results = await fetch(skip)
+                    await write(results)
 
         except Exception as e:
+            for task in tasks:
+                task.cancel()
             stats['errors'].append(f"API Error: {str(e)}")
 
         return stats
@@ -14,9 +14,21 @@ Features:
 - Competitor set tracking
 """
 
+import time
+import asyncio
 import datetime
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+try:
+    import aiohttp  # Optional: fetch the daily Amadeus offers concurrently
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# Daily offer requests in flight at once against the Amadeus host
+AMADEUS_CONCURRENCY = 8
 
 
 # ============================================
@@ -378,7 +390,25 @@ def _amadeus_get_hotel_offers(amadeus, hotel_ids: List[str], check_in: str,
 
 def _amadeus_get_pricing_range(amadeus, hotel_id: str, days: int,
                                 adults: int) -> pd.DataFrame:
-    """Get pricing range using Amadeus API (one call per day)"""
+    """Get pricing range using Amadeus API (one call per day, run concurrently when possible)"""
+    data = None
+
+    if AIOHTTP_AVAILABLE:
+        try:
+            data = asyncio.run(_amadeus_get_pricing_range_async(amadeus, hotel_id, days, adults))
+        except Exception as e:
+            # e.g. called from a running event loop, or a client without REST settings
+            print(f"Amadeus concurrent fetch unavailable, fetching days in sequence: {e}")
+
+    if data is None:
+        data = _amadeus_get_pricing_range_sequential(amadeus, hotel_id, days, adults)
+
+    return pd.DataFrame(data) if data else pd.DataFrame()
+
+
+def _amadeus_get_pricing_range_sequential(amadeus, hotel_id: str, days: int,
+                                          adults: int) -> List[Dict]:
+    """Fetch the daily offers one SDK call at a time"""
     today = datetime.date.today()
     data = []
 
@@ -396,39 +426,150 @@ def _amadeus_get_pricing_range(amadeus, hotel_id: str, days: int,
             )
 
             if response.data:
-                for hotel in response.data:
-                    hotel_name = hotel.get('hotel', {}).get('name', 'Unknown')
-
-                    for offer in hotel.get('offers', []):
-                        room = offer.get('room', {})
-                        price_info = offer.get('price', {})
-
-                        room_type = room.get('typeEstimated', {}).get('category', 'Standard')
-                        beds = room.get('typeEstimated', {}).get('beds', 1)
-                        bed_type = room.get('typeEstimated', {}).get('bedType', 'Unknown')
-
-                        total_price = float(price_info.get('total', 0))
-                        currency = price_info.get('currency', 'USD')
-
-                        policies = offer.get('policies', {})
-                        cancellation = policies.get('cancellation', {})
-                        available = offer.get('available', True)
-
-                        data.append({
-                            "Date": check_in,
-                            "Hotel": hotel_name,
-                            "Room Type": f"{room_type} ({beds} {bed_type})",
-                            "Rate": total_price,
-                            "Rate_Display": f"${total_price:.0f}",
-                            "Currency": currency,
-                            "Available": "✅ Available" if available else "❌ Sold Out",
-                            "Cancellation": cancellation.get('type', 'Unknown')
-                        })
+                data.extend(_amadeus_offer_rows(response.data, check_in))
 
         except Exception:
             pass
 
-    return pd.DataFrame(data) if data else pd.DataFrame()
+    return data
+
+
+# Amadeus access tokens for the REST calls: (host, client ID) -> (token, monotonic expiry)
+_amadeus_tokens: Dict[Tuple[str, str], Tuple[str, float]] = {}
+
+
+async def _amadeus_access_token(http, amadeus, base_url: str,
+                                force_refresh: bool = False) -> str:
+    """Get (or reuse) an OAuth2 token for the client's Amadeus credentials"""
+    key = (base_url, amadeus.client_id)
+    cached = _amadeus_tokens.get(key)
+    if cached and cached[1] > time.monotonic() and not force_refresh:
+        return cached[0]
+
+    async with http.post(
+        f"{base_url}/v1/security/oauth2/token",
+        data={
+            'grant_type': 'client_credentials',
+            'client_id': amadeus.client_id,
+            'client_secret': amadeus.client_secret
+        }
+    ) as response:
+        if response.status >= 400:
+            raise Exception(f"Amadeus auth error ({response.status}): {await response.text()}")
+        body = await response.json(content_type=None)
+
+    # Refresh a minute before Amadeus expires it (tokens last ~30 minutes)
+    expiry = time.monotonic() + body.get('expires_in', 1799) - 60
+    _amadeus_tokens[key] = (body['access_token'], expiry)
+    return body['access_token']
+
+
+async def _amadeus_fetch_day(http, url: str, headers: Dict, hotel_id: str,
+                             check_in: datetime.date, adults: int) -> Optional[List[Dict]]:
+    """
+    Fetch one day's offers from the Amadeus REST API; a failed day yields no rows.
+    Returns None when the token is rejected (401), so the caller can re-authenticate.
+    """
+    params = {
+        'hotelIds': hotel_id,
+        'checkInDate': check_in.isoformat(),
+        'checkOutDate': (check_in + datetime.timedelta(days=1)).isoformat(),
+        'adults': str(adults),
+        'currency': 'USD'
+    }
+
+    for attempt in range(3):
+        try:
+            async with http.get(url, params=params, headers=headers) as response:
+                if response.status == 429 and attempt < 2:
+                    # Rate limited: back off briefly and retry the day
+                    await asyncio.sleep(0.2 * 2 ** attempt)
+                    continue
+                if response.status == 401:
+                    return None
+                if response.status >= 400:
+                    return []
+                body = await response.json(content_type=None)
+        except Exception:
+            return []
+
+        return _amadeus_offer_rows(body.get('data') or [], check_in)
+
+    return []
+
+
+async def _amadeus_get_pricing_range_async(amadeus, hotel_id: str, days: int,
+                                           adults: int) -> List[Dict]:
+    """Fetch every day's offers at once over a shared aiohttp session"""
+    scheme = 'https' if getattr(amadeus, 'ssl', True) else 'http'
+    base_url = f"{scheme}://{amadeus.host}:{getattr(amadeus, 'port', 443)}"
+    today = datetime.date.today()
+
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit_per_host=AMADEUS_CONCURRENCY),
+        timeout=aiohttp.ClientTimeout(total=30)
+    ) as http:
+        url = f"{base_url}/v3/shopping/hotel-offers"
+        days_rows = [None] * days
+
+        for attempt in range(2):
+            # One token for all days instead of one SDK auth check per call; a token
+            # revoked before its cached expiry is replaced once for the rejected days
+            token = await _amadeus_access_token(http, amadeus, base_url, force_refresh=attempt > 0)
+            headers = {'Authorization': f'Bearer {token}'}
+
+            pending = [day_offset for day_offset, rows in enumerate(days_rows) if rows is None]
+            fetched = await asyncio.gather(*[
+                _amadeus_fetch_day(http, url, headers, hotel_id,
+                                   today + datetime.timedelta(days=day_offset), adults)
+                for day_offset in pending
+            ])
+            for day_offset, rows in zip(pending, fetched):
+                days_rows[day_offset] = rows
+
+            if all(rows is not None for rows in days_rows):
+                break
+        else:
+            raise Exception("Amadeus rejected a freshly issued access token (401)")
+
+    # gather keeps day order, so rows come out as in the sequential loop
+    return [row for rows in days_rows for row in rows]
+
+
+def _amadeus_offer_rows(hotels: List[Dict], check_in: datetime.date) -> List[Dict]:
+    """Flatten one day's Amadeus hotel offers into pricing rows"""
+    data = []
+
+    for hotel in hotels:
+        hotel_name = hotel.get('hotel', {}).get('name', 'Unknown')
+
+        for offer in hotel.get('offers', []):
+            room = offer.get('room', {})
+            price_info = offer.get('price', {})
+
+            room_type = room.get('typeEstimated', {}).get('category', 'Standard')
+            beds = room.get('typeEstimated', {}).get('beds', 1)
+            bed_type = room.get('typeEstimated', {}).get('bedType', 'Unknown')
+
+            total_price = float(price_info.get('total', 0))
+            currency = price_info.get('currency', 'USD')
+
+            policies = offer.get('policies', {})
+            cancellation = policies.get('cancellation', {})
+            available = offer.get('available', True)
+
+            data.append({
+                "Date": check_in,
+                "Hotel": hotel_name,
+                "Room Type": f"{room_type} ({beds} {bed_type})",
+                "Rate": total_price,
+                "Rate_Display": f"${total_price:.0f}",
+                "Currency": currency,
+                "Available": "✅ Available" if available else "❌ Sold Out",
+                "Cancellation": cancellation.get('type', 'Unknown')
+            })
+
+    return data
 
 
 def _amadeus_60_day_insight(amadeus, hotel_id: str) -> pd.DataFrame:
@@ -480,13 +621,13 @@ def _amadeus_search_by_city(amadeus, city_code: str, radius: int) -> List[Dict]:
 # SIMULATED DATA (FALLBACK)
 # ============================================
 
+_rng = np.random.default_rng()
+
 def _generate_simulated_data(hotel_id: str, days: int = 60) -> pd.DataFrame:
     """
     Generate simulated pricing data for demo/testing.
     Uses realistic pricing patterns based on hotel type.
     """
-    import random
-
     today = datetime.date.today()
     dates = [today + datetime.timedelta(days=x) for x in range(days)]
 
@@ -495,47 +636,41 @@ def _generate_simulated_data(hotel_id: str, days: int = 60) -> pd.DataFrame:
         "Superior King": {"base": 450, "variance": 75},
         "Oceanfront Suite": {"base": 850, "variance": 150}
     }
-
-    data = []
-    for d in dates:
-        for cat, pricing in categories.items():
-            is_weekend = d.weekday() >= 4
-            weekend_factor = 1.4 if is_weekend else 1.0
-
-            month = d.month
-            if month in [6, 7, 8, 12]:
-                season_factor = 1.3
-            elif month in [3, 4]:
-                season_factor = 1.2
-            else:
-                season_factor = 1.0
-
-            days_out = (d - today).days
-            if days_out <= 7:
-                lead_factor = 1.15
-            elif days_out <= 14:
-                lead_factor = 1.05
-            else:
-                lead_factor = 1.0
-
-            base = pricing["base"]
-            variance = random.uniform(-pricing["variance"], pricing["variance"])
-            price = (base + variance) * weekend_factor * season_factor * lead_factor
-
-            base_availability = random.randint(0, 15)
-            if is_weekend:
-                base_availability = max(0, base_availability - 5)
-            if season_factor > 1.1:
-                base_availability = max(0, base_availability - 3)
-
-            data.append({
-                "Date": d,
-                "Unit Type": cat,
-                "Rooms Available": base_availability,
-                "Target Units": 10,
-                "Rate_Float": round(price, 2),
-                "Rate": f"${int(price)}",
-                "Availability Status": "✅ 10+ Units" if base_availability >= 10 else "❌ Limited"
-            })
-
-    return pd.DataFrame(data)
+    cat_names = np.array(list(categories))
+    cat_base = np.array([c["base"] for c in categories.values()], dtype=float)
+    cat_variance = np.array([c["variance"] for c in categories.values()], dtype=float)
+
+    # One row per (date, category), date-major like the table is displayed
+    day_idx = np.repeat(np.arange(days), len(categories))
+    cat_idx = np.tile(np.arange(len(categories)), days)
+    n = day_idx.size
+
+    # Weekday and month per day from date arithmetic, no per-date Python calls
+    day_offsets = np.arange(days)
+    weekdays = (today.weekday() + day_offsets) % 7
+    months = (np.datetime64(today, 'D') + day_offsets).astype('datetime64[M]').astype(int) % 12 + 1
+
+    is_weekend = (weekdays >= 4)[day_idx]
+    weekend_factor = np.where(is_weekend, 1.4, 1.0)
+    season_by_day = np.select(
+        [np.isin(months, [6, 7, 8, 12]), np.isin(months, [3, 4])], [1.3, 1.2], default=1.0
+    )
+    season_factor = season_by_day[day_idx]
+    lead_factor = np.select([day_idx <= 7, day_idx <= 14], [1.15, 1.05], default=1.0)
+
+    variance = _rng.uniform(-cat_variance[cat_idx], cat_variance[cat_idx])
+    price = (cat_base[cat_idx] + variance) * weekend_factor * season_factor * lead_factor
+
+    availability = _rng.integers(0, 16, n)
+    availability = np.where(is_weekend, np.maximum(availability - 5, 0), availability)
+    availability = np.where(season_factor > 1.1, np.maximum(availability - 3, 0), availability)
+
+    return pd.DataFrame({
+        "Date": np.array(dates, dtype=object)[day_idx],
+        "Unit Type": cat_names[cat_idx],
+        "Rooms Available": availability,
+        "Target Units": 10,
+        "Rate_Float": price.round(2),
+        "Rate": [f"${p}" for p in price.astype(int).tolist()],
+        "Availability Status": np.where(availability >= 10, "✅ 10+ Units", "❌ Limited")
+    })
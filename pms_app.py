@@ -11,6 +11,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
 import sqlite3
+import threading
 import bcrypt
 import os
 from dotenv import load_dotenv
@@ -87,6 +88,8 @@ if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
 if 'pms' not in st.session_state:
     st.session_state.pms = get_pms_instance()
+    # Prebuild unit calendars off the main thread; the calendar cache is shared by all sessions
+    threading.Thread(target=st.session_state.pms.warm_all_units, daemon=True).start()
 if 'selected_property_id' not in st.session_state:
     st.session_state.selected_property_id = None
 if 'current_view' not in st.session_state:
@@ -260,10 +263,10 @@ if st.session_state.current_view == 'revenue' or st.session_state.current_view =
             if units:
                 # Generate pricing calendar for first unit - FULL YEAR
                 unit = units[0]
-                calendar = pms.generate_pricing_calendar(unit['id'], days=365)
+                calendar = pms.generate_pricing_arrays(unit['id'], days=365)
 
                 if calendar:
-                    df = pd.DataFrame(calendar)
+                    df = pd.DataFrame(calendar.to_columns())
                     df['date'] = pd.to_datetime(df['date'])
                     df['month'] = df['date'].dt.to_period('M')
 
@@ -624,10 +627,10 @@ elif st.session_state.current_view == 'calendar':
         st.markdown(f"### {prop['name']} - {calendar_range}")
 
         # Generate calendar (full year by default)
-        calendar = pms.generate_pricing_calendar(selected_unit, days=days_to_show)
+        calendar = pms.generate_pricing_arrays(selected_unit, days=days_to_show)
 
         if calendar:
-            df = pd.DataFrame(calendar)
+            df = pd.DataFrame(calendar.to_columns())
             df['date'] = pd.to_datetime(df['date'])
             df['day_name'] = df['date'].dt.day_name()
 
@@ -666,8 +669,8 @@ elif st.session_state.current_view == 'calendar':
             display_df.columns = ['Date', 'Day', 'Base Price', 'Final Price']
 
             # Add adjustment breakdown
-            adj_df = pd.json_normalize(df['adjustments'])
-            display_df = pd.concat([display_df.reset_index(drop=True), adj_df], axis=1)
+            adj_df = df[['seasonal', 'day_of_week', 'last_minute', 'orphan_day']]
+            display_df = pd.concat([display_df.reset_index(drop=True), adj_df.reset_index(drop=True)], axis=1)
 
             st.dataframe(display_df, use_container_width=True, hide_index=True,
                         column_config={
@@ -773,9 +776,9 @@ elif st.session_state.current_view == 'analytics':
         days_back = period_map[time_period]
 
     # Generate forecast data - full year by default
-    forecast = pms.get_occupancy_forecast(st.session_state.selected_property_id, days=days_back)
+    forecast = pms.get_occupancy_columns(st.session_state.selected_property_id, days=days_back)
 
-    if forecast:
+    if len(forecast['date']):
         df = pd.DataFrame(forecast)
         df['date'] = pd.to_datetime(df['date'])
 
@@ -1080,33 +1083,33 @@ elif st.session_state.current_view == 'aibot':
                     result = ai_bot.test_response(test_message)
 
                     # Show source indicator
-                    source = result.get('source', 'unknown')
+                    source = result.source
                     if source == 'saved_reply':
-                        st.success(f"✅ **Matched Saved Reply**: {result.get('matched_reply_title', 'N/A')}")
+                        st.success(f"✅ **Matched Saved Reply**: {result.matched_reply_title or 'N/A'}")
                     elif source == 'web_info':
                         st.info("🌐 **Web Info Response** (weather/events/transportation)")
                     elif source == 'escalated':
-                        st.error(f"🚨 **Escalated to CS Agent**: {result.get('reason', 'N/A')}")
+                        st.error(f"🚨 **Escalated to CS Agent**: {result.reason or 'N/A'}")
                     elif source == 'ai':
                         st.info("🤖 **AI Generated Response**")
 
-                    if result.get('assigned_to_agent'):
+                    if result.assigned_to_agent:
                         st.warning("⚠️ **Will be assigned to Customer Service Agent**")
 
-                    if result.get('response'):
+                    if result.response:
                         st.markdown("**Response:**")
-                        st.info(result['response'])
+                        st.info(result.response)
 
                     # Show metadata
                     meta_col1, meta_col2, meta_col3, meta_col4 = st.columns(4)
                     with meta_col1:
-                        st.metric("Confidence", f"{result['confidence']:.0%}")
+                        st.metric("Confidence", f"{result.confidence:.0%}")
                     with meta_col2:
                         st.metric("Source", source.replace('_', ' ').title())
                     with meta_col3:
-                        st.metric("Sentiment", result.get('sentiment', 'neutral').title())
+                        st.metric("Sentiment", result.sentiment.title())
                     with meta_col4:
-                        st.metric("Escalated", "Yes" if result['escalated'] else "No")
+                        st.metric("Escalated", "Yes" if result.escalated else "No")
 
             # Quick test examples
             st.markdown("---")
@@ -1168,8 +1171,8 @@ elif st.session_state.current_view == 'aibot':
                                     if messages:
                                         latest = messages[0].get('body', '')
                                         result = ai_bot.test_response(latest)
-                                        if result.get('response'):
-                                            st.info(f"**Suggested Reply:** {result['response']}")
+                                        if result.response:
+                                            st.info(f"**Suggested Reply:** {result.response}")
                 else:
                     st.info("No conversations found")
 
@@ -1210,6 +1213,7 @@ elif st.session_state.current_view == 'aibot':
                 st.caption("These are pulled from your Guesty saved replies and used to answer common questions.")
 
                 if st.button("🔄 Refresh Saved Replies"):
+                    guesty.invalidate_saved_replies()
                     replies = guesty.get_saved_replies(limit=50)
                     st.success(f"Loaded {len(replies)} saved replies")
 
@@ -1265,8 +1269,8 @@ elif st.session_state.current_view == 'aibot':
                                 st.markdown("**Sample Training Examples:**")
                                 for i, example in enumerate(examples[:3]):
                                     with st.expander(f"Example {i+1}: Guest Question"):
-                                        st.markdown(f"**Guest:** {example['guest_message'][:200]}...")
-                                        st.markdown(f"**Your Team's Response:** {example['host_response'][:300]}...")
+                                        st.markdown(f"**Guest:** {example.guest_message[:200]}...")
+                                        st.markdown(f"**Your Team's Response:** {example.host_response[:300]}...")
                             else:
                                 st.warning("No conversation history found or Guesty API issue. Try again later.")
 